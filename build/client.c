@@ -1,3 +1,4 @@
+#include <errno.h>
 #include <stdio.h>
 #include <stdlib.h>
 #include <string.h>
@@ -6,72 +7,193 @@
 #include <unistd.h>
 
 #define BUFFER_SIZE 1024
+// Sent first to use framed protocol, see src/services/cli.py
+#define PROTOCOL_PREFIX "HYPRYOU/2\n"
 
-int main(int argc, char *argv[])
+// Commands are separated by standalone ";" argument:
+//   hypryou-utils change_workspace 2 ";" toggle_window sidebar
+// or read line by line from stdin with "-":
+//   printf 'ping\nhelp\n' | hypryou-utils -
+
+typedef struct
 {
-    int sockfd;
-    struct sockaddr_un addr;
-    char buffer[BUFFER_SIZE];
+    char **items;
+    size_t count;
+    size_t capacity;
+} Commands;
 
-    const char *instance = getenv("HYPRLAND_INSTANCE_SIGNATURE");
-    if (!instance)
-    {
-        fprintf(stderr, "HYPRLAND_INSTANCE_SIGNATURE is not set.\n");
-        return 1;
-    }
+typedef struct
+{
+    int fd;
+    char data[BUFFER_SIZE];
+    size_t start;
+    size_t end;
+} Reader;
 
-    const char *base_dir = getenv("HYPRYOU_SOCKET_DIR");
-    if (!base_dir) {
-        const char *user = getenv("USER");
-        if (!user) {
-            user = "unknown";
+static void push_command(Commands *commands, char *command)
+{
+    if (commands->count == commands->capacity)
+    {
+        commands->capacity = commands->capacity ? commands->capacity * 2 : 8;
+        commands->items = realloc(commands->items, commands->capacity * sizeof(char *));
+        if (!commands->items)
+        {
+            perror("realloc");
+            exit(1);
         }
+    }
+    commands->items[commands->count++] = command;
+}
 
-        static char default_dir[256];
-        snprintf(default_dir, sizeof(default_dir), "/tmp/hypryou-%s/sockets", user);
+static char *join_args(char *argv[], int start, int end)
+{
+    size_t length = 1;
+    for (int i = start; i < end; ++i)
+    {
+        length += strlen(argv[i]) + 1;
+    }
 
-        base_dir = default_dir;
+    char *command = calloc(length, 1);
+    if (!command)
+    {
+        perror("calloc");
+        exit(1);
     }
+    for (int i = start; i < end; ++i)
+    {
+        strcat(command, argv[i]);
+        if (i < end - 1)
+        {
+            strcat(command, " ");
+        }
+    }
+    return command;
+}
 
-    char socket_path[BUFFER_SIZE];
-    if (snprintf(socket_path, sizeof(socket_path), "%s/%s", base_dir, instance) >= (int)sizeof(socket_path))
+static void read_stdin_commands(Commands *commands)
+{
+    char *line = NULL;
+    size_t capacity = 0;
+    ssize_t length;
+    while ((length = getline(&line, &capacity, stdin)) != -1)
     {
-        fprintf(stderr, "Socket path too long.\n");
-        return 1;
+        if (length > 0 && line[length - 1] == '\n')
+        {
+            line[--length] = '\0';
+        }
+        if (length > 0)
+        {
+            push_command(commands, strdup(line));
+        }
     }
+    free(line);
+}
 
-    if (argc < 2)
+static int write_all(int fd, const char *data, size_t length)
+{
+    while (length > 0)
     {
-        fprintf(stderr, "Usage: %s <command> [args...]\n", argv[0]);
-        return 1;
+        // Server closes the connection after reload and exit,
+        // MSG_NOSIGNAL makes it an error instead of killing the client
+        ssize_t written = send(fd, data, length, MSG_NOSIGNAL);
+        if (written < 0)
+        {
+            if (errno != EPIPE)
+            {
+                perror("write");
+            }
+            return -1;
+        }
+        data += written;
+        length -= (size_t)written;
     }
+    return 0;
+}
 
-    char command[BUFFER_SIZE] = {0};
-    int arg_start = 1;
-    if (argc > 1 && strcmp(argv[1], "--") == 0)
+static int reader_fill(Reader *reader)
+{
+    if (reader->start == reader->end)
     {
-        arg_start = 2;
+        reader->start = reader->end = 0;
     }
+    ssize_t num_read = read(reader->fd, reader->data + reader->end, BUFFER_SIZE - reader->end);
+    if (num_read < 0)
+    {
+        perror("read");
+    }
+    if (num_read <= 0)
+    {
+        return -1;
+    }
+    reader->end += (size_t)num_read;
+    return 0;
+}
 
-    for (int i = arg_start; i < argc; ++i)
+// Reads "<status> <size>\n" into status, returns size or -1 on EOF
+static long read_header(Reader *reader, char *status, size_t status_size)
+{
+    char header[64];
+    size_t length = 0;
+    for (;;)
     {
-        if (strlen(command) + strlen(argv[i]) + 1 >= BUFFER_SIZE)
+        if (reader->start == reader->end && reader_fill(reader) < 0)
         {
-            fprintf(stderr, "Command too long.\n");
-            return 1;
+            return -1;
         }
-        strncat(command, argv[i], BUFFER_SIZE - strlen(command) - 1);
-        if (i < argc - 1)
+        char c = reader->data[reader->start++];
+        if (c == '\n')
         {
-            strncat(command, " ", BUFFER_SIZE - strlen(command) - 1);
+            break;
         }
+        if (length >= sizeof(header) - 1)
+        {
+            return -1;
+        }
+        header[length++] = c;
+    }
+    header[length] = '\0';
+
+    char *separator = strchr(header, ' ');
+    if (!separator)
+    {
+        return -1;
     }
+    *separator = '\0';
+    snprintf(status, status_size, "%s", header);
+    return strtol(separator + 1, NULL, 10);
+}
 
-    sockfd = socket(AF_UNIX, SOCK_STREAM, 0);
+static int print_payload(Reader *reader, long size)
+{
+    char last = '\n';
+    while (size > 0)
+    {
+        if (reader->start == reader->end && reader_fill(reader) < 0)
+        {
+            return -1;
+        }
+        size_t available = reader->end - reader->start;
+        size_t chunk = (size_t)size < available ? (size_t)size : available;
+        fwrite(reader->data + reader->start, 1, chunk, stdout);
+        last = reader->data[reader->start + chunk - 1];
+        reader->start += chunk;
+        size -= (long)chunk;
+    }
+    if (last != '\n')
+    {
+        putchar('\n');
+    }
+    return 0;
+}
+
+static int connect_socket(const char *socket_path)
+{
+    struct sockaddr_un addr;
+    int sockfd = socket(AF_UNIX, SOCK_STREAM, 0);
     if (sockfd == -1)
     {
         perror("socket");
-        return 1;
+        return -1;
     }
 
     memset(&addr, 0, sizeof(struct sockaddr_un));
@@ -81,7 +203,7 @@ int main(int argc, char *argv[])
     {
         fprintf(stderr, "Socket path too long for sockaddr_un.\n");
         close(sockfd);
-        return 1;
+        return -1;
     }
 
     strncpy(addr.sun_path, socket_path, sizeof(addr.sun_path) - 1);
@@ -92,13 +214,17 @@ int main(int argc, char *argv[])
         perror("connect");
         fprintf(stderr, "Failed to connect to socket: %s\n", socket_path);
         close(sockfd);
-        return 1;
+        return -1;
     }
+    return sockfd;
+}
 
-    if (send(sockfd, command, strlen(command), 0) == -1)
+// Old protocol, used for subscribe which streams until it's closed
+static int run_stream(int sockfd, const char *command)
+{
+    char buffer[BUFFER_SIZE];
+    if (write_all(sockfd, command, strlen(command)) < 0)
     {
-        perror("send");
-        close(sockfd);
         return 1;
     }
 
@@ -107,6 +233,8 @@ int main(int argc, char *argv[])
     {
         buffer[num_read] = '\0';
         fputs(buffer, stdout);
+        // subscribe keeps streaming, don't hold lines in the stdio buffer
+        fflush(stdout);
     }
     if (num_read < 0)
     {
@@ -116,7 +244,140 @@ int main(int argc, char *argv[])
     {
         putchar('\n');
     }
+    return 0;
+}
+
+static int run_framed(int sockfd, Commands *commands)
+{
+    // Every response is read before the next command is sent,
+    // so a long batch can't fill socket buffers in both directions
+    if (write_all(sockfd, PROTOCOL_PREFIX, strlen(PROTOCOL_PREFIX)) < 0)
+    {
+        return 1;
+    }
+
+    int exit_code = 0;
+    Reader reader = {.fd = sockfd};
+    char status[16];
+    for (size_t i = 0; i < commands->count; ++i)
+    {
+        char header[32];
+        size_t length = strlen(commands->items[i]);
+        int header_length = snprintf(header, sizeof(header), "%zu\n", length);
+        if (write_all(sockfd, header, (size_t)header_length) < 0 ||
+            write_all(sockfd, commands->items[i], length) < 0)
+        {
+            // reload and exit close the connection, the rest wasn't run
+            return 1;
+        }
+
+        long size = read_header(&reader, status, sizeof(status));
+        if (size < 0 || print_payload(&reader, size) < 0)
+        {
+            return 1;
+        }
+        fflush(stdout);
+        if (strcmp(status, "ok") != 0)
+        {
+            exit_code = 1;
+        }
+    }
+    // Everything was answered, it doesn't matter if the server is gone
+    write_all(sockfd, "0\n", 2);
+    return exit_code;
+}
+
+int main(int argc, char *argv[])
+{
+    const char *instance = getenv("HYPRLAND_INSTANCE_SIGNATURE");
+    if (!instance)
+    {
+        fprintf(stderr, "HYPRLAND_INSTANCE_SIGNATURE is not set.\n");
+        return 1;
+    }
+
+    const char *base_dir = getenv("HYPRYOU_SOCKET_DIR");
+    if (!base_dir) {
+        const char *user = getenv("USER");
+        if (!user) {
+            user = "unknown";
+        }
+
+        static char default_dir[256];
+        snprintf(default_dir, sizeof(default_dir), "/tmp/hypryou-%s/sockets", user);
+
+        base_dir = default_dir;
+    }
+
+    char socket_path[BUFFER_SIZE];
+    if (snprintf(socket_path, sizeof(socket_path), "%s/%s", base_dir, instance) >= (int)sizeof(socket_path))
+    {
+        fprintf(stderr, "Socket path too long.\n");
+        return 1;
+    }
+
+    if (argc < 2)
+    {
+        fprintf(stderr, "Usage: %s <command> [args...] [\";\" <command> [args...]]...\n", argv[0]);
+        fprintf(stderr, "       %s - (commands from stdin, one per line)\n", argv[0]);
+        return 1;
+    }
+
+    int arg_start = 1;
+    if (argc > 1 && strcmp(argv[1], "--") == 0)
+    {
+        arg_start = 2;
+    }
+
+    Commands commands = {0};
+    if (arg_start == argc - 1 && strcmp(argv[arg_start], "-") == 0)
+    {
+        read_stdin_commands(&commands);
+    }
+    else
+    {
+        int start = arg_start;
+        for (int i = arg_start; i <= argc; ++i)
+        {
+            if (i == argc || strcmp(argv[i], ";") == 0)
+            {
+                if (i > start)
+                {
+                    push_command(&commands, join_args(argv, start, i));
+                }
+                start = i + 1;
+            }
+        }
+    }
+    if (commands.count == 0)
+    {
+        fprintf(stderr, "No commands to send.\n");
+        return 1;
+    }
+
+    int sockfd = connect_socket(socket_path);
+    if (sockfd < 0)
+    {
+        return 1;
+    }
+
+    int exit_code;
+    const char *first = commands.items[0];
+    if (commands.count == 1 && strncmp(first, "subscribe", 9) == 0 &&
+        (first[9] == ' ' || first[9] == '\0'))
+    {
+        exit_code = run_stream(sockfd, commands.items[0]);
+    }
+    else
+    {
+        exit_code = run_framed(sockfd, &commands);
+    }
 
     close(sockfd);
-    return 0;
+    for (size_t i = 0; i < commands.count; ++i)
+    {
+        free(commands.items[i]);
+    }
+    free(commands.items);
+    return exit_code;
 }
@@ -1,4 +1,7 @@
 # File with things to do before importing everything
-# Maybe will be useful in the future
 import time
 START = time.perf_counter()
+from utils.importtime import import_timer  # noqa: E402
+
+# Report is written to cache dir after start
+import_timer.install()
@@ -53,6 +53,7 @@ default_settings: dict[str, t.Any] = {
     "wallpaper": f"{ASSETS_DIR}/default_wallpaper.jpg",
     "separated_workspaces": False,
     "one_popup_at_time": True,
+    "popups_policy": "idle",
     "power_menu_cancel_button": True,
     "secure_cliphist": False,
     "floating_sidebar": False,
@@ -181,7 +182,7 @@ class Settings:
         "_signals", "_initialized",
         "_values", "_allow_saving",
         "_file_dict", "_views",
-        "mutable"
+        "mutable", "_unpacked"
     )
     _instance: t.Optional['Settings'] = None
 
@@ -198,6 +199,8 @@ class Settings:
             self._allow_saving = False
             self._file_dict: dict[str, t.Any] = {}
             self._views: dict[str, SettingsView] = {}
+            # key -> (ref version, plain value, is default)
+            self._unpacked: dict[str, tuple[int, t.Any, bool]] = {}
             self.mutable = True
             self.sync()
             self._allow_saving = True
@@ -269,11 +272,13 @@ class Settings:
             _dict[key] = value
 
         for key, ref in self._values.items():
-            if (
-                not (value := ref.unpack()) == default_settings[key]
-                or key in self._file_dict
-            ):
-                _dict[key] = value
+            cached = self._unpacked.get(key)
+            if cached is None or cached[0] != ref.version:
+                value = ref.unpack()
+                cached = (ref.version, value, value == default_settings[key])
+                self._unpacked[key] = cached
+            if not cached[2] or key in self._file_dict:
+                _dict[key] = cached[1]
         return _dict
 
     def reset(self, key: str) -> None:
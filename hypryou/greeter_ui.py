@@ -11,6 +11,8 @@ import logging
 import typing as t
 from utils.service import Service, AsyncService
 from config import ASSETS_DIR, Settings, get_version, HOME
+from config import APP_CACHE_DIR
+from utils.importtime import import_timer
 import time
 from enum import IntEnum
 import src.widget as widget
@@ -628,10 +630,22 @@ class HyprYouGreeter(gtk.Application):
             f"{int((APP_START - START) * 1000)}ms + " +
             f"{int((time.perf_counter() - APP_START) * 1000)}ms"
         )
+        save_import_report()
         self.release()
         await asyncio.gather(*self.tasks)
 
 
+def save_import_report() -> None:
+    import_timer.uninstall()
+    try:
+        os.makedirs(APP_CACHE_DIR, exist_ok=True)
+        import_timer.write_report(
+            os.path.join(APP_CACHE_DIR, "greeter-importtime.log")
+        )
+    except OSError as e:
+        logger.warning("Couldn't write import time report: %s", e)
+
+
 def init() -> None:
     setup_logger(logging.DEBUG if __debug__ else logging.INFO)
 
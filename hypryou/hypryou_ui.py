@@ -16,11 +16,16 @@ import types
 import utils.colors
 from utils.styles import apply_css
 from utils.logger import logger, setup_logger
+from utils.latency import loop_monitor, sample_stack
+from utils.importtime import import_timer
+from utils.trace import tracer
+from src.widget import PopupRegistry, PopupFactory
 from src.variables import Globals
 from config import Settings, ASSETS_DIR, makedirs, APP_CACHE_DIR
 
 from gi.events import GLibEventLoopPolicy  # type: ignore[import-untyped]
 import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from utils.handler import set_fatal_handler, ExitSignals
 from utils.handler import exit_error, exit_hung
 
@@ -37,7 +42,7 @@ from src.services.idle_inhibitor import IdleInhibitorService
 from src.services.apps import AppsService
 from src.services.hyprland_config import HyprlandConfigService
 from src.services.state import StateService
-from src.services.state import save_state, restore_state
+from src.services.state import save_state, restore_state, load_state
 from src.services.upower import UPowerService
 from src.services.idle import ScreenSaverService
 from src.services.login1 import Login1ManagerService
@@ -99,22 +104,22 @@ services: tuple[AsyncService | Service, ...] = (
     BluetoothAgentService()
 )
 
-popups_types = (
-    TrayWindow,
-    SidebarWindow,
-    AppsWindow,
-    PlayersWindow,
-    ClipHistoryWindow,
-    PowerMenuWindow,
-    BrightnessWindow,
-    AudioWindow,
-    MicsWindow,
-    InfoWindow,
-    ClientsWindow,
-    EmojisWindow,
-    KeybindsWindow,
-    CalendarWindow
-)
+popups_types: dict[str, PopupFactory] = {
+    "tray": TrayWindow,
+    "sidebar": SidebarWindow,
+    "apps_menu": AppsWindow,
+    "players": PlayersWindow,
+    "cliphist": ClipHistoryWindow,
+    "power_menu": PowerMenuWindow,
+    "brightness": BrightnessWindow,
+    "audio": AudioWindow,
+    "mics": MicsWindow,
+    "info": InfoWindow,
+    "clients": ClientsWindow,
+    "emojis": EmojisWindow,
+    "keybindings": KeybindsWindow,
+    "calendar": CalendarWindow
+}
 
 windows_types = (
     Bar,
@@ -131,6 +136,58 @@ module_register_types: dict[str, RegisterType] = {
     "bluetooth_pin": PinDialog.register
 }
 
+type InitMode = t.Literal["main", "thread", "async"]
+
+
+class ServiceTiming(t.NamedTuple):
+    name: str
+    mode: InitMode
+    began: float
+    ended: float
+
+
+def format_timings(timings: list[ServiceTiming], started: float) -> str:
+    width = max([len("service"), *(len(timing.name) for timing in timings)])
+    lines = [f"{"service":<{width}}  mode     start    took"]
+    for timing in sorted(timings, key=lambda x: x.ended - x.began):
+        start = (timing.began - started) * 1000
+        took = (timing.ended - timing.began) * 1000
+        lines.append(
+            f"{timing.name:<{width}}  {timing.mode:<6}" +
+            f" {start:6.1f}ms {took:6.1f}ms"
+        )
+    return "\n".join(lines)
+
+
+def check_dependencies(
+    services: tuple[AsyncService | Service, ...]
+) -> None:
+    registered = {type(service) for service in services}
+    visiting: set[type[AsyncService | Service]] = set()
+    done: set[type[AsyncService | Service]] = set()
+
+    def visit(service_type: type[AsyncService | Service]) -> None:
+        if service_type in done:
+            return
+        if service_type in visiting:
+            raise RuntimeError(
+                f"Dependency cycle at service {service_type.__name__}"
+            )
+        visiting.add(service_type)
+        for dependency in service_type.depends:
+            if dependency not in registered:
+                logger.warning(
+                    "Service %s depends on %s which isn't registered",
+                    service_type.__name__, dependency.__name__
+                )
+                continue
+            visit(dependency)
+        visiting.discard(service_type)
+        done.add(service_type)
+
+    for service_type in registered:
+        visit(service_type)
+
 
 class HyprYou(gtk.Application):
     __gtype_name__ = "HyprYou"
@@ -144,33 +201,90 @@ class HyprYou(gtk.Application):
         asyncio.create_task(self.start_app())
         Globals.app = self
 
-    async def init_services(self) -> None:
-        for service in services:
-            try:
-                if __debug__:
-                    logger.debug(
-                        "Starting service %s",
-                        type(service).__name__
-                    )
-                if isinstance(service, AsyncService):
+    async def init_service(
+        self,
+        service: AsyncService | Service,
+        tasks: dict[type[AsyncService | Service], asyncio.Task[None]],
+        executor: ThreadPoolExecutor,
+        timings: list[ServiceTiming]
+    ) -> None:
+        name = type(service).__name__
+        dependencies = [
+            tasks[dependency] for dependency in service.depends
+            if dependency in tasks
+        ]
+        if dependencies:
+            # Failed dependency already called exit_error
+            await asyncio.wait(dependencies)
+
+        began = time.perf_counter()
+        mode: InitMode = "main"
+        span_name = f"{name}.app_init"
+        try:
+            if __debug__:
+                logger.debug("Starting service %s", name)
+            if isinstance(service, AsyncService):
+                mode = "async"
+                with tracer.async_span(span_name, "service"):
                     await service.app_init()
-                elif isinstance(service, Service):
-                    service.app_init()
-                else:
-                    logger.error(
-                        "Unknown type of service: %s; Couldn't init.",
-                        service
+            elif isinstance(service, Service):
+                def app_init() -> None:
+                    with tracer.span(span_name, "service"):
+                        service.app_init()
+
+                if service.threaded_init:
+                    mode = "thread"
+                    await asyncio.get_running_loop().run_in_executor(
+                        executor, app_init
                     )
-            except Exception as e:
-                logger.critical(
-                    "Couldn't initialize service %s.",
-                    type(service).__name__, exc_info=e
+                else:
+                    app_init()
+            else:
+                logger.error(
+                    "Unknown type of service: %s; Couldn't init.",
+                    service
                 )
-                exit_error()
+        except Exception as e:
+            logger.critical(
+                "Couldn't initialize service %s.",
+                name, exc_info=e
+            )
+            exit_error()
+        finally:
+            timings.append(ServiceTiming(
+                name, mode, began, time.perf_counter()
+            ))
+
+    async def init_services(self) -> None:
+        if __debug__:
+            check_dependencies(services)
+
+        started = time.perf_counter()
+        timings: list[ServiceTiming] = []
+        tasks: dict[type[AsyncService | Service], asyncio.Task[None]] = {}
+        with ThreadPoolExecutor(
+            max_workers=4, thread_name_prefix="hypryou-init"
+        ) as executor:
+            # Tasks don't run before the next await, so all are known
+            for service in services:
+                tasks[type(service)] = asyncio.create_task(
+                    self.init_service(service, tasks, executor, timings)
+                )
+            await asyncio.gather(*tasks.values())
+
+        logger.info(
+            "Services initialized in %dms\n%s",
+            (time.perf_counter() - started) * 1000,
+            format_timings(timings, started)
+        )
 
     async def async_service_wrapper(self, service: AsyncService) -> None:
         try:
-            await service.start()
+            # Most of them serve forever, span stays open in the trace
+            with tracer.async_span(
+                f"{type(service).__name__}.start", "service"
+            ):
+                await service.start()
         except Exception as e:
             logger.critical(
                 "Service crashed on task: %s",
@@ -181,7 +295,8 @@ class HyprYou(gtk.Application):
 
     def sync_service_wrapper(self, service: Service) -> None:
         try:
-            service.start()
+            with tracer.span(f"{type(service).__name__}.start", "service"):
+                service.start()
         except Exception as e:
             logger.critical(
                 "Service crashed on task: %s",
@@ -205,11 +320,14 @@ class HyprYou(gtk.Application):
                 )
 
     async def start_app(self) -> None:
-        await self.init_services()
+        load_state()
+        with tracer.async_span("init_services", "startup"):
+            await self.init_services()
 
-        cache_ok = utils.colors.generate_by_settings()
-        if cache_ok:
-            apply_css()
+        with tracer.span("styles", "startup"):
+            cache_ok = utils.colors.generate_by_settings()
+            if cache_ok:
+                apply_css()
 
         self.tasks: list[asyncio.Task[t.Any]] = []
         await self.start_services()
@@ -222,31 +340,30 @@ class HyprYou(gtk.Application):
         self.monitors.connect("items-changed", self.update_monitors)
 
         self.update_monitors()
-        for window_type in popups_types:
-            try:
-                if __debug__:
-                    logger.debug(
-                        "Creating window %s",
-                        window_type.__name__
-                    )
-                self.add_window(window_type(self))
-            except Exception as e:
-                logger.error(
-                    "Couldn't add window %s.",
-                    window_type.__name__, exc_info=e
-                )
+        self.popups = PopupRegistry(self)
+        for name, factory in popups_types.items():
+            self.popups.register(name, factory)
+        if Settings().get("popups_policy") == "eager":
+            self.popups.start("eager")
 
-        for key, register_method in module_register_types.items():
-            returned = register_method(self)
-            self.registered[key] = returned
+        with tracer.span("modules", "startup"):
+            for key, register_method in module_register_types.items():
+                returned = register_method(self)
+                self.registered[key] = returned
 
         logger.info(
             "Started in " +
             f"{int((APP_START - START) * 1000)}ms + " +
             f"{int((time.perf_counter() - APP_START) * 1000)}ms"
         )
+        save_import_report("importtime.log")
+        if tracer.enabled:
+            save_startup_trace()
         self.release()
         glib.timeout_add(100, restore_state)
+        popups_policy = Settings().get("popups_policy")
+        if popups_policy != "eager":
+            self.popups.start(popups_policy)
         await asyncio.gather(*self.tasks)
 
     def get_monitors(self) -> gio.ListModel:
@@ -293,14 +410,50 @@ class HyprYou(gtk.Application):
                 windows: list[gtk.ApplicationWindow] = []
                 for window_type in windows_types:
                     try:
-                        windows.append(window_type(self, monitor, i))
+                        with tracer.span(
+                            window_type.__name__, "window",
+                            {"monitor": i} if tracer.enabled else None
+                        ):
+                            windows.append(window_type(self, monitor, i))
                     except Exception as e:
                         logger.error(
                             "Couldn't add window %s.",
                             window_type.__name__, exc_info=e
                         )
                 self.windows[monitor] = windows
-                self.corners[monitor] = Corners(self, monitor)
+                with tracer.span("Corners", "window"):
+                    self.corners[monitor] = Corners(self, monitor)
+
+
+def save_import_report(filename: str) -> None:
+    import_timer.uninstall()
+    try:
+        import_timer.write_report(os.path.join(APP_CACHE_DIR, filename))
+    except OSError as e:
+        logger.warning("Couldn't write import time report: %s", e)
+    if __debug__:
+        for record in import_timer.slowest(5):
+            logger.debug(
+                "Slow import %s: %dms",
+                record.name, record.self_time * 1000
+            )
+
+
+def save_startup_trace() -> None:
+    # Same clock as perf_counter, so START fits into the trace
+    tracer.complete(
+        "imports", "startup", START * 1_000_000,
+        (APP_START - START) * 1_000_000
+    )
+    tracer.complete(
+        "startup", "startup", START * 1_000_000,
+        (time.perf_counter() - START) * 1_000_000
+    )
+    try:
+        path = tracer.write(tracer.default_path("startup"))
+        logger.info("Startup trace written to %s", path)
+    except OSError as e:
+        logger.warning("Couldn't write startup trace: %s", e)
 
 
 def get_dir_size(path: str) -> int:
@@ -363,31 +516,48 @@ def main() -> None:
 
 def watchdog(timeout: float) -> None:
     event = threading.Event()
+    main_thread_id = threading.main_thread().ident
+    assert main_thread_id is not None
+    handled_at = 0.0
 
     def ping() -> bool:
+        nonlocal handled_at
+        handled_at = time.perf_counter()
         event.set()
         return False
 
     while True:
         event.clear()
-        glib.idle_add(ping, priority=glib.PRIORITY_HIGH)
-        if not event.wait(timeout):
-            logger.setLevel(logging.DEBUG)
-            logger.critical(
-                "Watchdog error: Loop did not response in time."
-            )
-
-            frames = sys._current_frames()
-            for thread_id, frame in frames.items():
-                logger.debug(
-                    "Thread %s:\n%s",
-                    thread_id,
-                    "".join(traceback.format_stack(frame))
+        posted_at = time.perf_counter()
+        # Default priority, so pings don't preempt events of the loop
+        glib.idle_add(ping, priority=glib.PRIORITY_DEFAULT)
+
+        stack: str | None = None
+        if not event.wait(loop_monitor.threshold):
+            # Sampled while it's still blocked, after it's too late
+            stack = sample_stack(main_thread_id)
+            if not event.wait(max(timeout - loop_monitor.threshold, 0)):
+                logger.setLevel(logging.DEBUG)
+                logger.critical(
+                    "Watchdog error: Loop did not response in time."
                 )
 
-            exit_hung()
-            exit(1)
-        time.sleep(timeout)
+                frames = sys._current_frames()
+                for thread_id, frame in frames.items():
+                    logger.debug(
+                        "Thread %s:\n%s",
+                        thread_id,
+                        "".join(traceback.format_stack(frame))
+                    )
+
+                exit_hung()
+                exit(1)
+
+        delay = handled_at - posted_at
+        loop_monitor.record(delay)
+        if stack is not None:
+            loop_monitor.record_slow(delay, stack)
+        time.sleep(loop_monitor.interval)
 
 
 def start_watchdog(timeout: float = 5.0) -> threading.Thread:
@@ -417,6 +587,8 @@ def handle_fatal_signal(signum: int, frame: types.FrameType | None) -> None:
 
     if signum == ExitSignals.SIGERROR or signum == ExitSignals.SIGHUNG:
         save_state()
+    elif signum == ExitSignals.SIGRELOAD:
+        save_state(crashed=False)
     if signum != ExitSignals.SIGRELOAD and frame is not None:
         stack_str = ''.join(traceback.format_stack(frame))
         logger.debug("Stack at signal:\n%s", stack_str)
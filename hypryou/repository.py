@@ -1,18 +1,29 @@
+import typing as t
 import versions
+from utils.lazy import lazy_gi
 
 from gi.repository import Gtk as gtk
 from gi.repository import Gtk4LayerShell as layer_shell
-from gi.repository import Gtk4SessionLock as session_lock
 from gi.repository import Gdk as gdk
 from gi.repository import Gio as gio
 from gi.repository import GLib as glib
 from gi.repository import Gsk as gsk
-from gi.repository import GdkPixbuf as gdk_pixbuf
 from gi.repository import GObject as gobject
 from gi.repository import Pango as pango
-from gi.repository import NM as nm  # type: ignore [attr-defined]
-from gi.repository import AstalBluetooth as bluetooth
-from gi.repository import AstalWp as wp
+
+if t.TYPE_CHECKING:
+    from gi.repository import Gtk4SessionLock as session_lock
+    from gi.repository import GdkPixbuf as gdk_pixbuf
+    from gi.repository import NM as nm  # type: ignore [attr-defined]
+    from gi.repository import AstalBluetooth as bluetooth
+    from gi.repository import AstalWp as wp
+else:
+    # Loaded on first use, most of them aren't needed to show the bar
+    session_lock = lazy_gi("Gtk4SessionLock", "1.0")
+    gdk_pixbuf = lazy_gi("GdkPixbuf")
+    nm = lazy_gi("NM", "1.0")
+    bluetooth = lazy_gi("AstalBluetooth", "0.1")
+    wp = lazy_gi("AstalWp", "0.1")
 
 __all__ = [
     "versions", "gtk", "layer_shell",
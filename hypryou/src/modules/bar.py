@@ -75,27 +75,22 @@ class Workspaces(gtk.Box):
 
         self.update_buttons()
 
-        self.ref_handlers: dict[Ref[t.Any], int] = {
-            active_workspace: active_workspace.watch(self.update_active),
-            workspace_ids: workspace_ids.watch(self.update_empty),
-            monitor_ids: monitor_ids.watch(self.update_buttons)
-        }
-        self.settings_handlers = (
-            self.settings.watch(
-                "separated_workspaces", self.update_buttons, False
-            ),
-            self.settings.watch(
-                "hide_empty_workspaces", self.on_hide_empty, False
-            ),
+        self.scope = widget.scope_for(self)
+        self.scope.watch(active_workspace, self.update_active)
+        self.scope.watch(workspace_ids, self.update_empty)
+        self.scope.watch(monitor_ids, self.update_buttons)
+        self.scope.watch_setting(
+            "separated_workspaces", self.update_buttons, False
+        )
+        self.scope.watch_setting(
+            "hide_empty_workspaces", self.on_hide_empty, False
         )
 
         self._last_scroll = 0.0
         self._scroll = gtk.EventControllerScroll.new(
             gtk.EventControllerScrollFlags.VERTICAL
         )
-        self._scroll_connection = self._scroll.connect(
-            "scroll", self.on_scroll
-        )
+        self.scope.connect(self._scroll, "scroll", self.on_scroll)
         self.add_controller(self._scroll)
 
     def on_hide_empty(self, new_value: bool) -> None:
@@ -137,15 +132,9 @@ class Workspaces(gtk.Box):
             self.remove(button)
         self.buttons.clear()
 
-        self._scroll.disconnect(self._scroll_connection)
+        self.scope.close()
         self.remove_controller(self._scroll)
-
-        for handler in self.settings_handlers:
-            self.settings.unwatch(handler)
-
         self._scroll = None  # type: ignore
-        for ref, handler_id in self.ref_handlers.items():
-            ref.unwatch(handler_id)
 
     def on_scroll(
         self,
@@ -248,7 +237,10 @@ class Player(gtk.Box):
             valign=gtk.Align.CENTER
         )
 
-        self.player_handlers: dict[MprisPlayer, int] = {}
+        self.scope = widget.scope_for(self)
+        # Watcher of current player only, cleared when it changes
+        self.player_scope = widget.Scope("Player.current")
+        self.watched_player: MprisPlayer | None = None
 
         image = gtk.Box(
             css_classes=("image",),
@@ -275,7 +267,6 @@ class Player(gtk.Box):
         handlers = [self.previous, self.play_pause, self.next]
 
         self.buttons: list[gtk.Button] = []
-        self.conns: dict[gtk.Button, int] = {}
 
         for icon, css_class, handler in zip(icons, classes, handlers):
             btn = gtk.Button(
@@ -283,7 +274,7 @@ class Player(gtk.Box):
                 css_classes=(css_class,)
             )
             btn_box.append(btn)
-            self.conns[btn] = btn.connect("clicked", handler)
+            self.scope.connect(btn, "clicked", handler)
             self.buttons.append(btn)
 
         self.children = (
@@ -302,13 +293,13 @@ class Player(gtk.Box):
         )
 
         self.last_changed = LastChanged()
-        current_player.watch(self.on_changed)
+        self.scope.watch(current_player, self.on_changed)
         self.on_changed()
 
         self.click_gesture = gtk.GestureClick.new()
         self.click_gesture.set_button(0)
-        self.gesture_conn = (
-            self.click_gesture.connect("released", self.on_click_released)
+        self.scope.connect(
+            self.click_gesture, "released", self.on_click_released
         )
         self.add_controller(self.click_gesture)
 
@@ -461,22 +452,21 @@ class Player(gtk.Box):
         if not current:
             return
 
-        for player, handler in list(self.player_handlers.items()):
-            if player is not current:
-                player.unwatch(handler)
-                del self.player_handlers[player]
-
-        if current not in self.player_handlers.keys():
-            handler_id = current.watch("changed", self.on_changed)
-            self.player_handlers[current] = handler_id
+        if current is not self.watched_player:
+            self.player_scope.clear()
+            self.player_scope.watch_signal(
+                current, "changed", self.on_changed
+            )
+            self.watched_player = current
 
     def on_changed(self, *args: t.Any) -> None:
         self.update_watcher()
         self.update_all()
 
     def destroy(self) -> None:
-        for player, handler in self.player_handlers.items():
-            player.unwatch(handler)
+        self.player_scope.close()
+        self.scope.close()
+        self.watched_player = None
 
         for btn in self.buttons:
             btn_child = btn.get_child()
@@ -486,10 +476,6 @@ class Player(gtk.Box):
             self.children[2].remove(btn)
         for child in self.children:
             self.remove(child)
-        for _widget, conn in self.conns.items():
-            _widget.disconnect(conn)
-
-        self.click_gesture.disconnect(self.gesture_conn)
         self.remove_controller(self.click_gesture)
 
         self.children = None  # type: ignore
@@ -1044,24 +1030,18 @@ class Bar(widget.LayerWindow):
             end_widget=ModulesRight(monitor, monitor_id)
         )
 
-        self.ref_handlers: dict[Ref[t.Any], int] = {
-            hyprland.active_client: hyprland.active_client.watch(
-                self.update_hidden
-            ),
-            _opened_windows: _opened_windows.watch(self.update_hidden)
-        }
+        self.scope.watch(hyprland.active_client, self.update_hidden)
+        self.scope.watch(_opened_windows, self.update_hidden)
         self.settings = Settings()
-        self.settings_handlers = {
-            self.settings.watch(
-                "old_fullscreen_behavior", self.update_hidden, False
-            ),
-            self.settings.watch(
-                "floating_bar", self.change_floating, True
-            ),
-            self.settings.watch(
-                "hyprland.gaps_out", self.change_floating, False
-            )
-        }
+        self.scope.watch_setting(
+            "old_fullscreen_behavior", self.update_hidden, False
+        )
+        self.scope.watch_setting(
+            "floating_bar", self.change_floating, True
+        )
+        self.scope.watch_setting(
+            "hyprland.gaps_out", self.change_floating, False
+        )
         self.old_fullscreen_state: bool | None = None
         self.visible_timeout: int = -1
 
@@ -1154,8 +1134,6 @@ class Bar(widget.LayerWindow):
         box.set_end_widget(None)
         self.set_child(None)
         self.close()
-        for ref, handler in self.ref_handlers.items():
-            ref.unwatch(handler)
         super().destroy()
 
 
@@ -5,6 +5,7 @@ from utils.logger import logger
 from src.services.hyprland import clients, Client
 from src.services.hyprland import acquire_clients, release_clients
 import src.services.hyprland as hyprland
+from utils.ref import KeyDelta, ListDelta
 import typing as t
 import asyncio
 
@@ -45,23 +46,32 @@ class ClientItem(gtk.Box):
             self.title,
             self.workspace
         )
-        self.on_changed()
+        self.on_title_changed()
+        self.on_workspace_changed()
         glib.idle_add(self.update_image)
         for child in self.children:
             self.append(child)
 
+        self.scope = widget.scope_for(self)
         self.click_gesture = gtk.GestureClick.new()
         self.click_gesture.set_button(0)
-        self.gesture_conn = (
-            self.click_gesture.connect("released", self.on_click_released)
+        self.scope.connect(
+            self.click_gesture, "released", self.on_click_released
         )
         self.add_controller(self.click_gesture)
 
-        self.handler_id = self._item.watch("changed", self.on_changed)
+        self.scope.watch_signal(
+            self._item, "changed::title", self.on_title_changed
+        )
+        self.scope.watch_signal(
+            self._item, "changed::workspace", self.on_workspace_changed
+        )
 
-    def on_changed(self, *args: t.Any) -> None:
+    def on_title_changed(self, *args: t.Any) -> None:
         self.title.set_label(self._item.title)
         self.set_tooltip_text(self._item.title)
+
+    def on_workspace_changed(self, *args: t.Any) -> None:
         self.workspace.set_label(str(self._item.workspace_id))
 
     def on_click_released(
@@ -104,9 +114,8 @@ class ClientItem(gtk.Box):
     def destroy(self) -> None:
         for child in self.children:
             self.remove(child)
-        self.click_gesture.disconnect(self.gesture_conn)
+        self.scope.close()
         self.remove_controller(self.click_gesture)
-        self._item.unwatch(self.handler_id)
 
 
 class ClientsBox(gtk.ScrolledWindow):
@@ -137,7 +146,7 @@ class ClientsBox(gtk.ScrolledWindow):
             vscrollbar_policy=gtk.PolicyType.AUTOMATIC,
             hscrollbar_policy=gtk.PolicyType.NEVER
         )
-        self.handler_id = clients.watch(self.update_items)
+        self.handler_id = clients.watch_delta(self.on_delta)
         self.update_items(clients.value)
         if __debug__:
             weakref.finalize(
@@ -162,6 +171,39 @@ class ClientsBox(gtk.ScrolledWindow):
         self.no_items_label.set_reveal_child(len(self.items) == 0)
         self.sort_items()
 
+    def on_delta(self, delta: KeyDelta | ListDelta) -> None:
+        assert isinstance(delta, KeyDelta)
+        for key in delta.removed:
+            item = self.items.pop(key, None)
+            if item is not None:
+                item.destroy()
+                self.list.remove(item)
+
+        for key in delta.added:
+            _client = clients.value.get(key)
+            if _client is not None and key not in self.items:
+                client_widget = ClientItem(_client)
+                self.items[key] = client_widget
+                self.list.append(client_widget)
+
+        rebound = False
+        for key in delta.changed:
+            # Same address could be closed and opened again as a new Client
+            _client = clients.value.get(key)
+            item = self.items.get(key)
+            if _client is None or item is None or item._item is _client:
+                continue
+            item.destroy()
+            self.list.remove(item)
+            client_widget = ClientItem(_client)
+            self.items[key] = client_widget
+            self.list.append(client_widget)
+            rebound = True
+
+        self.no_items_label.set_reveal_child(len(self.items) == 0)
+        if delta.added or rebound:
+            self.sort_items()
+
     def sort_items(self) -> None:
         new_dict = dict(
             sorted(
@@ -189,7 +231,7 @@ class ClientsBox(gtk.ScrolledWindow):
         self.box.remove(self.no_items_label)
         self.items.clear()
         self.set_child(None)
-        clients.unwatch(self.handler_id)
+        clients.unwatch_delta(self.handler_id)
 
 
 class ClientsWindow(widget.LayerWindow):
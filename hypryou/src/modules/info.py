@@ -5,7 +5,7 @@ import weakref
 from utils.logger import logger
 from utils.styles import toggle_css_class
 import utils.system as system
-from utils.system import STATIC_SYSTEM_INFO as STATIC
+from utils.system import get_static_system_info
 
 ICON_SIZE = 22
 last_page: str | None = None
@@ -188,6 +188,7 @@ class SystemPage(gtk.Box):
 
         self.swap_row = InfoRow("Swap", "0 MB", False)
 
+        static = get_static_system_info()
         self.children = (
             self.cpu_usage,
             self.ram_usage,
@@ -196,10 +197,10 @@ class SystemPage(gtk.Box):
             gtk.Separator(
                 orientation=gtk.Orientation.HORIZONTAL
             ),
-            InfoRow("CPU", str(STATIC["cpu"])),
-            InfoRow("Memory", f"{STATIC["total_ram"]} MB"),
+            InfoRow("CPU", str(static["cpu"])),
+            InfoRow("Memory", f"{static["total_ram"]} MB"),
             self.swap_row,
-            InfoRow("Kernel", str(STATIC["kernel"]))
+            InfoRow("Kernel", str(static["kernel"]))
         )
 
         for child in self.children:
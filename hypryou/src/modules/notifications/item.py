@@ -78,7 +78,9 @@ class NotificationItem(gtk.Box):
         )
 
         self._cached_detected: t.Literal["critical", "messages"] | None = None
-        self.conns: dict[gtk.Widget, int] = {}
+        self.scope = widget.scope_for(self)
+        # Handlers of action buttons, cleared when they're recreated
+        self.actions_scope = widget.Scope("NotificationItem.actions")
 
         # Notification header
         self.header_box = gtk.Box(
@@ -124,14 +126,10 @@ class NotificationItem(gtk.Box):
             tooltip_text="Hide"
         ) if show_dismiss else None
 
-        self.conns[self.close] = self.close.connect(
-            "clicked", self.on_close
-        )
+        self.scope.connect(self.close, "clicked", self.on_close)
 
         if self.dismiss:
-            self.conns[self.dismiss] = self.dismiss.connect(
-                "clicked", self.on_dismiss
-            )
+            self.scope.connect(self.dismiss, "clicked", self.on_dismiss)
 
         self.info_box.append(self.app_icon)
         self.info_box.append(self.app_title)
@@ -193,7 +191,7 @@ class NotificationItem(gtk.Box):
             if child:
                 self.append(child)
 
-        self.handler_id = item.watch("changed", self.update_values)
+        self.scope.watch_signal(item, "changed", self.update_values)
         self.update_values()
 
     def get_detected_category(
@@ -274,6 +272,7 @@ class NotificationItem(gtk.Box):
             return
 
         actions = self.item.actions
+        self.actions_scope.clear()
         for button in self.action_buttons:
             self.actions_box.remove(button)
         self.action_buttons.clear()
@@ -285,8 +284,8 @@ class NotificationItem(gtk.Box):
                     css_classes=("action", "outlined"),
                     halign=gtk.Align.END
                 )
-                self.conns[button] = button.connect(
-                    "clicked",
+                self.actions_scope.connect(
+                    button, "clicked",
                     lambda *args, action=action[0]: self.on_action(action)
                 )
                 self.actions_box.append(button)
@@ -324,9 +323,8 @@ class NotificationItem(gtk.Box):
         if self.is_destroyed:
             return
         self.is_destroyed = True
-        self.item.unwatch(self.handler_id)
-        for _widget, conn in self.conns.items():
-            _widget.disconnect(conn)
+        self.actions_scope.close()
+        self.scope.close()
         for child in self.children:
             self.remove(child)
 
@@ -5,7 +5,6 @@ from src.modules.notifications.item import NotificationRevealer
 import typing as t
 from src.services.state import opened_windows, is_locked
 from src import widget
-from config import Settings
 
 T = t.TypeVar("T")
 
@@ -124,7 +123,7 @@ class Notifications(widget.LayerWindow):
         self.popups = NotificationPopups(self)
         self.set_child(self.popups)
 
-        self.gaps_out_handler = Settings().watch(
+        self.scope.watch_setting(
             "hyprland.gaps_out", self.on_gaps_out,
             True
         )
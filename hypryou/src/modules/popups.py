@@ -12,7 +12,6 @@ from src.services.audio import recorders
 import typing as t
 from src.services.state import opened_windows
 from src.services.upower import BatteryLevel, get_upower
-from config import Settings
 from math import ceil
 
 window_counter = Ref[dict[int, int]]({}, name="popup_counter")
@@ -349,21 +348,17 @@ class PopupsWindow(widget.LayerWindow):
 
         self.set_child(self.child)
 
-        self.handler = window_counter.watch(
-            self._update_visible
-        )
+        self.scope.watch(window_counter, self._update_visible)
         self._update_visible(window_counter.value)
 
         self.last_recorders_len = 0
-        self.gaps_out_handler = Settings().watch(
+        self.scope.watch_setting(
             "hyprland.gaps_out", self.on_gaps_out,
             True
         )
-        self.recorders_handler = recorders.watch(
-            self.on_recorders
-        )
+        self.scope.watch(recorders, self.on_recorders)
         self.last_upower_message = 0
-        self.upower_handler = get_upower().watch("changed", self.on_upower)
+        self.scope.watch_signal(get_upower(), "changed", self.on_upower)
         self.on_upower()
 
     def on_upower(self, *args: t.Any) -> None:
@@ -410,7 +405,5 @@ class PopupsWindow(widget.LayerWindow):
         if getattr(self, "brightness"):
             self.brightness.destroy()
         self.volume.destroy()
-        recorders.unwatch(self.recorders_handler)
-        get_upower().unwatch(self.upower_handler)
         del window_counter.value[self.num]
         super().destroy()
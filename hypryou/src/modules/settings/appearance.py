@@ -1,6 +1,7 @@
 from utils import colors
 from src.modules.settings.base import SwitchRowTemplate
 from src.modules.settings.base import SettingsBoolRow, SettingsTextRow
+from src.modules.settings.base import SettingsDropdownRow, DropdownItem
 from src.modules.settings.base import Category
 from src.modules.settings.base import int_kwargs, float_kwargs
 import typing as t
@@ -134,6 +135,16 @@ class AppearancePage(gtk.ScrolledWindow):
                 "Opening a popup closes the previous one",
                 "one_popup_at_time"
             ),
+            SettingsDropdownRow(
+                "Create popups",
+                "When popup windows are created, applies after reload",
+                "popups_policy",
+                items=[
+                    DropdownItem("eager", "At startup"),
+                    DropdownItem("idle", "After startup"),
+                    DropdownItem("on_demand", "When opened"),
+                ]
+            ),
             SettingsBoolRow(
                 "Hide empty workspaces",
                 "Don't show workspaces without windows",
@@ -3,7 +3,7 @@ from config import info, get_version
 import src.services.hyprland as hyprland
 import os
 import platform
-from utils.system import STATIC_SYSTEM_INFO as STATIC
+from utils.system import get_static_system_info
 from utils.system import get_swap_total
 import webbrowser
 
@@ -125,16 +125,17 @@ class InfoPage(gtk.ScrolledWindow):
         self.links_box.append(self.discord_button)
         self.links_box.append(self.kofi_button)
 
+        static = get_static_system_info()
         self.box_children = (
             InfoRow(),
             self.links_box,
             gtk.Separator(),
             Row("WM", f"Hyprland {hyprland.client.version}"),
-            Row("CPU", str(STATIC["cpu"])),
-            Row("Memory", f"{STATIC["total_ram"]} MB"),
+            Row("CPU", str(static["cpu"])),
+            Row("Memory", f"{static["total_ram"]} MB"),
             Row("Swap", f"{total_swap} MB"),
-            Row("Kernel", str(STATIC["kernel"])),
-            Row("Distro", str(STATIC["distro"])),
+            Row("Kernel", str(static["kernel"])),
+            Row("Distro", str(static["distro"])),
             Row("User", str(USER)),
             Row("Hostname", HOSTNAME),
             Row("Shell", SHELL),
@@ -329,7 +329,7 @@ class MonitorsPage(gtk.Box):
                 "clicked", self.save
             ),
             self.refresh_button: self.refresh_button.connect(
-                "clicked", self.sync
+                "clicked", self.refresh
             )
         }
 
@@ -344,8 +344,11 @@ class MonitorsPage(gtk.Box):
     def sync(self, *args: t.Any) -> None:
         asyncio.create_task(self.sync_async())
 
-    async def sync_async(self) -> None:
-        monitors = await hyprland.get_monitors()
+    def refresh(self, *args: t.Any) -> None:
+        asyncio.create_task(self.sync_async(force=True))
+
+    async def sync_async(self, force: bool = False) -> None:
+        monitors = await hyprland.get_monitors(force)
         for monitor in monitors:
             if monitor["name"] not in self.monitor_items.keys():
                 self.monitor_items[monitor["name"]] = DropdownItem(
@@ -359,8 +362,9 @@ class MonitorsPage(gtk.Box):
             monitor["name"]: monitor
             for monitor in monitors
         }
+        # Copied since update_setting changes them in place
         self.settings = {
-            monitor_setting["output"]: monitor_setting
+            monitor_setting["output"]: dict(monitor_setting)
             for monitor_setting in self._ref.unpack()
             if monitor_setting.get("output")
         }
@@ -389,7 +393,9 @@ class MonitorsPage(gtk.Box):
 
     def save(self, *args: t.Any) -> None:
         if not self._dialog:
-            self._ref.value = list(self.settings.values())
+            self._ref.value = [
+                dict(value) for value in self.settings.values()
+            ]
             self._dialog = YesNoDialog(self.on_dialog)
             self._dialog.present()
             self.set_sensitive(False)
@@ -431,9 +437,11 @@ class MonitorsPage(gtk.Box):
         self._dialog = None
         self.set_sensitive(True)
         if save:
-            self.sync()
+            self.refresh()
         else:
-            self._ref.value = list(self.original_settings.values())
+            self._ref.value = [
+                dict(value) for value in self.original_settings.values()
+            ]
 
     def on_monitor_enabled(self, row: SwitchRow, value: bool) -> None:
         self.update_setting("disabled", "1" if not value else "0")
@@ -1,16 +1,20 @@
 from __future__ import annotations
 
-from repository import gio
+from repository import gio, glib
 from utils_cy.levenshtein import compute_score
 from utils.service import Service
 from utils.logger import logger
 from utils.ref import Ref
+from utils.snapshot import snapshot
 from config import APP_CACHE_DIR, CACHE_DIR
 from os.path import join as pjoin
 import os.path as path
 import json
 import src.services.hyprland as hyprland
 import asyncio
+import threading
+import typing as t
+from src.services.desktop_entries import desktop_entries
 
 apps = Ref[list["Application"]]([], name="applications", delayed_init=True)
 frequents = Ref[dict[str, int]]({}, name="app_frequents", delayed_init=True)
@@ -40,19 +44,28 @@ def launch_detached(exec: str) -> None:
     )
 
 
+# Icon, exec, description, name, entry, keywords
+type DumpedApplication = tuple[
+    str | None, str | None, str | None, str, str | None, list[str]
+]
+
+
 class Application:
     def __init__(
         self,
-        app: gio.DesktopAppInfo
+        icon: str | None,
+        exec: str | None,
+        description: str | None,
+        name: str,
+        entry: str | None,
+        keywords: list[str]
     ) -> None:
-        self.app_info = app
-
-        self.icon = app.get_string("Icon")
-        self.exec = app.get_string("Exec")
-        self.description = app.get_description()
-        self.name = app.get_name()
-        self.entry = app.get_id()
-        self.keywords = app.get_keywords()
+        self.icon = icon
+        self.exec = exec
+        self.description = description
+        self.name = name
+        self.entry = entry
+        self.keywords = keywords
         self.frequency = 0
         self.score = 1.0
 
@@ -63,6 +76,23 @@ class Application:
             self.name: 0.1
         }
 
+    @classmethod
+    def from_app_info(cls, app: gio.DesktopAppInfo) -> Application:
+        return cls(
+            app.get_string("Icon"),
+            app.get_string("Exec"),
+            app.get_description(),
+            app.get_name(),
+            app.get_id(),
+            app.get_keywords()
+        )
+
+    def dump(self) -> DumpedApplication:
+        return (
+            self.icon, self.exec, self.description,
+            self.name, self.entry, list(self.keywords)
+        )
+
     def launch(self) -> None:
         if self.entry is not None:
             increase_frequency(self.entry)
@@ -136,17 +166,13 @@ def get_apps_frequency() -> dict[str, int]:
 
 
 def get_apps_list() -> list[Application]:
-    apps = gio.AppInfo.get_all()
     new_list: list[Application] = []
 
-    for app in apps:
-        if not isinstance(app, gio.DesktopAppInfo):
-            continue
-
+    for app in desktop_entries.get_all():
         if app.get_nodisplay() or app.get_is_hidden() or not app.should_show():
             continue
 
-        _app = Application(app)
+        _app = Application.from_app_info(app)
         if _app.entry is not None:
             _app.frequency = frequents.value.get(_app.entry, 0)
         new_list.append(_app)
@@ -154,17 +180,55 @@ def get_apps_list() -> list[Application]:
     return new_list
 
 
-def reload() -> None:
+def reload(*args: t.Any) -> None:
     apps.value = get_apps_list()
 
 
+def hydrate(dumped: list[DumpedApplication]) -> None:
+    new_list: list[Application] = []
+    for data in dumped:
+        _app = Application(*data)
+        if _app.entry is not None:
+            _app.frequency = frequents.value.get(_app.entry, 0)
+        new_list.append(_app)
+    apps.value = new_list
+
+
+def reconcile() -> None:
+    # Scanning desktop entries is slow, the list is replaced when it's done
+    new_list = get_apps_list()
+
+    def apply() -> None:
+        apps.value = new_list
+
+    glib.idle_add(apply)
+
+
+def dump_apps() -> list[DumpedApplication]:
+    return [app.dump() for app in apps.value]
+
+
+snapshot.register("apps", dump_apps)
+
+
 class AppsService(Service):
+    depends = (hyprland.HyprlandService,)
+    threaded_init = True
+
     def app_init(self) -> None:
         frequents.value = get_apps_frequency()
         frequents.ready()
 
-        reload()
+        dumped = snapshot.take("apps")
+        if dumped:
+            hydrate(dumped)
+            threading.Thread(
+                target=reconcile, name="hypryou-apps", daemon=True
+            ).start()
+        else:
+            reload()
         apps.ready()
+        desktop_entries.watch("changed", reload)
 
     def start(self) -> None:
         ...
@@ -1,7 +1,7 @@
 from repository import wp
 from utils.ref import Ref, Computed
 from utils.logger import logger
-from utils.service import Service
+from utils.service import Service, Lane
 import typing as t
 
 
@@ -54,16 +54,19 @@ microphones = Ref[set[wp.Endpoint]](
     types=(wp.Endpoint,)
 )
 
-volume = Ref(0.0, name="audio_volume")
-volume_muted = Ref(False, name="audio_volume_muted")
+# OSD popups show these
+volume = Ref(0.0, name="audio_volume", lane=Lane.CRITICAL)
+volume_muted = Ref(
+    False, name="audio_volume_muted", lane=Lane.CRITICAL
+)
 volume_icon = Computed(
     "volume_off",
     get_volume_icon,
     name="audio_volume_icon"
 )
 
-mic_volume = Ref(0.0, name="mic_volume")
-mic_muted = Ref(False, name="mic_muted")
+mic_volume = Ref(0.0, name="mic_volume", lane=Lane.CRITICAL)
+mic_muted = Ref(False, name="mic_muted", lane=Lane.CRITICAL)
 mic_icon = Computed(
     "mic_off",
     get_mic_icon,
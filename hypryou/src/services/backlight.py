@@ -1,6 +1,6 @@
 
-from src.services.login1 import get_login_manager
-from utils.service import Service, Signals
+from src.services.login1 import get_login_manager, Login1ManagerService
+from utils.service import Service, Signals, Lane
 from utils.ref import Ref
 from utils.logger import logger
 from repository import gio
@@ -13,7 +13,8 @@ NAMESPACE_DIR = "/sys/class/backlight"
 
 class BacklightDevice(Signals):
     def __init__(self, device: str) -> None:
-        super().__init__()
+        # Brightness OSD follows it
+        super().__init__(lane=Lane.CRITICAL)
         self.device = device
         self.directory = f"{NAMESPACE_DIR}/{device}"
         self.brightness_file_path = f"{self.directory}/brightness"
@@ -132,7 +133,7 @@ class BacklightDevice(Signals):
 
 class BacklightDeviceView(Signals):
     def __init__(self, device: BacklightDevice) -> None:
-        super().__init__()
+        super().__init__(lane=Lane.CRITICAL)
         self._device = device
 
         self.view_id = int.from_bytes(os.urandom(8), byteorder="big")
@@ -229,6 +230,9 @@ def get_backlight_manager() -> BacklightManager:
 
 
 class BacklightService(Service):
+    depends = (Login1ManagerService,)
+    threaded_init = True
+
     def app_init(self) -> None:
         global _instance
         _instance = BacklightManager()
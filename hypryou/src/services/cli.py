@@ -5,12 +5,20 @@ from config import socket_path, TEMP_DIR
 from utils.logger import logger
 from utils.styles import reload_css
 from utils.handler import exit_reload
-from utils.service import AsyncService
-from src.services.mpris import current_player
+from utils.service import AsyncService, Signals, instrumentation, dispatcher
+from utils.latency import loop_monitor
+from utils.profiler import profiler, MODES, Mode as ProfileMode
+from utils.trace import tracer
+from utils.ref import Ref
+from src.services.mpris import current_player, MprisPlayer, MPRIS_PREFIX
+from src.services.notifications import notifications
+from src.services import audio
 from src.services.state import set_random_wallpaper
 from src.services import state
 from config import Settings
 import traceback
+import time
+import json
 import typing as t
 import src.services.hyprland as hyprland
 from repository import gtk, gdk
@@ -42,10 +50,284 @@ HELP = {
                   "Use 'random' instead of path to pick random"),
     "toggle_animations": "Toggle animations in gtk and hyprland",
     "move_window": "Moves window to workspace",
-    "change_workspace": "Changes workspace"
+    "change_workspace": "Changes workspace",
+    "stats": ("Signal and Ref timings: on, off, reset; " +
+              "json, sort=<column>, limit=<n> to show"),
+    "subscribe": ("Stream JSON lines of topics: workspace, client, " +
+                  "volume, notifications, player"),
+    "latency": ("Main loop latency percentiles and slow callbacks: " +
+                "reset, json, threshold=<ms>"),
+    "profile": ("Profile main loop: start [cpu|sample|alloc], " +
+                "stop [path], status"),
+    "trace": ("Record trace for Perfetto: start, stop [path], " +
+              "dump [path], status")
+}
+STATS_SORT_KEYS = {
+    "total": "total_ms",
+    "max": "max_ms",
+    "emissions": "emissions",
+    "watchers": "watchers",
+    "name": "name"
 }
 animations = True
 
+# Clients that send it first use the framed protocol, see handle_framed
+PROTOCOL_PREFIX = b"HYPRYOU/2\n"
+MAX_HEADER_SIZE = 32
+MAX_FRAME_SIZE = 16 * 1024 * 1024
+
+type Status = t.Literal["ok", "fail", "error", "unknown"]
+
+
+def format_stats(rows: list[dict[str, t.Any]]) -> str:
+    output = (
+        f"{'name':<32} {'signal':<16} {'emits':>8} {'watch':>5} "
+        f"{'total ms':>10} {'max ms':>8}  slowest\n"
+    )
+    for row in rows:
+        output += (
+            f"{row['name'][:32]:<32} {row['signal'][:16]:<16} "
+            f"{row['emissions']:>8} {row['watchers']:>5} "
+            f"{row['total_ms']:>10.2f} {row['max_ms']:>8.2f}  "
+            f"{row['slowest'] or '-'}\n"
+        )
+    output += "\nlanes:\n"
+    for lane, stats in dispatcher.stats().items():
+        values = ", ".join(
+            f"{key}={value:.2f}" if isinstance(value, float)
+            else f"{key}={value}"
+            for key, value in stats.items()
+        )
+        output += f"  {lane:<10} {values}\n"
+    return output
+
+
+def format_latency(report: dict[str, t.Any]) -> str:
+    lines = [
+        f"samples {report["count"]}, " +
+        f"mean {report["mean_ms"]:.2f} ms, " +
+        f"max {report["max_ms"]:.2f} ms"
+    ]
+    lines.append("  ".join(
+        f"p{p} {value:.2f} ms"
+        for p, value in report["percentiles_ms"].items()
+    ))
+    lines.append(
+        f"{report["slow_count"]} hitches over " +
+        f"{report["threshold_ms"]:.0f} ms"
+    )
+    for event in report["slow"]:
+        when = time.strftime("%H:%M:%S", time.localtime(event["timestamp"]))
+        lines.append(f"\n{when} blocked for {event["delay_ms"]:.0f} ms at:")
+        lines.append(event["stack"].rstrip())
+    return "\n".join(lines)
+
+
+def get_active_client() -> hyprland.Client | None:
+    return hyprland.active_client.value.get(
+        hyprland.active_monitor_id.value
+    )
+
+
+def get_current_player() -> MprisPlayer | None:
+    return current_player.value[1] if current_player.value else None
+
+
+def active_client_value() -> dict[str, t.Any] | None:
+    client = get_active_client()
+    if client is None:
+        return None
+    return {
+        "address": client.address,
+        "class": client.class_,
+        "title": client.title,
+        "workspace": client.workspace_id
+    }
+
+
+def current_player_value() -> dict[str, t.Any] | None:
+    player = get_current_player()
+    if player is None:
+        return None
+    metadata = player.metadata
+    artists = metadata.get("xesam:artist")
+    return {
+        "name": player.get_bus_name().removeprefix(MPRIS_PREFIX),
+        "status": player.playback_status,
+        "title": metadata.get("xesam:title"),
+        "artist": artists[0] if artists else None
+    }
+
+
+class Topic:
+    __slots__ = ("refs", "get_value", "get_target")
+
+    def __init__(
+        self,
+        refs: tuple[Ref[t.Any], ...],
+        get_value: t.Callable[[], t.Any],
+        get_target: t.Callable[[], Signals | None] | None = None
+    ) -> None:
+        self.refs = refs
+        self.get_value = get_value
+        # Object whose "changed" also changes the value
+        self.get_target = get_target
+
+
+TOPICS: dict[str, Topic] = {
+    "workspace": Topic(
+        (hyprland.active_workspace,),
+        lambda: hyprland.active_workspace.value
+    ),
+    "client": Topic(
+        (hyprland.active_client, hyprland.active_monitor_id),
+        active_client_value,
+        get_active_client
+    ),
+    "volume": Topic(
+        (audio.volume, audio.volume_muted),
+        lambda: {
+            "volume": round(audio.volume.value),
+            "muted": audio.volume_muted.value
+        }
+    ),
+    "notifications": Topic(
+        (notifications,),
+        lambda: len(notifications.value)
+    ),
+    "player": Topic(
+        (current_player,),
+        current_player_value,
+        get_current_player
+    )
+}
+
+
+class Subscription:
+    """
+    Streams topics as JSON lines. Values are read when they're written,
+    so changes made while the reader is slow are collapsed into one line.
+    """
+
+    def __init__(
+        self,
+        topics: list[str],
+        writer: asyncio.StreamWriter
+    ) -> None:
+        self.topics = {name: TOPICS[name] for name in topics}
+        self.writer = writer
+        self.dirty = set(self.topics)
+        self.sent: dict[str, str] = {}
+        self.event = asyncio.Event()
+        self.event.set()
+        self.handlers: list[tuple[Ref[t.Any], int]] = []
+        self.targets: dict[str, tuple[Signals, int]] = {}
+
+    def start(self) -> None:
+        for name, topic in self.topics.items():
+            for ref in topic.refs:
+                self.handlers.append((ref, ref.watch(
+                    lambda *args, name=name: self.on_ref_changed(name)
+                )))
+            self.update_target(name)
+
+    def close(self) -> None:
+        for ref, handler_id in self.handlers:
+            ref.unwatch(handler_id)
+        for target, handler_id in self.targets.values():
+            target.unwatch_fast("changed", handler_id)
+        self.handlers.clear()
+        self.targets.clear()
+
+    def update_target(self, name: str) -> None:
+        get_target = self.topics[name].get_target
+        if get_target is None:
+            return
+        target = get_target()
+        current = self.targets.get(name)
+        if current is not None:
+            if current[0] is target:
+                return
+            current[0].unwatch_fast("changed", current[1])
+            del self.targets[name]
+        if target is not None:
+            self.targets[name] = (target, target.watch(
+                "changed", lambda *args: self.mark(name)
+            ))
+
+    def on_ref_changed(self, name: str) -> None:
+        self.update_target(name)
+        self.mark(name)
+
+    def mark(self, name: str) -> None:
+        self.dirty.add(name)
+        self.event.set()
+
+    def get_line(self, name: str) -> str:
+        try:
+            value = self.topics[name].get_value()
+        except Exception as e:
+            logger.warning("Couldn't get value of topic %s: %s", name, e)
+            value = None
+        return json.dumps({"topic": name, "value": value}, default=str)
+
+    async def run(self, reader: asyncio.StreamReader) -> None:
+        # Reader sends nothing, EOF or an error means it's gone
+        eof = asyncio.ensure_future(reader.read(1))
+        try:
+            while not self.writer.is_closing():
+                changed = asyncio.ensure_future(self.event.wait())
+                await asyncio.wait(
+                    (changed, eof),
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+                if eof.done():
+                    changed.cancel()
+                    break
+                self.event.clear()
+                dirty = self.dirty
+                self.dirty = set()
+                for name in self.topics:
+                    if name not in dirty:
+                        continue
+                    line = self.get_line(name)
+                    if self.sent.get(name) == line:
+                        continue
+                    self.sent[name] = line
+                    self.writer.write(line.encode() + b"\n")
+                try:
+                    await self.writer.drain()
+                except ConnectionError as e:
+                    logger.debug("Subscriber is gone: %s", e)
+                    break
+        finally:
+            if eof.done() and not eof.cancelled():
+                # Connection reset is expected here, it's retrieved silently
+                eof.exception()
+            eof.cancel()
+            self.close()
+
+
+async def subscribe(
+    reader: asyncio.StreamReader,
+    writer: asyncio.StreamWriter,
+    args: str
+) -> None:
+    topics = args.split()
+    unknown = [name for name in topics if name not in TOPICS]
+    if not topics or unknown:
+        _topics = ", ".join(TOPICS.keys())
+        message = (
+            f"Unknown topics: {", ".join(unknown)}\n" if unknown else ""
+        ) + f"Usage: subscribe <topic>...\nTopics: {_topics}"
+        writer.write(message.encode())
+        await writer.drain()
+        return
+
+    subscription = Subscription(topics, writer)
+    subscription.start()
+    await subscription.run(reader)
+
 
 def launch_detached(exec: str) -> None:
     asyncio.create_task(
@@ -196,6 +478,122 @@ class CliRequest:
             output += f"{cmd}{padding} -> {help}\n"
         return output
 
+    def do_stats(self, args: str) -> str:
+        parts = args.split()
+        action = parts[0] if parts else ""
+        if action == "on":
+            instrumentation.enabled = True
+            return "ok"
+        elif action == "off":
+            instrumentation.enabled = False
+            return "ok"
+        elif action == "reset":
+            instrumentation.reset()
+            dispatcher.reset_stats()
+            return "ok"
+
+        sort = "total_ms"
+        limit: int | None = 30
+        as_json = False
+        for part in parts:
+            key, _, value = part.partition("=")
+            if key == "json":
+                as_json = True
+            elif key == "sort" and value in STATS_SORT_KEYS:
+                sort = STATS_SORT_KEYS[value]
+            elif key == "limit" and value.isdigit():
+                limit = int(value) or None
+            else:
+                sorts = "|".join(STATS_SORT_KEYS.keys())
+                return (
+                    f"Unknown argument {repr(part)}\n" +
+                    "Usage: stats on | off | reset | " +
+                    f"[json] [sort=<{sorts}>] [limit=<n>]"
+                )
+
+        rows = instrumentation.report(sort, limit)
+        if as_json:
+            return json.dumps({
+                "enabled": instrumentation.enabled,
+                "signals": rows,
+                "lanes": dispatcher.stats()
+            })
+        if not instrumentation.enabled and not rows:
+            return (
+                "Instrumentation is disabled, " +
+                "use 'stats on' or HYPRYOU_STATS=1"
+            )
+        return format_stats(rows)
+
+    def do_latency(self, args: str) -> tuple[str, bool]:
+        as_json = False
+        for part in args.split():
+            key, _, value = part.partition("=")
+            if key == "reset":
+                loop_monitor.reset()
+                return "ok", True
+            elif key == "json":
+                as_json = True
+            elif key == "threshold" and value.isdigit() and int(value) > 0:
+                loop_monitor.threshold = int(value) / 1000
+                return "ok", True
+            else:
+                return f"Unknown argument {repr(part)}", False
+
+        report = loop_monitor.report()
+        if as_json:
+            return json.dumps(report), True
+        return format_latency(report), True
+
+    def do_profile(self, args: str) -> tuple[str, bool]:
+        action, _, arg = args.strip().partition(" ")
+        arg = arg.strip()
+        if action == "start":
+            mode = arg or "cpu"
+            if mode not in MODES:
+                return f"Unknown mode {repr(mode)}: {", ".join(MODES)}", False
+            if profiler.running:
+                return profiler.status(), False
+            profiler.start(t.cast(ProfileMode, mode))
+            return "ok", True
+        elif action == "stop":
+            if not profiler.running:
+                return profiler.status(), False
+            return profiler.stop(arg or None), True
+        elif action == "status":
+            return profiler.status(), True
+        return (
+            "Usage: profile start [cpu|sample|alloc] | stop [path] | status",
+            False
+        )
+
+    def do_trace(self, args: str) -> tuple[str, bool]:
+        action, _, arg = args.strip().partition(" ")
+        path = arg.strip() or None
+        if action == "start":
+            if tracer.enabled:
+                return tracer.status(), False
+            tracer.reset()
+            tracer.start()
+            return "ok", True
+        elif action in ("stop", "dump"):
+            if action == "stop":
+                if not tracer.enabled:
+                    return tracer.status(), False
+                tracer.stop()
+            try:
+                path = tracer.write(path)
+            except OSError as e:
+                return f"Couldn't write trace: {e}", False
+            return f"{tracer.status()}, written to {path}", True
+        elif action == "status":
+            return tracer.status(), True
+        return "Usage: trace start | stop [path] | dump [path] | status", False
+
+    def do_subscribe(self, args: str) -> tuple[str, bool]:
+        # Handled in handle_client, it needs the connection
+        return "subscribe can't be used with other commands", False
+
     def do_change_workspace(self, workspace_id: str) -> str:
         if not workspace_id.isdigit():
             return "Wrong workspace ID"
@@ -229,26 +627,130 @@ class CliRequest:
         return "ok"
 
 
+class FrameReader:
+    """Reads framed protocol from bytes that are already read and reader"""
+
+    def __init__(self, reader: asyncio.StreamReader, buffer: bytes) -> None:
+        self.reader = reader
+        self.buffer = bytearray(buffer)
+
+    async def _fill(self) -> bool:
+        chunk = await self.reader.read(65536)
+        if not chunk:
+            return False
+        self.buffer += chunk
+        return True
+
+    async def readline(self) -> bytes | None:
+        while (index := self.buffer.find(b"\n")) == -1:
+            if len(self.buffer) > MAX_HEADER_SIZE or not await self._fill():
+                return None
+        line = bytes(self.buffer[:index])
+        del self.buffer[:index + 1]
+        return line
+
+    async def readexactly(self, size: int) -> bytes | None:
+        while len(self.buffer) < size:
+            if not await self._fill():
+                return None
+        data = bytes(self.buffer[:size])
+        del self.buffer[:size]
+        return data
+
+
+async def write_frame(
+    writer: asyncio.StreamWriter,
+    status: Status,
+    response: str
+) -> None:
+    data = response.encode()
+    writer.write(f"{status} {len(data)}\n".encode() + data)
+    await writer.drain()
+
+
+async def handle_framed(
+    reader: FrameReader,
+    writer: asyncio.StreamWriter
+) -> None:
+    # Frame is "<size>\n<command>", "0\n" or EOF ends the connection.
+    # Every command gets "<status> <size>\n<response>" in the same order
+    request = CliRequest()
+    while True:
+        header = await reader.readline()
+        if header is None:
+            break
+        try:
+            size = int(header)
+        except ValueError:
+            await write_frame(writer, "error", "Malformed frame header")
+            break
+        if size <= 0:
+            break
+        if size > MAX_FRAME_SIZE:
+            await write_frame(writer, "error", "Frame is too large")
+            break
+        payload = await reader.readexactly(size)
+        if payload is None:
+            break
+
+        message = payload.decode(errors="replace")
+        if __debug__:
+            logger.debug("Received framed message: '%s'", message)
+        status, response, post = await handle_request(message, request)
+        await write_frame(writer, status, response)
+        if post is not None:
+            # Only reload and exit have post actions, nothing runs after
+            writer.close()
+            await writer.wait_closed()
+            post()
+            return
+
+    writer.close()
+    await writer.wait_closed()
+
+
 async def handle_client(
     reader: asyncio.StreamReader,
     writer: asyncio.StreamWriter
 ) -> None:
     try:
         data = await reader.read(1024)
+        while (
+            data
+            and len(data) < len(PROTOCOL_PREFIX)
+            and PROTOCOL_PREFIX.startswith(data)
+        ):
+            more = await reader.read(1024)
+            if not more:
+                break
+            data += more
+        if data.startswith(PROTOCOL_PREFIX):
+            await handle_framed(
+                FrameReader(reader, data[len(PROTOCOL_PREFIX):]), writer
+            )
+            return
+
         message = data.decode()
         if __debug__:
             logger.debug("Received message from socket: '%s'", message)
 
-        _response, post = await handle_request(message)
-        if isinstance(_response, tuple):
-            response, success = _response
-        else:
-            response, success = _response, True
+        command, _, args = message.strip().partition(" ")
+        if command == "subscribe":
+            await subscribe(reader, writer, args)
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                # Subscriber could've closed it without reading everything
+                pass
+            return
+
+        _, response, post = await handle_request(message)
         writer.write(response.encode())
         await writer.drain()
         writer.close()
         await writer.wait_closed()
-        if post is not None and success:
+        if post is not None:
             post()
     except (
         ConnectionResetError,
@@ -269,33 +771,39 @@ async def handle_client(
 
 
 async def handle_request(
-    data: str
-) -> tuple[str | tuple[str, bool], t.Callable[[], None] | None]:
+    data: str,
+    request: CliRequest | None = None
+) -> tuple[Status, str, t.Callable[[], None] | None]:
     parts = data.strip().split(" ", 1)
     command = parts[0]
     args = parts[1] if len(parts) > 1 else ""
     attr = "do_" + command
     post_attr = "post_" + command
-    request = CliRequest()
+    if request is None:
+        request = CliRequest()
     try:
-        if hasattr(request, attr):
-            method = getattr(request, attr)
+        method = getattr(request, attr, None)
+        if callable(method):
+            result = t.cast(str | tuple[str, bool], method(args))
+            if isinstance(result, tuple):
+                response, success = result
+            else:
+                response, success = result, True
+            if not success:
+                return "fail", response, None
+
             post_method = getattr(request, post_attr, None)
-            if callable(method):
-                return (
-                    t.cast(str | tuple[str, bool], method(args)),
-                    lambda: post_method(args)
-                    if post_method and callable(post_method)
-                    else None
-                )
+            if callable(post_method):
+                return "ok", response, lambda: post_method(args)
+            return "ok", response, None
     except Exception as e:
         tb = traceback.format_exc()
         logger.error(
             "Error while calling %s", attr,
             exc_info=e
         )
-        return tb, None
-    return "unknown request", None
+        return "error", tb, None
+    return "unknown", "unknown request", None
 
 
 def is_socket_exists() -> bool:
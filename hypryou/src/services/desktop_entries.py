@@ -0,0 +1,125 @@
+import os
+import threading
+from repository import gio, glib
+from utils.logger import logger
+from utils.service import Signals
+
+# Resolves app classes, desktop IDs and executables to desktop entries.
+# The index is built once and rebuilt when gio.AppInfoMonitor reports changes
+
+
+class DesktopEntries(Signals):
+    __slots__ = (
+        "_index", "_apps", "_icons",
+        "_monitor", "_monitor_handler", "_ready", "_index_lock"
+    )
+
+    def __init__(self) -> None:
+        super().__init__({"changed"})
+        self._index: dict[str, gio.DesktopAppInfo] = {}
+        self._apps: list[gio.DesktopAppInfo] = []
+        self._icons: dict[str, gio.Icon | None] = {}
+        self._monitor: gio.AppInfoMonitor | None = None
+        self._monitor_handler = -1
+        self._ready = False
+        self._index_lock = threading.Lock()
+
+    def _ensure_index(self) -> None:
+        # Apps service can build it in the background while main thread asks
+        if self._ready:
+            return
+        with self._index_lock:
+            if self._ready:
+                return
+            self.rebuild()
+            self._ready = True
+        glib.idle_add(self._watch)
+
+    def _watch(self) -> None:
+        # Monitor emits in the main context of thread that got it
+        if self._monitor is not None:
+            return
+        self._monitor = gio.AppInfoMonitor.get()
+        self._monitor_handler = self._monitor.connect(
+            "changed", self._on_apps_changed
+        )
+
+    def _on_apps_changed(self, *args: object) -> None:
+        self.rebuild()
+        self.notify("changed")
+
+    def rebuild(self) -> None:
+        apps: list[gio.DesktopAppInfo] = []
+        weak: dict[str, gio.DesktopAppInfo] = {}
+        strong: dict[str, gio.DesktopAppInfo] = {}
+        for app in gio.AppInfo.get_all():
+            if not isinstance(app, gio.DesktopAppInfo):
+                continue
+            apps.append(app)
+
+            desktop_id = app.get_id() or ""
+            base_id = desktop_id.removesuffix(".desktop")
+            keys = [desktop_id, base_id]
+
+            wm_class = app.get_startup_wm_class()
+            if wm_class:
+                keys.append(wm_class)
+
+            for key in keys:
+                strong.setdefault(key, app)
+                strong.setdefault(key.lower(), app)
+
+            # Weaker guesses, real IDs and WM classes always win over them
+            executable = app.get_executable()
+            if executable:
+                weak.setdefault(os.path.basename(executable).lower(), app)
+            weak.setdefault(base_id.rsplit(".", 1)[-1].lower(), app)
+
+        weak.update(strong)
+        weak.pop("", None)
+        self._apps = apps
+        self._index = weak
+        self._icons.clear()
+        if __debug__:
+            logger.debug(
+                "Indexed %d desktop entries by %d keys",
+                len(apps), len(weak)
+            )
+
+    def get_all(self) -> list[gio.DesktopAppInfo]:
+        self._ensure_index()
+        return self._apps
+
+    def resolve(self, key: str | None) -> gio.DesktopAppInfo | None:
+        if not key:
+            return None
+        self._ensure_index()
+        index = self._index
+        for candidate in (
+            key,
+            key.lower(),
+            key.replace(" ", "-").lower(),
+            key.removesuffix(".desktop").lower()
+        ):
+            app = index.get(candidate)
+            if app is not None:
+                return app
+        return None
+
+    def get_icon(self, key: str | None) -> gio.Icon | None:
+        if not key:
+            return None
+        self._ensure_index()
+        if key in self._icons:
+            return self._icons[key]
+        app = self.resolve(key)
+        icon = app.get_icon() if app is not None else None
+        self._icons[key] = icon
+        return icon
+
+    def get_name(self, key: str | None) -> str | None:
+        app = self.resolve(key)
+        return app.get_name() if app is not None else None
+
+
+desktop_entries = DesktopEntries()
@@ -1,14 +1,18 @@
 import asyncio
 from enum import Enum
 import os
+import time
 from asyncio import StreamReader, StreamWriter
-from utils.ref import Ref, Computed
+from utils.ref import Ref, Computed, batch
 from utils.logger import logger
+from utils.trace import tracer
+from utils.snapshot import snapshot
 import typing as t
 import json
 from utils.service import Signals, AsyncService
-from repository import gio, gtk, gdk
+from repository import gtk, gdk, glib
 from config import Settings
+from src.services.desktop_entries import desktop_entries
 
 active_workspace = Ref(0, name="workspace", delayed_init=True)
 active_layout = Ref("en", name="active_layout", delayed_init=True)
@@ -134,14 +138,161 @@ class MonitorDict(t.TypedDict):
     availableModes: list[str]
 
 
+# Attribute name for each synced ClientDict key
+CLIENT_FIELDS: dict[str, str] = {
+    "address": "address",
+    "mapped": "mapped",
+    "hidden": "hidden",
+    "floating": "floating",
+    "pseudo": "pseudo",
+    "class": "class_",
+    "title": "title",
+    "initialClass": "initial_class",
+    "initialTitle": "initial_title",
+    "pid": "pid",
+    "xwayland": "xwayland",
+    "pinned": "pinned",
+    "swallowing": "swallowing",
+    "focusHistoryId": "focus_history_id",
+    "xdgTag": "xdg_tag",
+    "xdgDescription": "xdg_description",
+}
+CLIENT_SIGNALS = {
+    "changed",
+    *(f"changed::{name.rstrip("_")}" for name in CLIENT_FIELDS.values()),
+    "changed::workspace",
+    "changed::at",
+    "changed::size",
+    "changed::fullscreen",
+    "changed::tags",
+}
+
+# Changes of these don't re-notify active_client watchers
+QUIET_FIELDS = {"title", "focus_history_id"}
+
+
 class Client(Signals):
-    def __init__(self, client: ClientDict) -> None:
-        super().__init__()
-        self._data = client
+    __slots__ = (
+        *CLIENT_FIELDS.values(),
+        "workspace_id", "workspace_name",
+        "at", "size", "fullscreen_state", "tags",
+        "__weakref__"
+    )
 
-    def notify_changed(self) -> None:
-        # I couldn't find any better way to do that without refs, sadly
+    address: str
+    mapped: bool
+    hidden: bool
+    floating: bool
+    pseudo: bool
+    class_: str
+    title: str
+    initial_class: str
+    initial_title: str
+    pid: int
+    xwayland: bool
+    pinned: bool
+    swallowing: str
+    focus_history_id: int
+    xdg_tag: str
+    xdg_description: str
+    workspace_id: int
+    workspace_name: str
+    at: tuple[int, int]
+    size: tuple[int, int]
+    fullscreen_state: int
+    tags: list[t.Any]
+
+    def __init__(self, client: ClientDict) -> None:
+        super().__init__(CLIENT_SIGNALS)
+        self.workspace_id = -1
+        self.workspace_name = ""
+        self.at = (0, 0)
+        self.size = (0, 0)
+        self.fullscreen_state = 0
+        self.tags = []
+        for attr in CLIENT_FIELDS.values():
+            setattr(self, attr, None)
+        self.update(client, notify=False)
+
+    def update(self, client: ClientDict, notify: bool = True) -> set[str]:
+        """Updates fields from ClientDict, returns names of changed ones"""
+        changed: set[str] = set()
+        for key, attr in CLIENT_FIELDS.items():
+            value = client[key]  # type: ignore[literal-required]
+            if getattr(self, attr) != value:
+                setattr(self, attr, value)
+                changed.add(attr.rstrip("_"))
+
+        workspace = client["workspace"]
+        if (
+            self.workspace_id != workspace["id"]
+            or self.workspace_name != workspace["name"]
+        ):
+            self.workspace_id = workspace["id"]
+            self.workspace_name = workspace["name"]
+            changed.add("workspace")
+
+        at = (client["at"][0], client["at"][1])
+        if self.at != at:
+            self.at = at
+            changed.add("at")
+
+        size = (client["size"][0], client["size"][1])
+        if self.size != size:
+            self.size = size
+            changed.add("size")
+
+        fullscreen_state = int(client["fullscreen"])
+        if self.fullscreen_state != fullscreen_state:
+            self.fullscreen_state = fullscreen_state
+            changed.add("fullscreen")
+
+        if self.tags != client["tags"]:
+            self.tags = client["tags"]
+            changed.add("tags")
+
+        if notify and changed:
+            self.notify_changed(changed)
+        return changed
+
+    def dump(self) -> dict[str, t.Any]:
+        """Fields that update reads, to recreate client after restart"""
+        dumped: dict[str, t.Any] = {
+            key: getattr(self, attr) for key, attr in CLIENT_FIELDS.items()
+        }
+        dumped["workspace"] = self.workspace
+        dumped["at"] = list(self.at)
+        dumped["size"] = list(self.size)
+        dumped["fullscreen"] = self.fullscreen_state
+        dumped["tags"] = list(self.tags)
+        return dumped
+
+    def set_title(self, title: str) -> None:
+        if self.title != title:
+            self.title = title
+            self.notify_changed(("title",))
+
+    def set_workspace(self, workspace_id: int, workspace_name: str) -> None:
+        if (
+            self.workspace_id != workspace_id
+            or self.workspace_name != workspace_name
+        ):
+            self.workspace_id = workspace_id
+            self.workspace_name = workspace_name
+            self.notify_changed(("workspace",))
+
+    def set_pinned(self, pinned: bool) -> None:
+        if self.pinned != pinned:
+            self.pinned = pinned
+            self.notify_changed(("pinned",))
+
+    def notify_changed(self, fields: t.Collection[str] = ()) -> None:
+        for field in fields:
+            self.notify(f"changed::{field}")
         self.notify("changed")
+        if fields and all(field in QUIET_FIELDS for field in fields):
+            return
+        # I couldn't find any better way to do that without refs, sadly
         if active_client.value.get(self.monitor) is self:
             active_client.notify_signal("changed", active_client.value)
 
@@ -151,47 +302,16 @@ class Client(Signals):
             if data is None:
                 await clients_full_sync()
             else:
-                self._data = data
-                self.notify_changed()
+                self.update(data)
 
         asyncio.create_task(async_task())
 
     def get_icon(self) -> gtk.IconPaintable | None:
         original_app_id = self.initial_class
-        possible_ids = [
-            original_app_id.replace(" ", "-").lower(),
-            original_app_id.lower(),
-            str(original_app_id),
-            f"{original_app_id}.desktop",
-        ]
-
-        desktop_file: gio.AppInfo | None = None
-        for app_id_candidate in possible_ids:
-            if not app_id_candidate:
-                continue
-            try:
-                desktop_file = gio.DesktopAppInfo.new(app_id_candidate)
-            except TypeError:
-                continue
-            if desktop_file:
-                break
-
-        if not desktop_file:
-            lower_original = original_app_id.lower()
-            for info in gio.AppInfo.get_all():
-                id = (info.get_id() or "").lower()
-                if (
-                    id
-                    and (id.startswith(lower_original)
-                         or id.endswith(lower_original))
-                ):
-                    desktop_file = info
-                    break
-
-        if not desktop_file:
+        if desktop_entries.resolve(original_app_id) is None:
             return None
 
-        icon = desktop_file.get_icon()
+        icon = desktop_entries.get_icon(original_app_id)
         icon_name = icon.to_string() if icon else original_app_id.lower()
         if icon_name is None:
             return None
@@ -210,121 +330,240 @@ class Client(Signals):
         return icon_info
 
     @property
-    def workspace_id(self) -> int:
-        return self._data["workspace"]["id"]
-
-    @property
-    def workspace_name(self) -> str:
-        return self._data["workspace"]["name"]
+    def workspace(self) -> ClientWorkspace:
+        return {"id": self.workspace_id, "name": self.workspace_name}
 
     @property
-    def address(self) -> str:
-        return self._data["address"]
+    def monitor(self) -> int:
+        return workspace_monitors.value.get(self.workspace_id, -1)
 
     @property
-    def mapped(self) -> bool:
-        return self._data["mapped"]
+    def fullscreen(self) -> bool:
+        return self.fullscreen_state >= 2
 
     @property
-    def hidden(self) -> bool:
-        return self._data["hidden"]
+    def maximized(self) -> bool:
+        return self.fullscreen_state in (1, 3)
 
     @property
-    def at(self) -> tuple[int, int]:
-        return (self._data["at"][0], self._data["at"][1])
+    def fullscreen_client(self) -> int:
+        raise NotImplementedError("Not synced")
 
     @property
-    def size(self) -> tuple[int, int]:
-        return (self._data["size"][0], self._data["size"][1])
+    def grouped(self) -> list[str]:
+        raise NotImplementedError("Not synced")
 
     @property
-    def workspace(self) -> ClientWorkspace:
-        return self._data["workspace"]
+    def inhibiting_idle(self) -> bool:
+        raise NotImplementedError("Not synced")
 
-    @property
-    def floating(self) -> bool:
-        return self._data["floating"]
 
-    @property
-    def pseudo(self) -> bool:
-        return self._data["pseudo"]
+class SocketType(int, Enum):
+    HYPRLAND = 0
+    HYPRSUNSET = 1
 
-    @property
-    def monitor(self) -> int:
-        return workspace_monitors.value.get(self.workspace_id, -1)
 
-    @property
-    def class_(self) -> str:
-        return self._data["class"]
+EVENTS_CHUNK_SIZE = 65536
+# Events where only the latest one per key matters.
+# Value is how many leading arguments make up the key.
+COALESCED_EVENTS = {
+    "windowtitlev2": 1,
+    "windowtitle": 1,
+    "workspacev2": 0,
+    "workspace": 0,
+    "focusedmonv2": 0,
+    "focusedmon": 0,
+    "activewindowv2": 0,
+    "activewindow": 0,
+    "activelayout": 1,
+}
+
+# Hyprland joins replies of [[BATCH]] commands with this delimiter
+BATCH_DELIMITER = "\n\n\n"
+MAX_CONNECTIONS = 4
+MAX_BATCH_SIZE = 16
+
+
+class RequestStats:
+    __slots__ = (
+        "requests", "batches", "batched_requests",
+        "connects", "timeouts", "connect_time",
+        "queue_time", "round_trip_time", "max_round_trip"
+    )
 
-    @property
-    def title(self) -> str:
-        return self._data["title"]
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        self.requests = 0
+        self.batches = 0
+        self.batched_requests = 0
+        self.connects = 0
+        self.timeouts = 0
+        self.connect_time = 0.0
+        self.queue_time = 0.0
+        self.round_trip_time = 0.0
+        self.max_round_trip = 0.0
+
+    def as_dict(self) -> dict[str, float]:
+        connects = self.connects or 1
+        requests = self.requests or 1
+        return {
+            "requests": self.requests,
+            "batches": self.batches,
+            "batched_requests": self.batched_requests,
+            "connects": self.connects,
+            "timeouts": self.timeouts,
+            "avg_connect_ms": self.connect_time / connects * 1000,
+            "avg_queue_ms": self.queue_time / requests * 1000,
+            "avg_round_trip_ms": self.round_trip_time / connects * 1000,
+            "max_round_trip_ms": self.max_round_trip * 1000
+        }
 
-    @property
-    def initial_class(self) -> str:
-        return self._data["initialClass"]
 
-    @property
-    def initial_title(self) -> str:
-        return self._data["initialTitle"]
+class PendingRequest:
+    __slots__ = ("command", "timeout", "future", "queued_at")
 
-    @property
-    def pid(self) -> int:
-        return self._data["pid"]
+    def __init__(
+        self,
+        command: str,
+        timeout: float,
+        future: asyncio.Future[str]
+    ) -> None:
+        self.command = command
+        self.timeout = timeout
+        self.future = future
+        self.queued_at = time.perf_counter()
+
+
+QUERY_CACHE_TTL = 30.0
+# Queries that have to be dropped from the cache when event arrives
+CACHE_INVALIDATED_BY: dict[str, tuple[str, ...]] = {
+    "monitoraddedv2": ("monitors all", "workspaces"),
+    "monitorremovedv2": ("monitors all", "workspaces"),
+    "configreloaded": ("monitors all", "workspaces", "devices"),
+    "workspacev2": ("monitors all",),
+    "focusedmonv2": ("monitors all",),
+    "moveworkspacev2": ("monitors all", "workspaces"),
+    "createworkspacev2": ("workspaces",),
+    "destroyworkspacev2": ("workspaces",),
+    "renameworkspace": ("workspaces",),
+    "activelayout": ("devices",),
+}
+
+
+class QueryCache:
+    """JSON query results, invalidated by socket2 events or TTL"""
+    __slots__ = (
+        "_entries", "_generations",
+        "hits", "misses", "invalidations"
+    )
 
-    @property
-    def xwayland(self) -> bool:
-        return self._data["xwayland"]
+    def __init__(self) -> None:
+        self._entries: dict[str, tuple[float, t.Any]] = {}
+        self._generations: dict[str, int] = {}
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, command: str) -> tuple[bool, t.Any]:
+        entry = self._entries.get(command)
+        if entry is None or entry[0] < time.monotonic():
+            self.misses += 1
+            return False, None
+        self.hits += 1
+        return True, entry[1]
+
+    def generation(self, command: str) -> int:
+        return self._generations.get(command, 0)
+
+    def put(
+        self,
+        command: str,
+        value: t.Any,
+        generation: int,
+        ttl: float
+    ) -> None:
+        # Result may be already stale if event arrived while fetching
+        if self._generations.get(command, 0) == generation:
+            self._entries[command] = (time.monotonic() + ttl, value)
+
+    def invalidate(self, command: str) -> None:
+        self._generations[command] = self._generations.get(command, 0) + 1
+        if self._entries.pop(command, None) is not None:
+            self.invalidations += 1
+
+    def on_event(self, event: str) -> None:
+        commands = CACHE_INVALIDATED_BY.get(event)
+        if commands is not None:
+            for command in commands:
+                self.invalidate(command)
+
+    def clear(self) -> None:
+        for command in tuple(self._entries):
+            self.invalidate(command)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations
+        }
 
-    @property
-    def pinned(self) -> bool:
-        return self._data["pinned"]
 
-    @property
-    def fullscreen(self) -> bool:
-        return int(self._data["fullscreen"]) >= 2
+class IpcRecorder:
+    """Writes socket2 events and requests as JSON lines for replaying"""
+    __slots__ = ("file", "started")
 
-    @property
-    def maximized(self) -> bool:
-        return int(self._data["fullscreen"]) in (1, 3)
+    def __init__(self, path: str) -> None:
+        self.file = open(path, "w", encoding="utf-8")
+        self.started = time.perf_counter()
 
-    @property
-    def fullscreen_client(self) -> int:
-        raise NotImplementedError("Not synced")
+    def write(self, entry: dict[str, t.Any]) -> None:
+        entry["t"] = round(time.perf_counter() - self.started, 6)
+        self.file.write(json.dumps(entry) + "\n")
 
-    @property
-    def grouped(self) -> list[str]:
-        raise NotImplementedError("Not synced")
+    def event(self, line: bytes) -> None:
+        self.write({
+            "kind": "event",
+            "line": line.decode("utf-8", errors="replace")
+        })
 
-    @property
-    def tags(self) -> list[t.Any]:
-        return self._data["tags"]
+    def request(
+        self,
+        payload: str,
+        socket_type: "SocketType",
+        response: str | None
+    ) -> None:
+        self.write({
+            "kind": "request",
+            "socket": socket_type.name.lower(),
+            "command": payload,
+            "response": response
+        })
 
-    @property
-    def swallowing(self) -> str:
-        return self._data["swallowing"]
+    def close(self) -> None:
+        self.file.close()
 
-    @property
-    def focus_history_id(self) -> int:
-        return self._data["focusHistoryId"]
 
-    @property
-    def inhibiting_idle(self) -> bool:
-        raise NotImplementedError("Not synced")
+# Requests that only read state of Hyprland, they're safe to send again
+READ_ONLY_COMMANDS = frozenset({
+    "activewindow", "activeworkspace", "animations", "binds", "clients",
+    "configerrors", "cursorpos", "decorations", "descriptions", "devices",
+    "getoption", "globalshortcuts", "instances", "layers", "layouts",
+    "locked", "monitors", "rollinglog", "splash", "submap", "systeminfo",
+    "version", "workspacerules", "workspaces"
+})
 
-    @property
-    def xdg_tag(self) -> str:
-        return self._data["xdgTag"]
 
-    @property
-    def xdg_description(self) -> str:
-        return self._data["xdgDescription"]
+def is_read_only(command: str) -> bool:
+    return command.removeprefix("j/").split(" ", 1)[0] in READ_ONLY_COMMANDS
 
 
-class SocketType(int, Enum):
-    HYPRLAND = 0
-    HYPRSUNSET = 1
+def is_batchable(command: str) -> bool:
+    # Hyprland splits batch by ';' so commands with it can't be packed
+    return ";" not in command and not command.startswith("[[BATCH]]")
 
 
 class HyprlandClient(Signals):
@@ -344,20 +583,217 @@ class HyprlandClient(Signals):
         self.reader: StreamReader | None = None
         self.writer: StreamWriter | None = None
 
+        self.stats = RequestStats()
+        self.cache = QueryCache()
+        self._connections = asyncio.Semaphore(MAX_CONNECTIONS)
+        self._pending: list[PendingRequest] = []
+        # Batched requests that aren't answered yet, including sent ones
+        self._queued: set[asyncio.Future[str]] = set()
+        self._flush_scheduled = False
+
+        self._events: list[tuple[str, list[str]] | None] = []
+        self._coalesce_index: dict[tuple[str, ...], int] = {}
+        self._dispatch_scheduled = False
+
+        record_path = os.environ.get("HYPRYOU_IPC_RECORD")
+        self.recorder = IpcRecorder(record_path) if record_path else None
+
     async def connect(self) -> None:
         self.reader, self.writer = await asyncio.open_unix_connection(
             self.socket_path_events
         )
+        buffer = b""
         while True:
-            line = await self.reader.readline()
-            if not line:
+            chunk = await self.reader.read(EVENTS_CHUNK_SIZE)
+            if not chunk:
                 break
-            decoded = line.decode("utf-8", errors="replace").rstrip("\n")
-            if ">>" not in decoded:
-                continue
-            event, data = decoded.split(">>", 1)
-            args: list[str] = data.split(",") if data else []
-            self.notify(event, *args)
+            lines = (buffer + chunk).split(b"\n")
+            buffer = lines.pop()
+            for line in lines:
+                self._push_event(line)
+            if self._events and not self._dispatch_scheduled:
+                self._dispatch_scheduled = True
+                glib.idle_add(self._dispatch_events)
+
+    def _push_event(self, line: bytes) -> None:
+        if self.recorder is not None:
+            self.recorder.event(line)
+        event_bytes, sep, data = line.partition(b">>")
+        if not sep:
+            return
+        event = event_bytes.decode("ascii", errors="replace")
+        self.cache.on_event(event)
+        if not self._signals.get(event):
+            # Nobody listens, don't bother decoding the payload
+            return
+
+        decoded = data.decode("utf-8", errors="replace")
+        args: list[str] = decoded.split(",") if decoded else []
+
+        key_size = COALESCED_EVENTS.get(event)
+        if key_size is not None:
+            key = (event, *args[:key_size])
+            previous = self._coalesce_index.get(key)
+            if previous is not None:
+                # Only the latest one matters, drop the older one
+                self._events[previous] = None
+            self._coalesce_index[key] = len(self._events)
+        self._events.append((event, args))
+
+    def _dispatch_events(self) -> bool:
+        events = self._events
+        self._events = []
+        self._coalesce_index = {}
+        self._dispatch_scheduled = False
+        for item in events:
+            if item is not None:
+                self.notify_sync(item[0], *item[1])
+        return False
+
+    async def _send(
+        self,
+        payload: str,
+        socket_type: SocketType,
+        timeout: float
+    ) -> str | None:
+        """Sends payload on a new connection, returns None on timeout"""
+        span = tracer.async_span(
+            "ipc", "hyprland",
+            {"payload": payload[:120], "socket": socket_type.name}
+            if tracer.enabled else None
+        )
+        try:
+            return await self._exchange(payload, socket_type, timeout)
+        finally:
+            span.end()
+
+    async def _exchange(
+        self,
+        payload: str,
+        socket_type: SocketType,
+        timeout: float
+    ) -> str | None:
+        async with self._connections:
+            started = time.perf_counter()
+            reader, writer = await asyncio.open_unix_connection(
+                self.sockets[socket_type]
+            )
+            connected = time.perf_counter()
+            stats = self.stats
+            stats.connects += 1
+            stats.connect_time += connected - started
+            try:
+                writer.write(payload.encode("utf-8"))
+                writer.write_eof()
+                await writer.drain()
+                data = await asyncio.wait_for(
+                    reader.read(),
+                    timeout=timeout
+                )
+            except asyncio.TimeoutError as e:
+                stats.timeouts += 1
+                logger.error(
+                    f"Timeout waiting for response to command: {payload!r}",
+                    exc_info=e
+                )
+                return None
+            finally:
+                if not writer.is_closing():
+                    writer.close()
+                    await writer.wait_closed()
+
+            round_trip = time.perf_counter() - connected
+            stats.round_trip_time += round_trip
+            if round_trip > stats.max_round_trip:
+                stats.max_round_trip = round_trip
+            decoded = data.decode()
+            if self.recorder is not None:
+                self.recorder.request(payload, socket_type, decoded)
+            return decoded
+
+    def _schedule_flush(self) -> None:
+        if self._flush_scheduled:
+            return
+        self._flush_scheduled = True
+        # Lets every caller of this loop iteration join the same batch
+        asyncio.get_running_loop().call_soon(self._flush)
+
+    def _flush(self) -> None:
+        self._flush_scheduled = False
+        pending = self._pending
+        self._pending = []
+        for i in range(0, len(pending), MAX_BATCH_SIZE):
+            asyncio.create_task(
+                self._send_batch(pending[i:i + MAX_BATCH_SIZE])
+            )
+
+    async def _send_single(self, request: PendingRequest) -> None:
+        try:
+            result = await self._send(
+                request.command, SocketType.HYPRLAND, request.timeout
+            )
+        except Exception as e:
+            if not request.future.done():
+                request.future.set_exception(e)
+            return
+        if not request.future.done():
+            request.future.set_result((result or "").strip())
+
+    async def _send_batch(self, requests: list[PendingRequest]) -> None:
+        now = time.perf_counter()
+        for request in requests:
+            self.stats.queue_time += now - request.queued_at
+
+        if len(requests) == 1:
+            await self._send_single(requests[0])
+            return
+
+        self.stats.batches += 1
+        self.stats.batched_requests += len(requests)
+        payload = "[[BATCH]]" + ";".join(r.command for r in requests)
+        try:
+            result = await self._send(
+                payload, SocketType.HYPRLAND,
+                max(r.timeout for r in requests)
+            )
+        except Exception as e:
+            for request in requests:
+                if not request.future.done():
+                    request.future.set_exception(e)
+            return
+
+        if result is None:
+            for request in requests:
+                if not request.future.done():
+                    request.future.set_result("")
+            return
+
+        replies = result.split(BATCH_DELIMITER)
+        if len(replies) != len(requests):
+            # Commands like dispatch could've already run, only reads
+            # are safe to send again
+            logger.warning(
+                "Batch reply has %d parts for %d commands, " +
+                "resending queries",
+                len(replies), len(requests)
+            )
+            retries: list[PendingRequest] = []
+            for request in requests:
+                if is_read_only(request.command):
+                    retries.append(request)
+                elif not request.future.done():
+                    request.future.set_exception(RuntimeError(
+                        "Couldn't split batch reply for command " +
+                        repr(request.command)
+                    ))
+            await asyncio.gather(
+                *(self._send_single(request) for request in retries)
+            )
+            return
+
+        for request, reply in zip(requests, replies):
+            if not request.future.done():
+                request.future.set_result(reply.strip())
 
     async def raw(
         self,
@@ -365,34 +801,23 @@ class HyprlandClient(Signals):
         socket_type: SocketType = SocketType.HYPRLAND,
         timeout: float = 2.0,
     ) -> str:
-        reader, writer = await asyncio.open_unix_connection(
-            self.sockets[socket_type]
+        self.stats.requests += 1
+        if socket_type != SocketType.HYPRLAND or not is_batchable(command):
+            if socket_type == SocketType.HYPRLAND and self._queued:
+                # Runs after commands that were requested before it
+                self._flush()
+                await asyncio.wait(list(self._queued))
+            result = await self._send(command, socket_type, timeout)
+            return (result or "").strip()
+
+        future: asyncio.Future[str] = (
+            asyncio.get_running_loop().create_future()
         )
-        writer.write(command.encode("utf-8"))
-        writer.write_eof()
-        await writer.drain()
-        data = b""
-        try:
-            data = await asyncio.wait_for(
-                reader.read(),
-                timeout=timeout
-            )
-        except asyncio.TimeoutError as e:
-            writer.close()
-            await writer.wait_closed()
-            logger.error(
-                f"Timeout waiting for response to command: {command!r}",
-                exc_info=e
-            )
-            return ""
-        finally:
-            if not writer.is_closing():
-                writer.close()
-                await writer.wait_closed()
-
-        writer.close()
-        await writer.wait_closed()
-        return data.decode().strip()
+        self._queued.add(future)
+        future.add_done_callback(self._queued.discard)
+        self._pending.append(PendingRequest(command, timeout, future))
+        self._schedule_flush()
+        return await future
 
     async def query(self, command: HyprlandQueryType | str) -> t.Any:
         raw_result = await self.raw(f"j/{command}")
@@ -401,6 +826,25 @@ class HyprlandClient(Signals):
         except json.JSONDecodeError:
             return raw_result
 
+    async def cached_query(
+        self,
+        command: HyprlandQueryType | str,
+        force: bool = False,
+        ttl: float = QUERY_CACHE_TTL
+    ) -> t.Any:
+        """
+        Same as query() but result is reused until an event changes it.
+        Returned object is shared, don't modify it.
+        """
+        if not force:
+            found, value = self.cache.get(command)
+            if found:
+                return value
+        generation = self.cache.generation(command)
+        value = await self.query(command)
+        self.cache.put(command, value, generation, ttl)
+        return value
+
     async def dispatch(self, subcommand: str) -> str:
         return await self.raw(f"dispatch {subcommand}")
 
@@ -459,7 +903,8 @@ class EventCallbacks:
             client = await get_client_by_address(window_address)
             if client is None:
                 await clients_full_sync()
-            else:
+            elif window_address not in clients.value:
+                # A full sync may have already picked it up
                 clients.value[window_address] = client
 
         asyncio.create_task(async_task())
@@ -472,9 +917,7 @@ class EventCallbacks:
     ) -> None:
         if window_address in clients.value.keys():
             _client = clients.value[window_address]
-            _client._data["workspace"]["id"] = int(workspace_id)
-            _client._data["workspace"]["name"] = workspace_name
-            _client.notify_changed()
+            _client.set_workspace(int(workspace_id), workspace_name)
         else:
             asyncio.create_task(clients_full_sync())
 
@@ -486,8 +929,7 @@ class EventCallbacks:
         window_title = ",".join(_window_title)
         if window_address in clients.value.keys():
             _client = clients.value[window_address]
-            _client._data["title"] = window_title
-            _client.notify_changed()
+            _client.set_title(window_title)
         else:
             # NOTE: I would use clients_full_sync() here
             # but Hyprland can sometimes send this event
@@ -497,12 +939,11 @@ class EventCallbacks:
     @staticmethod
     def on_pin(
         window_address: str,
-        pin_state: bool
+        pin_state: str
     ) -> None:
         if window_address in clients.value.keys():
             _client = clients.value[window_address]
-            _client._data["pinned"] = pin_state
-            _client.notify_changed()
+            _client.set_pinned(pin_state == "1")
         else:
             asyncio.create_task(clients_full_sync())
 
@@ -599,7 +1040,7 @@ def get_layouts(keyboard: Keyboard) -> list[str]:
 
 async def get_active_layout(client: HyprlandClient) -> tuple[bool, str]:
     show_layout = False
-    devices = await client.query("devices")
+    devices = await client.cached_query("devices")
     keyboards: list[Keyboard] = devices.get("keyboards")
     assert isinstance(keyboards, list), (
         "Keyboards type isn't correct! " +
@@ -620,7 +1061,7 @@ async def get_active_layout(client: HyprlandClient) -> tuple[bool, str]:
 
 
 async def get_active_workspaces(client: HyprlandClient) -> dict[int, int]:
-    workspaces = await client.query("workspaces")
+    workspaces = await client.cached_query("workspaces")
     assert isinstance(workspaces, list), (
         "Workspaces has to be list. " +
         f"{type(workspaces)} != list"
@@ -649,59 +1090,132 @@ def change_night_light(value: bool) -> None:
         )
 
 
-async def get_client_by_address(addr: str) -> Client | None:
-    output: list[ClientDict] = await client.query("clients")
-    if not addr.startswith("0x"):
-        addr = "0x" + addr
+_address_lookups: dict[str, list[asyncio.Future[ClientDict | None]]] = {}
+_lookup_scheduled = False
+
+
+async def _resolve_addresses() -> None:
+    global _address_lookups
+    lookups = _address_lookups
+    _address_lookups = {}
+    try:
+        output: list[ClientDict] = await client.query("clients")
+        index = {
+            _client["address"].removeprefix("0x"): _client
+            for _client in output
+        }
+    except Exception as e:
+        for futures in lookups.values():
+            for future in futures:
+                if not future.done():
+                    future.set_exception(e)
+        return
+
+    for address, futures in lookups.items():
+        data = index.get(address)
+        for future in futures:
+            if not future.done():
+                future.set_result(data)
 
-    for _client in output:
-        if _client["address"] == addr:
-            return Client(_client)
-    return None
+
+def _flush_address_lookups() -> None:
+    global _lookup_scheduled
+    _lookup_scheduled = False
+    asyncio.create_task(_resolve_addresses())
 
 
 async def get_client_dict_by_address(addr: str) -> ClientDict | None:
-    output: list[ClientDict] = await client.query("clients")
+    """
+    Lookups made within one loop iteration share one clients query.
+    """
+    global _lookup_scheduled
+    loop = asyncio.get_running_loop()
+    future: asyncio.Future[ClientDict | None] = loop.create_future()
+    _address_lookups.setdefault(addr.removeprefix("0x"), []).append(future)
+    if not _lookup_scheduled:
+        _lookup_scheduled = True
+        loop.call_soon(_flush_address_lookups)
+    return await future
 
-    for _client in output:
-        if _client["address"] == addr:
-            return _client
-    return None
 
+async def get_client_by_address(addr: str) -> Client | None:
+    data = await get_client_dict_by_address(addr)
+    if data is None:
+        return None
+    return Client(data)
+
+
+_sync_task: asyncio.Task[None] | None = None
+_sync_again = False
+
+
+async def _clients_sync_once() -> None:
+    output: list[ClientDict]
+    _monitors: list[MonitorDict]
+    # Empty dict when nothing is focused
+    _active_window: ClientDict | dict[str, t.Any]
+    # Gathered so all three queries end up in one batch
+    output, _monitors, _active_window = await asyncio.gather(
+        client.query("clients"),
+        get_monitors(),
+        client.query("activewindow")
+    )
 
-async def clients_full_sync() -> None:
-    output: list[ClientDict] = await client.query("clients")
-    addresses: list[str] = []
-
-    _monitors = await get_monitors()
-    for monitor in _monitors:
-        monitor_ids.value[monitor["name"]] = monitor["id"]
-
-    for _client in output:
-        address = _client["address"].lstrip("0x")
-        if address in clients.value:
-            clients.value[address]._data = _client
-            clients.value[address].notify_changed()
-        else:
-            clients.value[address] = Client(_client)
-        addresses.append(address)
+    with batch():
+        for monitor in _monitors:
+            if monitor_ids.value.get(monitor["name"]) != monitor["id"]:
+                monitor_ids.value[monitor["name"]] = monitor["id"]
+
+        addresses: set[str] = set()
+        for _client in output:
+            address = _client["address"].lstrip("0x")
+            existing = clients.value.get(address)
+            if existing is None:
+                clients.value[address] = Client(_client)
+            else:
+                existing.update(_client)
+            addresses.add(address)
 
-    for client_address in set(clients.value.keys()):
-        if client_address not in addresses:
+        for client_address in set(clients.value.keys()) - addresses:
             clients.value.pop(client_address)
 
-    _active_window = await client.query("activewindow")
-    if _active_window:
-        _active_window_address = (
-            str(_active_window["address"]).removeprefix("0x")
-        )
-        if _active_window_address in clients.value.keys():
-            _client = clients.value[_active_window_address]
-            active_client.value[_client.monitor] = _client
+        if _active_window:
+            _active_window_address = (
+                str(_active_window["address"]).removeprefix("0x")
+            )
+            focused = clients.value.get(_active_window_address)
+            if focused is not None:
+                if active_client.value.get(focused.monitor) is not focused:
+                    active_client.value[focused.monitor] = focused
 
     clients.notify_signal("synced", clients.value)
 
 
+async def _clients_sync_loop() -> None:
+    global _sync_task, _sync_again
+    try:
+        while True:
+            _sync_again = False
+            await _clients_sync_once()
+            if not _sync_again:
+                break
+    finally:
+        _sync_task = None
+
+
+async def clients_full_sync() -> None:
+    """
+    Joins the sync in progress if there is one.
+    Requests that arrive mid-sync are folded into a single follow-up sync.
+    """
+    global _sync_task, _sync_again
+    if _sync_task is None:
+        _sync_task = asyncio.create_task(_clients_sync_loop())
+    else:
+        _sync_again = True
+    await asyncio.shield(_sync_task)
+
+
 def acquire_clients() -> None:
     asyncio.create_task(clients_full_sync())
 
@@ -710,8 +1224,11 @@ def release_clients() -> None:
     pass
 
 
-async def get_monitors() -> list[MonitorDict]:
-    return t.cast(list[MonitorDict], await client.query("monitors all"))
+async def get_monitors(force: bool = False) -> list[MonitorDict]:
+    return t.cast(
+        list[MonitorDict],
+        await client.cached_query("monitors all", force)
+    )
 
 
 async def init() -> None:
@@ -736,7 +1253,16 @@ async def init() -> None:
     _active_workspaces = await get_active_workspaces(client)
     workspace_monitors.value = _active_workspaces
 
-    await clients_full_sync()
+    dumped = snapshot.take("clients")
+    if dumped:
+        # Windows show clients from before restart until the sync is done
+        with batch():
+            for _client in dumped:
+                address = _client["address"].lstrip("0x")
+                clients.value[address] = Client(t.cast(ClientDict, _client))
+        asyncio.create_task(clients_full_sync())
+    else:
+        await clients_full_sync()
 
     try:
         _temperature = await client.raw(
@@ -769,6 +1295,13 @@ async def init() -> None:
                 client.watch(event, callback)
 
 
+def dump_clients() -> list[dict[str, t.Any]]:
+    return [_client.dump() for _client in clients.value.values()]
+
+
+snapshot.register("clients", dump_clients)
+
+
 class HyprlandService(AsyncService):
     async def app_init(self) -> None:
         await init()
@@ -778,3 +1311,11 @@ class HyprlandService(AsyncService):
         if __debug__:
             logger.debug("Connecting to hyprland")
         await client.connect()
+
+    def on_close(self) -> None:
+        try:
+            recorder = client.recorder
+        except NameError:
+            return
+        if recorder is not None:
+            recorder.close()
@@ -12,9 +12,9 @@ from pywayland.protocol.ext_idle_notify_v1.ext_idle_notifier_v1 import (
     ExtIdleNotifierV1, ExtIdleNotifierV1Proxy as Notifier
 )
 from src.services import hyprland
-from src.services.upower import get_upower, BatteryState
+from src.services.upower import get_upower, BatteryState, UPowerService
 from src.services.state import is_locked, is_idle_locked
-from src.services.login1 import get_login_manager
+from src.services.login1 import get_login_manager, Login1ManagerService
 from src.services.mpris import players
 from config import Settings
 
@@ -305,6 +305,10 @@ class ScreenSaver:
 
 
 class ScreenSaverService(Service):
+    depends = (
+        hyprland.HyprlandService, UPowerService, Login1ManagerService
+    )
+
     def __init__(self) -> None:
         self.watcher: ScreenSaver
 
@@ -111,6 +111,8 @@ def get_inhibitor() -> IdleInhibitor:
 
 
 class IdleInhibitorService(Service):
+    threaded_init = True
+
     def app_init(self) -> None:
         global _instance
         if __debug__:
@@ -140,6 +140,8 @@ def get_login_manager() -> Login1Manager:
 
 
 class Login1ManagerService(Service):
+    threaded_init = True
+
     def app_init(self) -> None:
         global _instance
         if __debug__:
@@ -2,7 +2,7 @@ from enum import Enum, IntFlag
 from repository import nm, glib, gio, gtk
 from utils.logger import logger
 import typing as t
-from utils.service import Signals, Service
+from utils.service import Signals, Service, Lane
 from utils.ref import Ref
 from config import ASSETS_DIR
 import os
@@ -233,7 +233,7 @@ class AccessPoint(Signals):
         client: nm.Client,
         device: nm.Device
     ) -> None:
-        super().__init__()
+        super().__init__(lane=Lane.BACKGROUND)
         self.ap = ap
         self.client = client
         self.device = device
@@ -365,7 +365,7 @@ class Wifi(Signals):
         device: nm.DeviceWifi,
         client: nm.Client
     ) -> None:
-        super().__init__()
+        super().__init__(lane=Lane.BACKGROUND)
         self.device = device
         self.client = client
         self.active_connection: nm.ActiveConnection | None = None
@@ -590,7 +590,7 @@ class Network(Signals):
         self,
         client: nm.Client
     ) -> None:
-        super().__init__()
+        super().__init__(lane=Lane.BACKGROUND)
         self.client = client
         self.agent = SecretAgent(self.client)
         self.wifi_device: nm.DeviceWifi | None
@@ -899,6 +899,10 @@ def get_network() -> Network:
 
 
 class NetworkService(Service):
+    # Client is bound to thread-default context of the thread creating it,
+    # it's the global one in the pool, so signals still come to main loop
+    threaded_init = True
+
     def app_init(self) -> None:
         global _instance
         self.client = nm.Client.new()
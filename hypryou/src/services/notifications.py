@@ -5,11 +5,12 @@ import time
 from config import ASSETS_DIR
 import os
 from repository import glib, gio, gdk_pixbuf, gtk, gdk
-from utils.ref import Ref
+from utils.ref import Ref, batch
 from utils.logger import logger
 import typing as t
-from pathlib import Path
 from utils.service import Signals, Service
+from utils.snapshot import snapshot
+from src.services.desktop_entries import desktop_entries
 
 
 WATCHER_XML_PATH = os.path.join(
@@ -91,6 +92,10 @@ class NotificationUrgency(int, Enum):
 
 
 type ImageData = tuple[int, int, int, bool, int, int, int]
+# Id, app name, app icon, summary, body, actions, hints, time
+type DumpedNotification = tuple[
+    int, str, str, str, str, list[str], dict[str, t.Any], float
+]
 type Category = t.Literal[
     "call",
     "call.ended",
@@ -141,22 +146,6 @@ Hints = t.TypedDict(
 )
 
 
-def locate_desktop_file(desktop_id: str) -> Path | None:
-    search_paths = os.environ.get(
-        "XDG_DATA_DIRS", "/usr/local/share:/usr/share"
-    ).split(":")
-    user_path = os.environ.get(
-        "XDG_DATA_HOME", str(Path.home() / ".local/share")
-    )
-    search_paths.insert(0, user_path)
-
-    for base in search_paths:
-        path = Path(base) / "applications" / f"{desktop_id}.desktop"
-        if path.exists():
-            return path
-    return None
-
-
 class Notification(Signals):
     def __init__(
         self,
@@ -167,7 +156,6 @@ class Notification(Signals):
         super().__init__({"changed"})
         self.id = id
         self.watcher = watcher
-        self.cached_app_icon: tuple[str, gio.Icon | str | None] | None = None
         self.set_values(**kwargs)
 
     def close(self, reason: NotificationClosedReason) -> None:
@@ -198,23 +186,7 @@ class Notification(Signals):
         if not isinstance(desktop_entry, str):
             return None
 
-        if self.cached_app_icon and self.cached_app_icon[0] == desktop_entry:
-            return self.cached_app_icon[1]
-
-        path = locate_desktop_file(desktop_entry)
-        if not path:
-            return None
-
-        try:
-            app_info = gio.DesktopAppInfo.new_from_filename(str(path))
-        except TypeError:
-            return None
-        if not app_info:
-            return None
-
-        icon = app_info.get_icon()
-        self.cached_app_icon = (desktop_entry, icon)
-        return icon
+        return desktop_entries.get_icon(desktop_entry)
 
     def get_app_icon(self) -> str | gio.Icon | None:
         if self.app_icon:
@@ -258,6 +230,13 @@ class Notification(Signals):
         if notify:
             self.notify("changed")
 
+    def dump(self) -> DumpedNotification:
+        actions = [item for action in self.actions for item in action]
+        return (
+            self.id, self.app_name, self.app_icon, self.summary,
+            self.body, actions, dict(self.hints), self.time
+        )
+
 
 class NotificationsWatcher:
     def __init__(self) -> None:
@@ -417,6 +396,28 @@ class NotificationsWatcher:
 
         return new_id
 
+    def hydrate(self, dumped: list[DumpedNotification]) -> None:
+        """Brings back notifications from before the restart"""
+        global _next_id
+        with batch():
+            for (
+                id, app_name, app_icon, summary, body, actions, hints, created
+            ) in dumped:
+                notification = Notification(
+                    id, self,
+                    app_name=app_name,
+                    app_icon=app_icon,
+                    summary=summary,
+                    body=body,
+                    actions=actions,
+                    hints=t.cast(Hints, hints)
+                )
+                notification.time = created
+                notifications.value[id] = notification
+                _next_id = max(_next_id, id + 1)
+        if __debug__:
+            logger.debug("Restored %d notifications", len(dumped))
+
     def _reschedule_timer(self) -> None:
         if self._expiry_timer_id is not None:
             glib.source_remove(self._expiry_timer_id)
@@ -509,7 +510,20 @@ class ExpiryManager:
         return expired
 
 
+def dump_notifications() -> list[DumpedNotification]:
+    return [
+        notification.dump()
+        for notification in notifications.value.values()
+    ]
+
+
+snapshot.register("notifications", dump_notifications, priority=5)
+
+
 class NotificationsService(Service):
     def start(self) -> None:
         watcher = NotificationsWatcher()
+        dumped = snapshot.take("notifications")
+        if dumped:
+            watcher.hydrate(dumped)
         watcher.register()
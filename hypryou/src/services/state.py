@@ -5,24 +5,34 @@ from config import color_templates, CONFIG_DIR
 from utils.ref import Ref
 from utils.styles import reload_css
 from utils.service import Service
-from utils.colors import generate_by_settings
+from utils.lazy import lazy_import
+from utils.snapshot import snapshot
 from utils.logger import logger
 from repository import gdk, glib, gio
 import random
 import typing as t
 from types import NoneType
-from utils.service import Signals
-from os.path import join, exists
+from utils.service import Signals, Lane
+from os.path import join
 from config import state_dir
 import os
 from os import path
 import asyncio
 import src.services.hyprland as hyprland
-from src.services.mpris import players
-from src.services.login1 import get_login_manager
-from src.services.upower import lid_is_closed
-
-STATE_FILE_VERSION = 1
+from src.services.mpris import players, MprisService
+from src.services.login1 import get_login_manager, Login1ManagerService
+from src.services.upower import lid_is_closed, UPowerService
+if t.TYPE_CHECKING:
+    import utils.colors as colors
+else:
+    # Greeter imports state through idle, it never generates colors
+    colors = lazy_import("utils.colors")
+
+STATE_FILE_VERSION = 2
+STATE_FILE = join(state_dir, "last-state")
+# Snapshot is written from a signal handler, it shouldn't delay the exit
+SNAPSHOT_BUDGET = 0.25
+SNAPSHOT_MAX_AGE = 300
 WALLPAPER_EXTENSIONS = {
     ".png", ".jpg", ".jpeg"
 }
@@ -33,8 +43,10 @@ current_wallpaper = Ref[gdk.Texture | None](
     name="wallpaper_texture",
     types=(NoneType, gdk.Texture)
 )
-is_locked = Ref(False, name="is_locked")
-is_idle_locked = Ref(False, name="is_idle_locked")
+is_locked = Ref(False, name="is_locked", lane=Lane.CRITICAL)
+is_idle_locked = Ref(
+    False, name="is_idle_locked", lane=Lane.CRITICAL
+)
 settings_page = Ref[str | None](
     None,
     name="settings_page",
@@ -150,79 +162,50 @@ def generate_wallpaper_texture() -> None:
 
 
 def on_wallpapers_changed(*args: t.Any) -> None:
-    generate_by_settings()
+    colors.generate_by_settings()
     glib.idle_add(generate_wallpaper_texture)
 
 
-def save_state() -> None:
-    if time.time() - restored_on < 60:
-        return
-
-    data = bytearray()
-    data.extend(b"HY")
-    data.append(STATE_FILE_VERSION)
-
-    # Session lock
-    data.append(1 if is_locked.value else 0)
-
-    # Current settings page
-    page_bytes = (settings_page.value or "").encode("utf-8")
-    data.append(len(page_bytes))
-    data.extend(page_bytes)
-
-    # popups
-    popups = _opened_windows.value
-    data.append(len(popups))  # number of popups
-    for popup in popups:
-        pb = popup.encode("utf-8")
-        if len(pb) > 255:
-            raise ValueError(f"Popup name too long: {popup}")
-        data.append(len(pb))
-        data.extend(pb)
-
-    with open(join(state_dir, "last-state"), "wb") as f:
-        f.write(data)
+def dump_ui_state() -> tuple[bool, str, list[str]]:
+    return (
+        is_locked.value,
+        settings_page.value or "",
+        list(_opened_windows.value)
+    )
 
 
-def restore_state() -> None:
-    path = join(state_dir, "last-state")
-    if not exists(path):
-        return
+snapshot.register("ui", dump_ui_state, priority=10)
 
-    with open(path, "rb") as f:
-        data = f.read()
-    os.remove(path)
 
-    pos = 0
-    if data[:2] != b'HY':
+def save_state(crashed: bool = True) -> None:
+    # Restored state could be the reason of the crash
+    if crashed and time.time() - restored_on < 60:
         return
-    pos += 2
+    try:
+        snapshot.write(STATE_FILE, STATE_FILE_VERSION, SNAPSHOT_BUDGET)
+    except OSError as e:
+        logger.error("Couldn't save state: %s", e)
 
-    version = data[pos]
-    if version != STATE_FILE_VERSION:
-        return
-    pos += 1
 
+def load_state() -> None:
+    """Loads snapshot before services are initialized, so they hydrate"""
     global restored_on
-    restored_on = time.time()
+    try:
+        if snapshot.load(STATE_FILE, STATE_FILE_VERSION, SNAPSHOT_MAX_AGE):
+            restored_on = time.time()
+    except Exception as e:
+        logger.exception("Couldn't load snapshot", exc_info=e)
 
-    is_locked.value = data[pos] == 1
-    pos += 1
-
-    page_len = data[pos]
-    pos += 1
-    page = data[pos:pos + page_len].decode("utf-8")
-    settings_page.value = page if page else None
-    pos += page_len
 
-    num_popups = data[pos]
-    pos += 1
+def restore_state() -> None:
+    data = snapshot.take("ui")
+    if data is None:
+        return
 
-    for _ in range(num_popups):
-        plen = data[pos]
-        pos += 1
-        popup = data[pos:pos + plen].decode("utf-8")
-        pos += plen
+    locked, page, popups = data
+    is_locked.value = bool(locked)
+    settings_page.value = page if page else None
+    for popup in popups:
         open_window(popup)
 
 
@@ -263,13 +246,13 @@ def on_settings_changed(key: str, value: t.Any) -> None:
         key = key.lstrip("themes.")
         if key in THEMES_CONFIGS.keys():
             update_theme_link(value, key)
-            generate_by_settings(force=True)
+            colors.generate_by_settings(force=True)
     elif key == "hyprland.decoration.rounding":
         reload_css()
     elif key == "opacity":
         reload_css()
     elif key == "color":
-        generate_by_settings()
+        colors.generate_by_settings()
 
 
 def on_lid_closed(is_closed: bool) -> None:
@@ -307,6 +290,8 @@ def on_lid_closed(is_closed: bool) -> None:
 
 
 class StateService(Service):
+    depends = (MprisService, UPowerService, Login1ManagerService)
+
     def start(self) -> None:
         opened_windows.init()
         settings = Settings()
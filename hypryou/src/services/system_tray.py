@@ -9,7 +9,8 @@ from src.services.dbus import dbus_proxy, cache_proxy_properties
 from src.services.dbus import name_owner_changed
 import typing as t
 from utils.ref import Ref
-from utils.service import Signals, Service
+from utils.service import Signals, Service, Lane
+from src.services.desktop_entries import desktop_entries
 from utils_cy.helpers import argb_to_rgba
 
 
@@ -26,7 +27,9 @@ BUS_ITEM = "org.kde.StatusNotifierItem"
 PATH_ITEM = "/StatusNotifierItem"
 
 
-items = Ref[dict[str, "StatusNotifierItem"]]({}, name="tray_items")
+items = Ref[dict[str, "StatusNotifierItem"]](
+    {}, name="tray_items", lane=Lane.BACKGROUND
+)
 
 
 type Status = t.Literal["Passive", "Active", "NeedsAttention"]
@@ -63,7 +66,7 @@ class StatusNotifierItem(Signals):
         self,
         proxy: gio.DBusProxy
     ) -> None:
-        super().__init__()
+        super().__init__(lane=Lane.BACKGROUND)
         self._proxy = proxy
         self._conn = proxy.get_connection()
         self._bus_name = self.get_bus_name()
@@ -190,7 +193,11 @@ class StatusNotifierItem(Signals):
                 name = tooltip[2] if tooltip else None
             if not name:
                 pid = get_pid(self.get_bus_name())
-                name = get_process_title(pid)
+                process_title = get_process_title(pid)
+                name = (
+                    desktop_entries.get_name(process_title)
+                    or process_title
+                )
         except Exception as e:
             if __debug__:
                 logger.debug(
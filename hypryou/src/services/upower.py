@@ -247,6 +247,8 @@ def get_upower() -> UPower:
 
 
 class UPowerService(Service):
+    threaded_init = True
+
     def app_init(self) -> None:
         global _instance
         if __debug__:
@@ -1,23 +1,181 @@
+import os
 import weakref
-from repository import gtk, layer_shell, gdk
+import traceback
+from repository import gtk, layer_shell, gdk, gobject, glib
 from utils.ref import Ref
+from utils.service import Signals
 from utils.logger import logger
 from utils.styles import toggle_css_class
 import typing as t
 from math import pi
 from config import Settings
-import src.services.state as state
+from utils.lazy import lazy_import
+from utils.trace import tracer
 if t.TYPE_CHECKING:
     import cairo
+    import src.services.state as state
+else:
+    # Greeter uses widgets without the services state depends on
+    state = lazy_import("src.services.state")
 
 
 __all__ = [
-    "Edges", "LayerWindow"
+    "Edges", "LayerWindow",
+    "Scope", "scope_for",
+    "LazyPopup", "PopupRegistry", "PopupFactory", "POPUP_POLICIES"
 ]
 
 type Edges = t.Literal["top", "bottom", "left", "right"]
 type Margins = dict[Edges, int]
 type Anchors = dict[Edges, bool]
+type Release = tuple[t.Callable[[int], t.Any], int]
+T = t.TypeVar("T")
+
+# Reports scopes that were garbage collected without being closed
+DEBUG_SCOPES = __debug__ and bool(os.getenv("HYPRYOU_DEBUG_SCOPES"))
+_open_scopes: "weakref.WeakSet[Scope]" = weakref.WeakSet()
+
+
+def _report_unclosed(
+    name: str,
+    releases: list[Release],
+    created_at: list[str]
+) -> None:
+    if releases:
+        logger.warning(
+            "Scope '%s' was never closed, %d subscriptions leaked. " +
+            "Created at:\n%s",
+            name, len(releases), "".join(created_at)
+        )
+
+
+class Scope:
+    """
+    Subscriptions of a widget: Ref, Signals and Settings watchers
+    and GObject handlers, all released at once by close().
+    """
+    __slots__ = ("name", "_releases", "_closed", "__weakref__")
+
+    def __init__(self, name: str = "unknown") -> None:
+        self.name = name
+        self._releases: list[Release] = []
+        self._closed = False
+        if DEBUG_SCOPES:
+            _open_scopes.add(self)
+            weakref.finalize(
+                self, _report_unclosed, name, self._releases,
+                traceback.format_stack()[:-1]
+            )
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def _add(self, release: t.Callable[[int], t.Any], handler_id: int) -> int:
+        if self._closed:
+            logger.warning(
+                "Scope '%s' is closed, subscription is released right away",
+                self.name
+            )
+            release(handler_id)
+            return handler_id
+        self._releases.append((release, handler_id))
+        return handler_id
+
+    def watch(
+        self,
+        ref: Ref[T],
+        callback: t.Callable[[T], None],
+        **kwargs: t.Any
+    ) -> int:
+        return self._add(ref.unwatch, ref.watch(callback, **kwargs))
+
+    def watch_signal(
+        self,
+        target: Signals | Ref[t.Any],
+        signal_name: str,
+        callback: t.Callable[..., None],
+        **kwargs: t.Any
+    ) -> int:
+        if isinstance(target, Ref):
+            return self._add(
+                target.unwatch_signal,
+                target.watch_signal(signal_name, callback, **kwargs)
+            )
+        return self._add(
+            target.unwatch,
+            target.watch(signal_name, callback, **kwargs)
+        )
+
+    def watch_setting(
+        self,
+        key: str,
+        callback: t.Callable[[t.Any], None],
+        init_call: bool = True,
+        **kwargs: t.Any
+    ) -> int:
+        settings = Settings()
+        return self._add(
+            settings.unwatch,
+            settings.watch(key, callback, init_call, **kwargs)
+        )
+
+    def connect(
+        self,
+        target: gobject.Object,
+        signal_name: str,
+        callback: t.Callable[..., t.Any],
+        *args: t.Any
+    ) -> int:
+        return self._add(
+            target.disconnect,
+            target.connect(signal_name, callback, *args)
+        )
+
+    def clear(self) -> None:
+        """Releases everything, scope can still be used after"""
+        releases = self._releases[:]
+        self._releases.clear()
+        for release, handler_id in reversed(releases):
+            try:
+                release(handler_id)
+            except Exception as e:
+                logger.warning(
+                    "Couldn't release subscription of scope '%s': %s",
+                    self.name, e
+                )
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self.clear()
+        if DEBUG_SCOPES:
+            _open_scopes.discard(self)
+
+
+def scope_for(widget: gtk.Widget, *, unrealize: bool = False) -> Scope:
+    """
+    Creates a Scope that is closed when widget is destroyed,
+    or unrealized if `unrealize` is True.
+    """
+    scope = Scope(type(widget).__name__)
+    weak_scope = weakref.ref(scope)
+
+    def on_release(*args: t.Any) -> None:
+        scope = weak_scope()
+        if scope is not None:
+            scope.close()
+
+    widget.connect("destroy", on_release)
+    if unrealize:
+        widget.connect("unrealize", on_release)
+    return scope
+
+
+def open_scopes() -> list[str]:
+    """Names of scopes that are alive and not closed, debug mode only"""
+    return [scope.name for scope in _open_scopes]
 
 
 class LayerWindow(gtk.ApplicationWindow):
@@ -45,6 +203,7 @@ class LayerWindow(gtk.ApplicationWindow):
         super().__init__(application=application, **kwargs)
         self.name = name
         self.is_popup = setup_popup
+        self.scope = scope_for(self)
         if width and height:
             self.set_default_size(width, height)
 
@@ -80,8 +239,8 @@ class LayerWindow(gtk.ApplicationWindow):
 
         if hide_on_esc:
             self.key_controller = gtk.EventControllerKey()
-            self.key_handler = self.key_controller.connect(
-                "key-pressed", self.on_key_press
+            self.scope.connect(
+                self.key_controller, "key-pressed", self.on_key_press
             )
             self.add_controller(self.key_controller)
 
@@ -92,11 +251,12 @@ class LayerWindow(gtk.ApplicationWindow):
 
         if setup_popup:
             if margins is None:
-                self.gaps_out_handler = Settings().watch(
+                self.scope.watch_setting(
                     "hyprland.gaps_out", self.on_gaps_out,
                     True
                 )
-            self.window_handler = state.opened_windows.watch(
+            self.scope.watch_signal(
+                state.opened_windows,
                 f"changed::{self.name}",
                 self.update_visible
             )
@@ -142,16 +302,136 @@ class LayerWindow(gtk.ApplicationWindow):
         self.on_show()
 
     def destroy(self) -> None:
+        self.scope.close()
         if hasattr(self, "key_controller"):
-            self.key_controller.disconnect(self.key_handler)
             self.remove_controller(self.key_controller)
-        if hasattr(self, "window_handler"):
-            state.opened_windows.unwatch(self.window_handler)
-        if hasattr(self, "gaps_out_handler"):
-            Settings().unwatch(self.gaps_out_handler)
         super().destroy()
 
 
+type PopupPolicy = t.Literal["eager", "idle", "on_demand"]
+type PopupFactory = t.Callable[[gtk.Application], LayerWindow]
+POPUP_POLICIES: tuple[PopupPolicy, ...] = ("eager", "idle", "on_demand")
+
+
+class LazyPopup:
+    """
+    Stands in for a popup window until it's opened for the first time.
+    """
+    __slots__ = (
+        "name", "factory", "window", "failed",
+        "_app", "_handler", "__weakref__"
+    )
+
+    def __init__(
+        self,
+        app: gtk.Application,
+        name: str,
+        factory: PopupFactory
+    ) -> None:
+        self.name = name
+        self.factory = factory
+        self.window: LayerWindow | None = None
+        self.failed = False
+        self._app = app
+        self._handler: int | None = state.opened_windows.watch(
+            f"opened::{name}", self.on_opened
+        )
+
+    @property
+    def built(self) -> bool:
+        return self.window is not None or self.failed
+
+    def build(self) -> LayerWindow | None:
+        if self.window is not None or self.failed:
+            return self.window
+        self.release()
+        try:
+            if __debug__:
+                logger.debug("Creating window %s", self.name)
+            with tracer.span(self.name, "popup"):
+                window = self.factory(self._app)
+                self._app.add_window(window)
+        except Exception as e:
+            self.failed = True
+            logger.error(
+                "Couldn't add window %s.",
+                self.name, exc_info=e
+            )
+            return None
+
+        if __debug__ and window.name != self.name:
+            logger.warning(
+                "Popup %s is registered as %s", window.name, self.name
+            )
+        self.window = window
+        return window
+
+    def on_opened(self) -> None:
+        window = self.build()
+        if window is not None:
+            # The window watches opened state only since now
+            window.update_visible(state.opened_windows.is_visible(self.name))
+
+    def release(self) -> None:
+        if self._handler is not None:
+            state.opened_windows.unwatch(self._handler)
+            self._handler = None
+
+    def destroy(self) -> None:
+        self.release()
+        if self.window is not None:
+            self.window.destroy()
+            self.window = None
+
+
+class PopupRegistry:
+    __slots__ = ("app", "popups", "_prewarm_id")
+
+    def __init__(self, app: gtk.Application) -> None:
+        self.app = app
+        self.popups: dict[str, LazyPopup] = {}
+        self._prewarm_id: int | None = None
+
+    def register(self, name: str, factory: PopupFactory) -> LazyPopup:
+        popup = LazyPopup(self.app, name, factory)
+        self.popups[name] = popup
+        return popup
+
+    def get(self, name: str) -> LayerWindow | None:
+        popup = self.popups.get(name)
+        return popup.build() if popup is not None else None
+
+    def start(self, policy: PopupPolicy) -> None:
+        if policy == "eager":
+            for popup in self.popups.values():
+                popup.build()
+        elif policy == "idle":
+            self._prewarm_id = glib.idle_add(
+                self._prewarm_next, priority=glib.PRIORITY_LOW
+            )
+        elif policy != "on_demand":
+            logger.warning("Unknown popups policy: %s", policy)
+
+    def _prewarm_next(self) -> bool:
+        # One window per idle slot to not block input and animations
+        for popup in self.popups.values():
+            if not popup.built:
+                popup.build()
+                return True
+        self._prewarm_id = None
+        if __debug__:
+            logger.debug("All popups are prewarmed")
+        return False
+
+    def destroy(self) -> None:
+        if self._prewarm_id is not None:
+            glib.source_remove(self._prewarm_id)
+            self._prewarm_id = None
+        for popup in self.popups.values():
+            popup.destroy()
+        self.popups.clear()
+
+
 class Icon(gtk.Label):
     __gtype_name__ = "MaterialIcon"
 
@@ -0,0 +1,4 @@
+import os
+
+# config.py builds paths of sockets from it when it's imported
+os.environ.setdefault("HYPRLAND_INSTANCE_SIGNATURE", "tests")
@@ -0,0 +1,58 @@
+import asyncio
+import json
+import socket
+import pytest
+import typing as t
+from pathlib import Path
+
+GLibEventLoopPolicy = pytest.importorskip("gi.events").GLibEventLoopPolicy
+
+from utils.ref import Ref  # noqa: E402
+import src.services.cli as cli  # noqa: E402
+
+
+def test_legacy_subscribe_stops_when_client_is_gone(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch
+) -> None:
+    ref = Ref(0, name="test")
+    monkeypatch.setitem(
+        cli.TOPICS, "test", cli.Topic((ref,), lambda: ref.value)
+    )
+    errors: list[dict[str, t.Any]] = []
+
+    async def run() -> None:
+        loop = asyncio.get_running_loop()
+        loop.set_exception_handler(
+            lambda loop, context: errors.append(context)
+        )
+        path = str(tmp_path / "socket")
+        server = await asyncio.start_unix_server(cli.handle_client, path=path)
+        # Plain socket, so nothing is read that the test didn't ask for
+        client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        client.setblocking(False)
+        await loop.sock_connect(client, path)
+        await loop.sock_sendall(client, b"subscribe test")
+        line = await loop.sock_recv(client, 1024)
+        assert json.loads(line) == {"topic": "test", "value": 0}
+        assert ref.handlers()
+
+        # Gone without half-closing, the next line is left unread
+        ref.value = 1
+        await asyncio.sleep(0.05)
+        client.close()
+        for _ in range(100):
+            if not ref.handlers():
+                break
+            await asyncio.sleep(0.01)
+        assert not ref.handlers()
+
+        server.close()
+        await server.wait_closed()
+
+    loop = GLibEventLoopPolicy().new_event_loop()
+    try:
+        loop.run_until_complete(run())
+    finally:
+        loop.close()
+    assert not errors
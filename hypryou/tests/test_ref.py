@@ -0,0 +1,83 @@
+import gc
+import weakref
+import pytest
+import typing as t
+
+pytest.importorskip("gi")
+
+from utils.ref import (  # noqa: E402
+    Ref, Computed, ListDelta, ReactiveDict, ReactiveList, batch
+)
+
+
+def test_deep_ref_shares_value_until_changed() -> None:
+    value: dict[str, t.Any] = {"a": [1, 2], "b": {"c": [3]}}
+    ref = Ref[dict[str, t.Any]]({}, name="test", deep=True)
+    ref.value = value
+    assert ref.unpack() is value
+
+    version = ref.version
+    ref.value = value
+    assert ref.version == version
+
+    ref.value["a"].append(4)
+    assert value == {"a": [1, 2], "b": {"c": [3]}}
+    assert ref.unpack() == {"a": [1, 2, 4], "b": {"c": [3]}}
+    # Unchanged children are still shared
+    assert ref.unpack()["b"] is value["b"]
+
+
+def test_deep_ref_wraps_children_on_iteration() -> None:
+    ref = Ref({"a": [1], "b": {"c": 2}}, name="test", deep=True)
+    assert isinstance(dict(ref.value)["a"], ReactiveList)
+    assert isinstance({**ref.value}["b"], ReactiveDict)
+    assert all(
+        isinstance(value, (ReactiveList, ReactiveDict))
+        for value in ref.value.values()
+    )
+
+    items = Ref([[1], [2]], name="test", deep=True)
+    children = list(items.value)
+    assert all(isinstance(child, ReactiveList) for child in children)
+    version = items.version
+    children[0].append(3)
+    assert items.version == version + 1
+    assert items.unpack() == [[1, 3], [2]]
+
+
+def test_dropped_computed_is_collected() -> None:
+    source = Ref(1, name="test")
+    evaluated: list[int] = []
+
+    def func() -> int:
+        evaluated.append(source.value)
+        return source.value * 2
+
+    computed = Computed(0, func, name="test")
+    computed.watch(lambda value: None)
+    source.value = 2
+    assert evaluated == [1, 2]
+
+    reference = weakref.ref(computed)
+    del computed
+    gc.collect()
+    assert reference() is None
+    assert not source.dependents
+    source.value = 3
+    assert evaluated == [1, 2]
+
+
+def test_list_delta_keeps_index_error() -> None:
+    ref = Ref[list[int]]([], name="test")
+    ref.watch_delta(lambda delta: None)
+    with batch():
+        with pytest.raises(IndexError):
+            del ref.value[0]
+        with pytest.raises(IndexError):
+            ref.value[0] = 1
+        ref.value.append(1)
+        with pytest.raises(IndexError):
+            ref.value.pop(3)
+        ref.value.pop()
+        assert isinstance(ref._delta, ListDelta)
+        assert ref._delta.ops == [("insert", 0, 1), ("remove", 0, 1)]
@@ -0,0 +1,419 @@
+#!/usr/bin/env python3
+"""
+Fake Hyprland for benchmarking the IPC path without a compositor.
+
+Serves .socket.sock and .socket2.sock under a temporary
+HYPRLAND_INSTANCE_SIGNATURE, replays captures made with
+HYPRYOU_IPC_RECORD=<path> or generates synthetic storms,
+and reports event-to-Ref latency and CPU time of src/services/hyprland.py
+
+Run from the hypryou directory:
+    python -m tools.ipc_replay replay capture.jsonl --speed 4
+    python -m tools.ipc_replay storm windows --count 500
+    python -m tools.ipc_replay storm titles --count 10000 --json
+"""
+
+import argparse
+import asyncio
+import cProfile
+import json
+import os
+import pstats
+import shutil
+import sys
+import tempfile
+import time
+import typing as t
+
+BATCH_DELIMITER = "\n\n\n"
+MONITOR_NAME = "HEADLESS-1"
+
+type Event = tuple[str, t.Any]
+
+
+def make_client(address: str, index: int) -> dict[str, t.Any]:
+    return {
+        "address": f"0x{address}",
+        "mapped": True,
+        "hidden": False,
+        "at": [0, 0],
+        "size": [800, 600],
+        "workspace": {"id": 1, "name": "1"},
+        "floating": False,
+        "pseudo": False,
+        "monitor": 0,
+        "class": "bench",
+        "title": f"bench-{index}",
+        "initialClass": "bench",
+        "initialTitle": f"bench-{index}",
+        "pid": 1000 + index,
+        "xwayland": False,
+        "pinned": False,
+        "fullscreen": 0,
+        "fullscreenClient": 0,
+        "grouped": [],
+        "tags": [],
+        "swallowing": "0x0",
+        "focusHistoryId": index,
+        "inhibitingIdle": False,
+        "xdgTag": "",
+        "xdgDescription": ""
+    }
+
+
+class FakeState:
+    """Minimal compositor state, enough for hyprland.init() and syncs"""
+
+    def __init__(self) -> None:
+        self.clients: dict[str, dict[str, t.Any]] = {}
+        self.active_workspace = 1
+
+    def reply(self, command: str) -> str:
+        command = command.removeprefix("j/")
+        if command == "version":
+            return json.dumps({"version": "bench", "commit": "0000000"})
+        if command == "activeworkspace":
+            return json.dumps({
+                "id": self.active_workspace,
+                "monitor": MONITOR_NAME
+            })
+        if command == "devices":
+            return json.dumps({"keyboards": [{
+                "main": True,
+                "layout": "us",
+                "active_keymap": "English (US)"
+            }]})
+        if command == "workspaces":
+            return json.dumps([{"id": 1, "monitorID": 0}])
+        if command.startswith("monitors"):
+            return json.dumps([{"id": 0, "name": MONITOR_NAME}])
+        if command == "clients":
+            return json.dumps(list(self.clients.values()))
+        if command == "activewindow":
+            return "{}"
+        return "ok"
+
+    def apply(self, line: str) -> None:
+        event, _, data = line.partition(">>")
+        args = data.split(",")
+        if event == "openwindow":
+            self.clients[args[0]] = make_client(args[0], len(self.clients))
+        elif event == "closewindow":
+            self.clients.pop(args[0], None)
+        elif event == "windowtitlev2" and args[0] in self.clients:
+            self.clients[args[0]]["title"] = ",".join(args[1:])
+        elif event == "workspacev2":
+            self.active_workspace = int(args[0])
+
+
+class FakeHyprland:
+    def __init__(
+        self,
+        runtime_dir: str,
+        signature: str,
+        responses: dict[str, str] | None = None
+    ) -> None:
+        self.path = os.path.join(runtime_dir, "hypr", signature)
+        self.state = FakeState()
+        self.responses = responses or {}
+        self.listeners: list[asyncio.StreamWriter] = []
+        self.servers: list[asyncio.Server] = []
+        self.connected = asyncio.Event()
+
+    async def start(self) -> None:
+        os.makedirs(self.path, exist_ok=True)
+        self.servers.append(await asyncio.start_unix_server(
+            self.handle_request,
+            os.path.join(self.path, ".socket.sock")
+        ))
+        self.servers.append(await asyncio.start_unix_server(
+            self.handle_events,
+            os.path.join(self.path, ".socket2.sock")
+        ))
+
+    def close(self) -> None:
+        for server in self.servers:
+            server.close()
+        for writer in self.listeners:
+            writer.close()
+
+    def reply(self, command: str) -> str:
+        if command in self.responses:
+            return self.responses[command]
+        return self.state.reply(command)
+
+    async def handle_request(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter
+    ) -> None:
+        payload = (await reader.read()).decode()
+        if payload.startswith("[[BATCH]]"):
+            commands = payload.removeprefix("[[BATCH]]").split(";")
+            response = BATCH_DELIMITER.join(
+                self.reply(command) for command in commands
+            )
+        else:
+            response = self.reply(payload)
+        writer.write(response.encode())
+        await writer.drain()
+        writer.close()
+
+    async def handle_events(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter
+    ) -> None:
+        self.listeners.append(writer)
+        self.connected.set()
+
+    async def send(self, line: str) -> None:
+        self.state.apply(line)
+        data = (line + "\n").encode()
+        for writer in self.listeners:
+            writer.write(data)
+            await writer.drain()
+
+
+class LatencyProbe:
+    """Matches values observed on Refs back to the time they were sent"""
+
+    def __init__(self) -> None:
+        self.sent_at: dict[t.Any, float] = {}
+        self.latencies: list[float] = []
+        self.last_seen = time.perf_counter()
+
+    def sent(self, marker: t.Any) -> None:
+        self.sent_at[marker] = time.perf_counter()
+
+    def seen(self, marker: t.Any) -> None:
+        now = time.perf_counter()
+        self.last_seen = now
+        sent_at = self.sent_at.pop(marker, None)
+        if sent_at is not None:
+            self.latencies.append(now - sent_at)
+
+    def report(self) -> dict[str, float]:
+        values = sorted(self.latencies)
+        if not values:
+            return {"observed": 0}
+
+        def percentile(p: float) -> float:
+            index = min(len(values) - 1, int(len(values) * p))
+            return values[index] * 1000
+
+        return {
+            "observed": len(values),
+            "dropped": len(self.sent_at),
+            "p50_ms": percentile(0.5),
+            "p95_ms": percentile(0.95),
+            "p99_ms": percentile(0.99),
+            "max_ms": values[-1] * 1000
+        }
+
+
+def load_capture(path: str) -> tuple[list[tuple[float, str]], dict[str, str]]:
+    events: list[tuple[float, str]] = []
+    responses: dict[str, str] = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            entry = json.loads(line)
+            if entry["kind"] == "event":
+                events.append((entry["t"], entry["line"]))
+            elif (
+                entry["kind"] == "request"
+                and entry["socket"] == "hyprland"
+                and entry["response"] is not None
+            ):
+                command: str = entry["command"]
+                if not command.startswith("[[BATCH]]"):
+                    responses[command] = entry["response"]
+                    continue
+                commands = command.removeprefix("[[BATCH]]").split(";")
+                replies = entry["response"].split(BATCH_DELIMITER)
+                if len(commands) == len(replies):
+                    responses.update(zip(commands, replies))
+    return events, responses
+
+
+def replay_marker(line: str) -> t.Any:
+    """Value that Refs get from a captured event, like storms yield"""
+    event, _, data = line.partition(">>")
+    args = data.split(",")
+    if event == "windowtitlev2" and len(args) > 1:
+        return ",".join(args[1:])
+    if event == "workspacev2" and args[0].lstrip("-").isdigit():
+        return int(args[0])
+    # Client count depends on captured replies, it can't be predicted
+    return None
+
+
+def windows_storm(count: int) -> t.Iterator[Event]:
+    for i in range(count):
+        address = f"{0x55000000 + i:x}"
+        yield f"openwindow>>{address},1,bench,bench-{i}", i + 1
+        yield f"windowtitlev2>>{address},bench-{i}", None
+
+
+def titles_storm(count: int) -> t.Iterator[Event]:
+    address = f"{0x55000000:x}"
+    yield f"openwindow>>{address},1,bench,bench-0", None
+    for i in range(count):
+        yield f"windowtitlev2>>{address},title-{i}", f"title-{i}"
+
+
+def workspaces_storm(count: int) -> t.Iterator[Event]:
+    for i in range(count):
+        workspace_id = i % 10 + 1
+        yield f"workspacev2>>{workspace_id},{workspace_id}", workspace_id
+
+
+async def run_bench(
+    fake: FakeHyprland,
+    events: t.Iterable[Event],
+    timed: list[float] | None,
+    speed: float,
+    settle: float
+) -> dict[str, t.Any]:
+    import src.services.hyprland as hyprland
+
+    probe = LatencyProbe()
+    watched: set[str] = set()
+
+    def on_clients(value: dict[str, t.Any]) -> None:
+        probe.seen(len(value))
+        for address, _client in value.items():
+            if address not in watched:
+                watched.add(address)
+                _client.watch(
+                    "changed", lambda c=_client: probe.seen(c.title)
+                )
+
+    await fake.start()
+    await hyprland.init()
+    hyprland.clients.watch(on_clients)
+    hyprland.active_workspace.watch(probe.seen)
+    connect_task = asyncio.create_task(hyprland.client.connect())
+    await fake.connected.wait()
+
+    profiler = cProfile.Profile()
+    cpu_started = time.process_time()
+    started = time.perf_counter()
+    profiler.enable()
+
+    previous = 0.0
+    for i, (line, marker) in enumerate(events):
+        if timed is not None and speed > 0:
+            delay = (timed[i] - previous) / speed
+            previous = timed[i]
+            if delay > 0:
+                await asyncio.sleep(delay)
+        if marker is not None:
+            probe.sent(marker)
+        await fake.send(line)
+        if i % 64 == 0:
+            # Let the client read while the storm goes on
+            await asyncio.sleep(0)
+
+    while time.perf_counter() - probe.last_seen < settle:
+        await asyncio.sleep(settle / 4)
+
+    profiler.disable()
+    wall = probe.last_seen - started
+    cpu = time.process_time() - cpu_started
+    connect_task.cancel()
+
+    stats = pstats.Stats(profiler)
+    module_cpu = sum(
+        tottime
+        for (filename, _, _), (_, _, tottime, _, _)
+        in stats.stats.items()  # type: ignore[attr-defined]
+        if filename.endswith(os.path.join("services", "hyprland.py"))
+    )
+    return {
+        "latency": probe.report(),
+        "wall_ms": wall * 1000,
+        "cpu_ms": cpu * 1000,
+        "hyprland_py_cpu_ms": module_cpu * 1000,
+        "requests": hyprland.client.stats.as_dict()
+    }
+
+
+def print_report(report: dict[str, t.Any]) -> None:
+    for section, value in report.items():
+        if isinstance(value, dict):
+            print(f"{section}:")
+            for key, item in value.items():
+                print(f"  {key:<20} {item:.3f}")
+        else:
+            print(f"{section:<22} {value:.3f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--json", action="store_true")
+    parser.add_argument(
+        "--settle", type=float, default=0.5,
+        help="Seconds without Ref changes before the run is finished"
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    replay = commands.add_parser("replay")
+    replay.add_argument("capture")
+    replay.add_argument(
+        "--speed", type=float, default=1.0,
+        help="Playback speed, 0 sends everything at once"
+    )
+
+    storm = commands.add_parser("storm")
+    storm.add_argument("kind", choices=("windows", "titles", "workspaces"))
+    storm.add_argument("--count", type=int, default=500)
+
+    args = parser.parse_args()
+
+    runtime_dir = tempfile.mkdtemp(prefix="hypryou-bench-")
+    signature = f"bench_{os.getpid()}"
+    os.environ["XDG_RUNTIME_DIR"] = runtime_dir
+    os.environ["HYPRLAND_INSTANCE_SIGNATURE"] = signature
+    sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+    from gi.events import GLibEventLoopPolicy  # type: ignore
+    asyncio.set_event_loop_policy(GLibEventLoopPolicy())
+
+    timed: list[float] | None = None
+    events: t.Iterable[Event]
+    if args.command == "replay":
+        captured, responses = load_capture(args.capture)
+        events = ((line, replay_marker(line)) for _, line in captured)
+        timed = [offset for offset, _ in captured]
+        speed = args.speed
+    else:
+        responses = {}
+        speed = 0
+        storms = {
+            "windows": windows_storm,
+            "titles": titles_storm,
+            "workspaces": workspaces_storm
+        }
+        events = storms[args.kind](args.count)
+
+    async def run() -> dict[str, t.Any]:
+        fake = FakeHyprland(runtime_dir, signature, responses)
+        try:
+            return await run_bench(fake, events, timed, speed, args.settle)
+        finally:
+            fake.close()
+
+    try:
+        report = asyncio.run(run())
+    finally:
+        shutil.rmtree(runtime_dir, ignore_errors=True)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+
+if __name__ == "__main__":
+    main()
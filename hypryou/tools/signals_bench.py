@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for Signals.notify_sync.
+
+Reports emissions per second for a range of handler counts, with plain
+functions and with bound methods (which go through the weak wrapper)
+
+Run from the hypryou directory:
+    python -m tools.signals_bench
+    python -m tools.signals_bench --handlers 1 10 100 --json
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import typing as t
+
+
+class Counter:
+    __slots__ = ("__weakref__", "calls")
+
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def on_changed(self, value: t.Any) -> None:
+        self.calls += 1
+
+
+def bench(
+    handlers: int,
+    bound: bool,
+    duration: float
+) -> dict[str, float]:
+    from utils.service import Signals
+
+    signals = Signals()
+    # Keep the objects alive, weak handlers would be dropped otherwise
+    counters = [Counter() for _ in range(handlers)]
+    for counter in counters:
+        if bound:
+            signals.watch("changed", counter.on_changed)
+        else:
+            signals.watch("changed", lambda value: None)
+
+    notify = signals.notify_sync
+    emitted = 0
+    started = time.perf_counter()
+    deadline = started + duration
+    while time.perf_counter() < deadline:
+        for _ in range(1000):
+            notify("changed", emitted)
+        emitted += 1000
+    elapsed = time.perf_counter() - started
+
+    return {
+        "handlers": handlers,
+        "emissions_per_sec": emitted / elapsed,
+        "calls_per_sec": emitted * handlers / elapsed,
+        "ns_per_emission": elapsed / emitted * 1e9
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument(
+        "--handlers", type=int, nargs="+", default=[0, 1, 10, 100]
+    )
+    parser.add_argument(
+        "--duration", type=float, default=1.0,
+        help="Seconds to run every case for"
+    )
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+    report: dict[str, list[dict[str, float]]] = {}
+    for kind, bound in (("functions", False), ("methods", True)):
+        report[kind] = [
+            bench(count, bound, args.duration)
+            for count in args.handlers
+        ]
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    for kind, results in report.items():
+        print(f"{kind}:")
+        for result in results:
+            print(
+                f"  {result['handlers']:>5} handlers"
+                f"  {result['emissions_per_sec']:>12,.0f} emissions/s"
+                f"  {result['ns_per_emission']:>10,.0f} ns/emission"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,8 @@
+from __future__ import annotations
 import os
 import json
 import threading
 import concurrent.futures
-from materialyoucolor.dynamiccolor.material_dynamic_colors import DynamicColor  # type: ignore # noqa
-from materialyoucolor.dynamiccolor.material_dynamic_colors import MaterialDynamicColors  # noqa
-from materialyoucolor.scheme.dynamic_scheme import DynamicScheme  # type: ignore # noqa
-from materialyoucolor.scheme.scheme_tonal_spot import SchemeTonalSpot  # type: ignore # noqa
 import hashlib
 import re
 import typing as t
@@ -19,8 +16,19 @@ from pathlib import Path
 from os.path import join
 from utils.styles import reload_css
 from utils_cy.helpers import downsample_image_rgb
+from utils.lazy import lazy_import
+from utils.trace import tracer, TraceEvent
 if t.TYPE_CHECKING:
     import subprocess
+    from materialyoucolor.dynamiccolor.material_dynamic_colors import DynamicColor  # type: ignore # noqa
+    from materialyoucolor.scheme.dynamic_scheme import DynamicScheme  # type: ignore # noqa
+
+# Needed only when colors are generated, not when they're loaded from cache
+dynamic_colors = lazy_import(
+    "materialyoucolor.dynamiccolor.material_dynamic_colors"
+)
+dynamic_scheme = lazy_import("materialyoucolor.scheme.dynamic_scheme")
+scheme_tonal_spot = lazy_import("materialyoucolor.scheme.scheme_tonal_spot")
 
 # I dropped support of color schemes
 # Because it's just easier when there's only 1 of them
@@ -57,9 +65,13 @@ def rgba_to_rgb(rgba: RGBA) -> str:
     return f'{rgba[0]}, {rgba[1]}, {rgba[2]}'
 
 
+def color_names() -> t.KeysView[str]:
+    return vars(dynamic_colors.MaterialDynamicColors).keys()
+
+
 def get_color(color_name: str) -> DynamicColor | None:
-    color = getattr(MaterialDynamicColors, color_name, None)
-    if isinstance(color, DynamicColor):
+    color = getattr(dynamic_colors.MaterialDynamicColors, color_name, None)
+    if isinstance(color, dynamic_colors.DynamicColor):
         return color
     else:
         return None
@@ -88,8 +100,8 @@ class ColorsCache:
         self.contrast_level = contrast_level
         self.is_dark = is_dark
 
-        if isinstance(colors, DynamicScheme):
-            for color_name in vars(MaterialDynamicColors).keys():
+        if isinstance(colors, dynamic_scheme.DynamicScheme):
+            for color_name in color_names():
                 color = get_color(color_name)
                 if color is None:
                     continue
@@ -107,7 +119,7 @@ class ColorsCache:
                 for key, value in scheme.items():
                     self.colors[f"{key}{suffix}"] = value
                 continue
-            for color_name in vars(MaterialDynamicColors).keys():
+            for color_name in color_names():
                 color = get_color(color_name)
                 if color is None:
                     continue
@@ -174,7 +186,7 @@ def generate_color_map(
         (light_scheme, "Light")
     )
     color_map: dict[str, str] = {}
-    for _color_name in vars(MaterialDynamicColors).keys():
+    for _color_name in color_names():
         for _scheme, suffix in _schemes:
             color = get_color(_color_name)
             color_name = f"{_color_name}{suffix}"
@@ -428,7 +440,7 @@ def generate_templates(
     )
     for file in ready_templates:
         _template = ""
-        for _color_name in vars(MaterialDynamicColors).keys():
+        for _color_name in color_names():
             for _scheme, suffix in _schemes:
                 color = get_color(_color_name)
                 color_name = f"{_color_name}{suffix}"
@@ -526,8 +538,9 @@ def generate_colors_sync(
     image_path: str,
     use_color: t.Literal[None] = None,
     is_dark: bool = True,
-    contrast_level: int = 0
-) -> None:
+    contrast_level: int = 0,
+    trace: bool = False
+) -> list[TraceEvent]:
     ...
 
 
@@ -536,8 +549,9 @@ def generate_colors_sync(
     image_path: t.Literal[None],
     use_color: int,
     is_dark: bool = True,
-    contrast_level: int = 0
-) -> None:
+    contrast_level: int = 0,
+    trace: bool = False
+) -> list[TraceEvent]:
     ...
 
 
@@ -545,30 +559,39 @@ def generate_colors_sync(
     image_path: str | None = None,
     use_color: int | None = None,
     is_dark: bool = True,
-    contrast_level: int = 0
-) -> None:
-    from materialyoucolor.hct import Hct  # type: ignore
+    contrast_level: int = 0,
+    trace: bool = False
+) -> list[TraceEvent]:
+    # Runs in a worker process, its trace events are returned
+    if trace:
+        tracer.start()
+    mark = tracer.mark()
+
+    with tracer.span("import_hct", "colors"):
+        from materialyoucolor.hct import Hct  # type: ignore
 
     if use_color is None and image_path is not None:
-        color = process_image(image_path, 4, 1024)
+        with tracer.span("process_image", "colors"):
+            color = process_image(image_path, 4, 1024)
     elif use_color is not None and image_path is None:
         color = use_color
     else:
         raise TypeError("Either image_path or use_color should be not None.")
 
-    dark_scheme = SchemeTonalSpot(
-        Hct.from_int(color),
-        True,
-        contrast_level
-    )
-    light_scheme = SchemeTonalSpot(
-        Hct.from_int(color),
-        False,
-        contrast_level
-    )
-    scheme = dark_scheme if is_dark else light_scheme
+    with tracer.span("schemes", "colors"):
+        dark_scheme = scheme_tonal_spot.SchemeTonalSpot(
+            Hct.from_int(color),
+            True,
+            contrast_level
+        )
+        light_scheme = scheme_tonal_spot.SchemeTonalSpot(
+            Hct.from_int(color),
+            False,
+            contrast_level
+        )
+        scheme = dark_scheme if is_dark else light_scheme
 
-    with open(colors_json, 'w') as f:
+    with tracer.span("colors_json", "colors"), open(colors_json, 'w') as f:
         object = ColorsCache(
             scheme, image_path, use_color, contrast_level, is_dark,
             dark_scheme, light_scheme
@@ -576,19 +599,9 @@ def generate_colors_sync(
         json.dump(colors_dict(object), f, indent=2)
 
     allowed_actions = ("compile_scss", "mark")
-    post = generate_templates(
-        TEMPLATES_DIR,
-        CACHE_PATH,
-        scheme,
-        dark_scheme,
-        light_scheme,
-        is_dark,
-        image_path,
-        allowed_actions
-    )
-    if os.path.isdir(USER_TEMPLATES_DIR):
-        post.update(generate_templates(
-            USER_TEMPLATES_DIR,
+    with tracer.span("templates", "colors"):
+        post = generate_templates(
+            TEMPLATES_DIR,
             CACHE_PATH,
             scheme,
             dark_scheme,
@@ -596,7 +609,18 @@ def generate_colors_sync(
             is_dark,
             image_path,
             allowed_actions
-        ))
+        )
+        if os.path.isdir(USER_TEMPLATES_DIR):
+            post.update(generate_templates(
+                USER_TEMPLATES_DIR,
+                CACHE_PATH,
+                scheme,
+                dark_scheme,
+                light_scheme,
+                is_dark,
+                image_path,
+                allowed_actions
+            ))
 
     marked: dict[str, str] = {}
     processes: list["subprocess.Popen[bytes]"] = []
@@ -619,10 +643,14 @@ def generate_colors_sync(
                 name = action.split(".", 1)[1]
                 marked[name] = file_path
 
-    post_actions(marked, object)
+    with tracer.span("post_actions", "colors"):
+        post_actions(marked, object)
+
+    with tracer.span("sass", "colors", {"count": len(processes)}):
+        for proc in processes:
+            proc.wait(15)
 
-    for proc in processes:
-        proc.wait(15)
+    return tracer.since(mark) if trace else []
 
 
 def generate_telegram_theme(path: str, bg: str) -> None:
@@ -685,11 +713,12 @@ def update_gtk4() -> None:
 
 
 def default_on_complete() -> None:
-    reload_css()
-    sync()
-    update_settings()
-    update_gtk3()
-    update_gtk4()
+    with tracer.span("apply_colors", "colors"):
+        reload_css()
+        sync()
+        update_settings()
+        update_gtk3()
+        update_gtk4()
 
 
 def generate_colors(
@@ -702,11 +731,17 @@ def generate_colors(
     import functools
     global executor
 
-    def _callback(future: concurrent.futures.Future[None]) -> None:
+    span = tracer.async_span(
+        "generate_colors", "colors",
+        {"image": image_path, "color": use_color} if tracer.enabled else None
+    )
+
+    def _callback(future: concurrent.futures.Future[list[TraceEvent]]) -> None:
         try:
-            future.result()
+            tracer.extend(future.result())
         except Exception as e:
             logger.error("Couldn't generate colors: %s", e, exc_info=e)
+        span.end()
 
         glib.idle_add(default_on_complete)
         if on_complete:
@@ -724,7 +759,8 @@ def generate_colors(
                     image_path=image_path,
                     use_color=use_color,
                     is_dark=is_dark,
-                    contrast_level=contrast_level
+                    contrast_level=contrast_level,
+                    trace=tracer.enabled
                 )
             )
             future.add_done_callback(_callback)
@@ -0,0 +1,132 @@
+import sys
+import time
+import threading
+import types
+import typing as t
+from importlib.machinery import ModuleSpec
+if t.TYPE_CHECKING:
+    from importlib.abc import Loader
+
+# Imported by __start__.py, so only the standard library is used here
+
+
+class ImportRecord(t.NamedTuple):
+    name: str
+    self_time: float
+    cumulative: float
+    depth: int
+
+
+class TimedLoader:
+    """
+    Wraps loader of a module until it's executed,
+    after that the module gets its own loader back.
+    """
+    __slots__ = ("loader", "timer", "created")
+
+    def __init__(self, loader: t.Any, timer: "ImportTimer") -> None:
+        self.loader = loader
+        self.timer = timer
+        self.created = 0.0
+
+    def create_module(self, spec: ModuleSpec) -> types.ModuleType | None:
+        create_module = getattr(self.loader, "create_module", None)
+        if create_module is None:
+            return None
+        started = time.perf_counter()
+        try:
+            module: types.ModuleType | None = create_module(spec)
+        finally:
+            # Single-phase extension modules are initialized here
+            self.created = time.perf_counter() - started
+        return module
+
+    def exec_module(self, module: types.ModuleType) -> None:
+        stack = self.timer.stack()
+        stack.append(0.0)
+        started = time.perf_counter()
+        try:
+            self.loader.exec_module(module)
+        finally:
+            elapsed = time.perf_counter() - started + self.created
+            children = stack.pop()
+            if stack:
+                stack[-1] += elapsed
+            self.timer.records.append(ImportRecord(
+                module.__name__, elapsed - children, elapsed, len(stack)
+            ))
+            module.__loader__ = self.loader
+            if module.__spec__ is not None:
+                module.__spec__.loader = self.loader
+
+    def __getattr__(self, name: str) -> t.Any:
+        return getattr(self.loader, name)
+
+
+class ImportTimer:
+    """
+    Meta path finder that measures imports like python -X importtime
+    """
+    __slots__ = ("records", "_local")
+
+    def __init__(self) -> None:
+        self.records: list[ImportRecord] = []
+        self._local = threading.local()
+
+    def stack(self) -> list[float]:
+        stack: list[float] | None = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def install(self) -> None:
+        if self not in sys.meta_path:
+            sys.meta_path.insert(0, self)
+
+    def uninstall(self) -> None:
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+
+    def find_spec(
+        self,
+        fullname: str,
+        path: t.Sequence[str] | None,
+        target: types.ModuleType | None = None
+    ) -> ModuleSpec | None:
+        for finder in sys.meta_path:
+            find_spec = getattr(finder, "find_spec", None)
+            if finder is self or find_spec is None:
+                continue
+            spec: ModuleSpec | None = find_spec(fullname, path, target)
+            if spec is not None:
+                break
+        else:
+            return None
+
+        if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+            # Not a subclass, importlib.abc takes too long to import
+            spec.loader = t.cast("Loader", TimedLoader(spec.loader, self))
+        return spec
+
+    def report(self) -> str:
+        # Same format as -X importtime, so tools like tuna can read it
+        lines = ["import time: self [us] | cumulative | imported package"]
+        for record in self.records:
+            lines.append(
+                f"import time: {int(record.self_time * 1_000_000):>9} | " +
+                f"{int(record.cumulative * 1_000_000):>10} | " +
+                f"{"  " * record.depth}{record.name}"
+            )
+        return "\n".join(lines) + "\n"
+
+    def slowest(self, limit: int = 10) -> list[ImportRecord]:
+        return sorted(
+            self.records, key=lambda x: x.self_time, reverse=True
+        )[:limit]
+
+    def write_report(self, path: str) -> None:
+        with open(path, "w") as f:
+            f.write(self.report())
+
+
+import_timer = ImportTimer()
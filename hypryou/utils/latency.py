@@ -0,0 +1,154 @@
+import os
+import sys
+import time
+import threading
+import traceback
+import typing as t
+from collections import deque
+from utils.logger import logger
+
+# Values below it are exact, above it relative error is under 1/64
+SUB_BUCKETS = 128
+HALF_BUCKETS = SUB_BUCKETS // 2
+SUB_BUCKET_BITS = SUB_BUCKETS.bit_length() - 1
+PERCENTILES = (50.0, 90.0, 99.0, 99.9)
+
+
+def bucket_index(value: int) -> int:
+    if value < SUB_BUCKETS:
+        return value
+    shift = value.bit_length() - SUB_BUCKET_BITS
+    sub = (value >> shift) - HALF_BUCKETS
+    return SUB_BUCKETS + (shift - 1) * HALF_BUCKETS + sub
+
+
+def bucket_value(index: int) -> int:
+    # Highest value of the bucket, percentiles are not underestimated
+    if index < SUB_BUCKETS:
+        return index
+    shift, sub = divmod(index - SUB_BUCKETS, HALF_BUCKETS)
+    shift += 1
+    return ((sub + HALF_BUCKETS + 1) << shift) - 1
+
+
+class Histogram:
+    """
+    Log-linear histogram of integer values like HdrHistogram,
+    memory doesn't depend on amount of recorded values.
+    """
+    __slots__ = ("counts", "count", "total", "min", "max")
+
+    def __init__(self) -> None:
+        self.counts: list[int] = []
+        self.count = 0
+        self.total = 0
+        self.min = 0
+        self.max = 0
+
+    def record(self, value: int) -> None:
+        index = bucket_index(max(value, 0))
+        counts = self.counts
+        if index >= len(counts):
+            counts.extend([0] * (index + 1 - len(counts)))
+        counts[index] += 1
+        if self.count == 0 or value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        self.count += 1
+        self.total += value
+
+    def percentile(self, percentile: float) -> int:
+        if self.count == 0:
+            return 0
+        target = max(1, int(self.count * percentile / 100 + 0.5))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                return min(bucket_value(index), self.max)
+        return self.max
+
+    def reset(self) -> None:
+        self.counts = []
+        self.count = 0
+        self.total = 0
+        self.min = 0
+        self.max = 0
+
+
+class SlowEvent(t.NamedTuple):
+    timestamp: float
+    delay_ms: float
+    stack: str
+
+
+class LoopMonitor:
+    """
+    Main loop latency measured by the watchdog thread,
+    histogram values are in microseconds.
+    """
+    __slots__ = (
+        "histogram", "interval", "threshold", "slow_count",
+        "slow_events", "_lock"
+    )
+
+    def __init__(self) -> None:
+        self.histogram = Histogram()
+        # Seconds between pings
+        self.interval = 0.1
+        # Seconds of delay after which main thread stack is sampled
+        self.threshold = int(
+            os.getenv("HYPRYOU_SLOW_CALLBACK_MS", "50")
+        ) / 1000
+        self.slow_count = 0
+        self.slow_events: deque[SlowEvent] = deque(maxlen=20)
+        self._lock = threading.Lock()
+
+    def record(self, delay: float) -> None:
+        with self._lock:
+            self.histogram.record(int(delay * 1_000_000))
+
+    def record_slow(self, delay: float, stack: str) -> None:
+        delay_ms = delay * 1000
+        with self._lock:
+            self.slow_count += 1
+            self.slow_events.append(
+                SlowEvent(time.time(), delay_ms, stack)
+            )
+        logger.warning(
+            "Main loop was blocked for %.0f ms at:\n%s", delay_ms, stack
+        )
+
+    def reset(self) -> None:
+        with self._lock:
+            self.histogram.reset()
+            self.slow_count = 0
+            self.slow_events.clear()
+
+    def report(self) -> dict[str, t.Any]:
+        with self._lock:
+            histogram = self.histogram
+            return {
+                "count": histogram.count,
+                "mean_ms": histogram.total / (histogram.count or 1) / 1000,
+                "min_ms": histogram.min / 1000,
+                "max_ms": histogram.max / 1000,
+                "percentiles_ms": {
+                    f"{p:g}": histogram.percentile(p) / 1000
+                    for p in PERCENTILES
+                },
+                "threshold_ms": self.threshold * 1000,
+                "slow_count": self.slow_count,
+                "slow": [event._asdict() for event in self.slow_events]
+            }
+
+
+def sample_stack(thread_id: int, limit: int = 8) -> str:
+    frame = sys._current_frames().get(thread_id)
+    if frame is None:
+        return "  <no frame>\n"
+    return "".join(traceback.format_stack(frame, limit))
+
+
+loop_monitor = LoopMonitor()
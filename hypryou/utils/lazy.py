@@ -0,0 +1,64 @@
+import types
+import importlib
+import threading
+import typing as t
+
+
+class LazyModule(types.ModuleType):
+    """
+    Stands in for a module and imports it on first attribute access.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        loader: t.Callable[[], types.ModuleType] | None = None
+    ) -> None:
+        super().__init__(name)
+        self.__dict__["_lazy_loader"] = loader or (
+            lambda: importlib.import_module(name)
+        )
+        self.__dict__["_lazy_module"] = None
+        self.__dict__["_lazy_lock"] = threading.Lock()
+
+    def _load(self) -> types.ModuleType:
+        module: types.ModuleType | None = self.__dict__["_lazy_module"]
+        if module is None:
+            with self.__dict__["_lazy_lock"]:
+                module = self.__dict__["_lazy_module"]
+                if module is None:
+                    module = self.__dict__["_lazy_loader"]()
+                    self.__dict__["_lazy_module"] = module
+        return module
+
+    @property
+    def loaded(self) -> bool:
+        return self.__dict__["_lazy_module"] is not None
+
+    def __getattr__(self, name: str) -> t.Any:
+        # Not cached, globals of python modules can be reassigned
+        return getattr(self._load(), name)
+
+    def __setattr__(self, name: str, value: t.Any) -> None:
+        setattr(self._load(), name, value)
+
+    def __dir__(self) -> list[str]:
+        return dir(self._load())
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.loaded else "not loaded"
+        return f"<lazy module '{self.__name__}' ({state})>"
+
+
+def lazy_import(name: str) -> t.Any:
+    return LazyModule(name)
+
+
+def lazy_gi(namespace: str, version: str | None = None) -> t.Any:
+    def load() -> types.ModuleType:
+        import gi
+        if version is not None:
+            gi.require_version(namespace, version)
+        return importlib.import_module(f"gi.repository.{namespace}")
+
+    return LazyModule(f"gi.repository.{namespace}", load)
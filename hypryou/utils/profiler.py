@@ -0,0 +1,243 @@
+import os
+import io
+import sys
+import time
+import types
+import pstats
+import cProfile
+import threading
+import tracemalloc
+import typing as t
+from collections import Counter
+from config import APP_CACHE_DIR
+from utils.logger import logger
+
+type Mode = t.Literal["cpu", "sample", "alloc"]
+
+MODES: tuple[Mode, ...] = ("cpu", "sample", "alloc")
+EXTENSIONS: dict[Mode, str] = {
+    "cpu": "pstats",
+    "sample": "collapsed",
+    "alloc": "collapsed"
+}
+PROFILES_DIR = os.path.join(APP_CACHE_DIR, "profiles")
+SAMPLE_INTERVAL = 0.005
+ALLOC_FRAMES = 32
+SUMMARY_LIMIT = 10
+
+
+def code_name(code: types.CodeType) -> str:
+    # ";" and spaces separate frames and counts in collapsed stacks
+    filename = os.path.basename(code.co_filename)
+    name = f"{filename}:{code.co_qualname}:{code.co_firstlineno}"
+    return name.replace(";", ":").replace(" ", "_")
+
+
+def write_collapsed(path: str, stacks: Counter[str]) -> None:
+    # Format of flamegraph.pl, inferno, speedscope and so on
+    with open(path, "w") as f:
+        for stack, count in stacks.most_common():
+            f.write(f"{stack} {count}\n")
+
+
+class Sampler:
+    """
+    Walks frames of one thread from a background thread,
+    target thread isn't slowed down by tracing hooks.
+    """
+    __slots__ = (
+        "thread_id", "interval", "stacks", "samples",
+        "_names", "_stop", "_thread"
+    )
+
+    def __init__(self, thread_id: int, interval: float) -> None:
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter[str] = Counter()
+        self.samples = 0
+        self._names: dict[types.CodeType, str] = {}
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(
+            target=self._run, name="hypryou-sampler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _name(self, code: types.CodeType) -> str:
+        name = self._names.get(code)
+        if name is None:
+            name = self._names[code] = code_name(code)
+        return name
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack: list[str] = []
+            while frame is not None:
+                stack.append(self._name(frame.f_code))
+                frame = frame.f_back
+            del frame
+            if stack:
+                stack.reverse()
+                self.stacks[";".join(stack)] += 1
+                self.samples += 1
+
+
+class Profiler:
+    """
+    Profiles the thread that calls start, which is the GLib main loop
+    for commands of the cli.
+    """
+    __slots__ = (
+        "mode", "started", "_profile", "_sampler",
+        "_snapshot", "_owns_tracemalloc"
+    )
+
+    def __init__(self) -> None:
+        self.mode: Mode | None = None
+        self.started = 0.0
+        self._profile: cProfile.Profile | None = None
+        self._sampler: Sampler | None = None
+        self._snapshot: tracemalloc.Snapshot | None = None
+        self._owns_tracemalloc = False
+
+    @property
+    def running(self) -> bool:
+        return self.mode is not None
+
+    def default_path(self, mode: Mode) -> str:
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        return os.path.join(
+            PROFILES_DIR, f"{mode}-{stamp}.{EXTENSIONS[mode]}"
+        )
+
+    def start(self, mode: Mode) -> None:
+        if self.mode is not None:
+            raise RuntimeError(f"Profiler is already running ({self.mode})")
+        if mode == "cpu":
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        elif mode == "sample":
+            self._sampler = Sampler(threading.get_ident(), SAMPLE_INTERVAL)
+            self._sampler.start()
+        elif mode == "alloc":
+            self._owns_tracemalloc = not tracemalloc.is_tracing()
+            if self._owns_tracemalloc:
+                tracemalloc.start(ALLOC_FRAMES)
+            self._snapshot = self._take_snapshot()
+        else:
+            raise ValueError(f"Unknown profiler mode {mode!r}")
+        self.mode = mode
+        self.started = time.monotonic()
+        if __debug__:
+            logger.debug("Started %s profiler", mode)
+
+    def stop(self, path: str | None = None) -> str:
+        mode = self.mode
+        if mode is None:
+            raise RuntimeError("Profiler is not running")
+        if path is None:
+            path = self.default_path(mode)
+        path = os.path.abspath(os.path.expanduser(path))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        elapsed = time.monotonic() - self.started
+        self.mode = None
+
+        if mode == "cpu":
+            summary = self._stop_cpu(path)
+        elif mode == "sample":
+            summary = self._stop_sample(path)
+        else:
+            summary = self._stop_alloc(path)
+        if __debug__:
+            logger.debug("Stopped %s profiler, written %s", mode, path)
+        return f"{mode} profile of {elapsed:.1f}s written to {path}\n{summary}"
+
+    def status(self) -> str:
+        if self.mode is None:
+            return "Profiler is not running"
+        elapsed = time.monotonic() - self.started
+        status = f"Running {self.mode} profiler for {elapsed:.1f}s"
+        if self._sampler is not None:
+            status += f", {self._sampler.samples} samples"
+        elif self.mode == "alloc":
+            current, peak = tracemalloc.get_traced_memory()
+            status += (
+                f", traced {current / 1024:.0f} KiB" +
+                f" (peak {peak / 1024:.0f} KiB)"
+            )
+        return status
+
+    def _stop_cpu(self, path: str) -> str:
+        assert self._profile is not None
+        profile = self._profile
+        self._profile = None
+        profile.disable()
+        profile.dump_stats(path)
+
+        output = io.StringIO()
+        stats = pstats.Stats(profile, stream=output)
+        stats.sort_stats(pstats.SortKey.CUMULATIVE)
+        stats.print_stats(SUMMARY_LIMIT)
+        return output.getvalue().strip()
+
+    def _stop_sample(self, path: str) -> str:
+        assert self._sampler is not None
+        sampler = self._sampler
+        self._sampler = None
+        sampler.stop()
+        write_collapsed(path, sampler.stacks)
+
+        # Samples where function is on top of the stack
+        leaves: Counter[str] = Counter()
+        for stack, count in sampler.stacks.items():
+            leaves[stack.rsplit(";", 1)[-1]] += count
+        total = sampler.samples or 1
+        lines = [f"{sampler.samples} samples"]
+        for name, count in leaves.most_common(SUMMARY_LIMIT):
+            lines.append(f"{count / total * 100:6.2f}% {name}")
+        return "\n".join(lines)
+
+    def _stop_alloc(self, path: str) -> str:
+        assert self._snapshot is not None
+        old = self._snapshot
+        self._snapshot = None
+        new = self._take_snapshot()
+        if self._owns_tracemalloc:
+            tracemalloc.stop()
+            self._owns_tracemalloc = False
+
+        # Grown allocations weighted by bytes
+        stacks: Counter[str] = Counter()
+        for stat in new.compare_to(old, "traceback"):
+            if stat.size_diff <= 0:
+                continue
+            stack = ";".join(
+                f"{os.path.basename(frame.filename)}:{frame.lineno}"
+                for frame in stat.traceback
+            )
+            stacks[stack] += stat.size_diff
+        write_collapsed(path, stacks)
+
+        lines = []
+        for stat in new.compare_to(old, "lineno")[:SUMMARY_LIMIT]:
+            lines.append(str(stat))
+        return "\n".join(lines)
+
+    def _take_snapshot(self) -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<unknown>"),
+        ))
+
+
+profiler = Profiler()
@@ -1,12 +1,18 @@
 import asyncio
+import heapq
+import threading
+import time
 import typing as t
+import weakref
 from collections.abc import MutableSequence, MutableSet
 from utils.logger import logger
-from utils.service import Signals
-import inspect
+from utils.service import Signals, Lane, instrumentation
+from utils.handler import exit_error
+from repository import glib
 
 __all__ = [
-    "Ref"
+    "Ref", "Computed", "batch",
+    "KeyDelta", "ListDelta"
 ]
 
 T = t.TypeVar("T")
@@ -16,10 +22,122 @@ K = t.TypeVar("K")
 V = t.TypeVar("V")
 
 
+class KeyDelta:
+    """Keys added, removed or changed in a dict (or items of a set)"""
+    __slots__ = ("added", "removed", "changed")
+
+    def __init__(self) -> None:
+        self.added: set[t.Any] = set()
+        self.removed: set[t.Any] = set()
+        self.changed: set[t.Any] = set()
+
+    def add(self, key: t.Any) -> None:
+        if key in self.removed:
+            self.removed.discard(key)
+            self.changed.add(key)
+        else:
+            self.added.add(key)
+
+    def change(self, key: t.Any) -> None:
+        if key not in self.added:
+            self.changed.add(key)
+
+    def remove(self, key: t.Any) -> None:
+        if key in self.added:
+            self.added.discard(key)
+        else:
+            self.changed.discard(key)
+            self.removed.add(key)
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.changed)
+
+    def __repr__(self) -> str:
+        return (
+            f"KeyDelta(added={self.added!r}, " +
+            f"removed={self.removed!r}, changed={self.changed!r})"
+        )
+
+
+type ListOp = tuple[t.Literal["insert", "remove", "replace", "move"], int, int]
+
+
+class ListDelta:
+    """
+    Operations applied to a list in order.
+    ("insert", index, count), ("remove", index, count),
+    ("replace", index, count), ("move", from_index, to_index).
+    If `reset` is set, the whole list was replaced and ops are empty.
+    """
+    __slots__ = ("ops", "reset")
+
+    def __init__(self) -> None:
+        self.ops: list[ListOp] = []
+        self.reset = False
+
+    def add(self, op: ListOp) -> None:
+        if not self.reset:
+            self.ops.append(op)
+
+    def __bool__(self) -> bool:
+        return self.reset or bool(self.ops)
+
+    def __repr__(self) -> str:
+        return f"ListDelta(ops={self.ops!r}, reset={self.reset!r})"
+
+
+def diff_keys(old: t.Any, new: t.Any) -> KeyDelta:
+    delta = KeyDelta()
+    if isinstance(old, dict) and isinstance(new, dict):
+        for key, value in new.items():
+            if key not in old:
+                delta.added.add(key)
+            elif old[key] is not value and old[key] != value:
+                delta.changed.add(key)
+        delta.removed.update(key for key in old if key not in new)
+    else:
+        delta.added.update(item for item in new if item not in old)
+        delta.removed.update(item for item in old if item not in new)
+    return delta
+
+
+# Plain containers that deep refs keep unwrapped until they're accessed
+RAW_TYPES = (list, set, dict)
+
+
+def _source(value: t.Any) -> t.Any | None:
+    """Plain value the proxy was made from, if it wasn't changed since"""
+    if isinstance(value, (ReactiveList, ReactiveSet)):
+        return value._data if value._borrowed else None
+    if isinstance(value, ReactiveDict):
+        return value._source
+    return None
+
+
 class ReactiveList(MutableSequence[L], t.Generic[L]):
-    def __init__(self, data: list[L], ref: "Ref[list[L]]"):
+    def __init__(
+        self,
+        data: list[L],
+        ref: "Ref[t.Any]",
+        borrowed: bool = False
+    ):
         self._data = data
         self._ref = ref
+        # Data is shared with the plain list until it's changed
+        self._borrowed = borrowed
+
+    def _write(self) -> list[L]:
+        if self._borrowed:
+            self._data = list(self._data)
+            self._borrowed = False
+        return self._data
+
+    def _child(self, index: int) -> L:
+        value = self._data[index]
+        if self._ref.deep and type(value) in RAW_TYPES:
+            value = self._ref._wrap_if_mutable(value)
+            self._write()[index] = value
+        return value
 
     @t.overload
     def __getitem__(self, i: int) -> L:
@@ -34,8 +152,7 @@ class ReactiveList(MutableSequence[L], t.Generic[L]):
             slice_result = self._data[i]
             return ReactiveList(slice_result, self._ref)
         else:
-            result = self._data[i]
-            return result
+            return self._child(i)
 
     @t.overload
     def __setitem__(self, index: int, value: L) -> None:
@@ -54,13 +171,18 @@ class ReactiveList(MutableSequence[L], t.Generic[L]):
             if t.TYPE_CHECKING:
                 value = t.cast(L, value)
             self._check_type(value)
-            self._data[index] = value
+            self._write()[index] = value
+            if self._ref.wants_delta():
+                self._ref.list_delta(("replace", index % len(self._data), 1))
         else:
             if t.TYPE_CHECKING:
                 value = t.cast(t.Iterable[L], value)
+            value = list(value)
             for v in value:
                 self._check_type(v)
-            self._data[index] = value
+            self._write()[index] = value
+            if self._ref.wants_delta():
+                self._ref.list_delta(reset=True)
 
         if self._ref.is_ready:
             self._ref._trigger_watchers()
@@ -81,31 +203,59 @@ class ReactiveList(MutableSequence[L], t.Generic[L]):
         ...
 
     def __delitem__(self, index: int | slice) -> None:
-        del self._data[index]
+        size = len(self._data)
+        # Raises IndexError before the delta is changed
+        del self._write()[index]
+        if self._ref.wants_delta():
+            if isinstance(index, int):
+                self._ref.list_delta(("remove", index % size, 1))
+            else:
+                self._ref.list_delta(reset=True)
         if self._ref.is_ready:
             self._ref._trigger_watchers()
 
     def clear(self) -> None:
-        self._data.clear()
+        if self._ref.wants_delta() and self._data:
+            self._ref.list_delta(("remove", 0, len(self._data)))
+        self._write().clear()
         if self._ref.is_ready:
             self._ref._trigger_watchers()
 
     def pop(self, index: int = -1) -> L:
-        value = self._data.pop(index)
+        size = len(self._data)
+        value = self._write().pop(index)
+        if self._ref.wants_delta():
+            self._ref.list_delta(("remove", index % size, 1))
         if self._ref.is_ready:
             self._ref._trigger_watchers()
         return value
 
     def insert(self, i: int, value: L) -> None:
         self._check_type(value)
-        self._data.insert(i, value)
+        size = len(self._data)
+        self._write().insert(i, value)
+        if self._ref.wants_delta():
+            # Same clamping as list.insert does
+            index = min(max(i + size if i < 0 else i, 0), size)
+            self._ref.list_delta(("insert", index, 1))
 
         if self._ref.is_ready:
             self._ref._trigger_watchers()
 
     def append(self, value: L) -> None:
         self._check_type(value)
-        self._data.append(value)
+        self._write().append(value)
+        if self._ref.wants_delta():
+            self._ref.list_delta(("insert", len(self._data) - 1, 1))
+
+        if self._ref.is_ready:
+            self._ref._trigger_watchers()
+
+    def move(self, from_index: int, to_index: int) -> None:
+        data = self._write()
+        data.insert(to_index, data.pop(from_index))
+        if self._ref.wants_delta():
+            self._ref.list_delta(("move", from_index, to_index))
 
         if self._ref.is_ready:
             self._ref._trigger_watchers()
@@ -113,17 +263,47 @@ class ReactiveList(MutableSequence[L], t.Generic[L]):
     def __contains__(self, value: object) -> bool:
         return value in self._data
 
+    def __iter__(self) -> t.Iterator[L]:
+        if self._ref.deep:
+            for index in range(len(self._data)):
+                self._child(index)
+        return iter(self._data)
+
     def __len__(self) -> int:
         return len(self._data)
 
+    def __eq__(self, other: object) -> bool:
+        if other is self:
+            return True
+        if isinstance(other, ReactiveList):
+            other = other._data
+        if other is self._data:
+            return True
+        return self._data == other
+
+    __hash__ = None  # type: ignore[assignment]
+
     def __repr__(self) -> str:
         return repr(self._data)
 
 
 class ReactiveSet(MutableSet[L], t.Generic[L]):
-    def __init__(self, data: set[L], ref: "Ref[set[L]]"):
+    def __init__(
+        self,
+        data: set[L],
+        ref: "Ref[set[L]]",
+        borrowed: bool = False
+    ):
         self._data = data
         self._ref = ref
+        # Data is shared with the plain set until it's changed
+        self._borrowed = borrowed
+
+    def _write(self) -> set[L]:
+        if self._borrowed:
+            self._data = set(self._data)
+            self._borrowed = False
+        return self._data
 
     def _check_type(self, value: L) -> None:
         if self._ref.types and not isinstance(value, self._ref.types):
@@ -144,14 +324,18 @@ class ReactiveSet(MutableSet[L], t.Generic[L]):
     def add(self, value: L) -> None:
         if value not in self._data:
             self._check_type(value)
-            self._data.add(value)
+            self._write().add(value)
+            if self._ref.wants_delta():
+                self._ref.key_delta().add(value)
 
             if self._ref.is_ready:
                 self._ref._trigger_watchers()
 
     def discard(self, value: L) -> None:
         if value in self._data:
-            self._data.discard(value)
+            self._write().discard(value)
+            if self._ref.wants_delta():
+                self._ref.key_delta().remove(value)
 
             if self._ref.is_ready:
                 self._ref._trigger_watchers()
@@ -159,7 +343,9 @@ class ReactiveSet(MutableSet[L], t.Generic[L]):
     def remove(self, value: L) -> None:
         if value not in self._data:
             raise KeyError(value)
-        self._data.remove(value)
+        self._write().remove(value)
+        if self._ref.wants_delta():
+            self._ref.key_delta().remove(value)
 
         if self._ref.is_ready:
             self._ref._trigger_watchers()
@@ -173,24 +359,85 @@ class ReactiveDict(dict[K, V], t.Generic[K, V]):
         super().__init__()
         self._ref = parent_ref
         self._initialized = False
-        for k, v in data.items():
+        for k, v in dict.items(data):
             self[k] = v
         self._initialized = True
+        # Children are shared with it, so it's valid until one is wrapped
+        self._source: dict[K, V] | None = (
+            data if parent_ref.deep and type(data) is dict else None
+        )
+
+    def _child(self, key: K) -> V:
+        value = super().__getitem__(key)
+        if self._ref.deep and type(value) in RAW_TYPES:
+            value = self._ref._wrap_if_mutable(value)
+            super().__setitem__(key, value)
+            self._source = None
+        return value
+
+    def __getitem__(self, key: K) -> V:
+        return self._child(key)
+
+    def get(  # type: ignore[override]
+        self,
+        key: K,
+        default: t.Any = None
+    ) -> t.Any:
+        return self[key] if key in self else default
+
+    def _wrap_children(self) -> None:
+        if self._ref.deep:
+            for key in list(super().keys()):
+                self._child(key)
+
+    def __iter__(self) -> t.Iterator[K]:
+        # Not inherited, so dict(x) and {**x} go through __getitem__
+        return super().__iter__()
+
+    def values(self) -> t.ValuesView[V]:  # type: ignore[override]
+        self._wrap_children()
+        return super().values()
+
+    def items(self) -> t.ItemsView[K, V]:  # type: ignore[override]
+        self._wrap_children()
+        return super().items()
 
     def __setitem__(self, key: K, value: V) -> None:
-        wrapped_value = self._ref._wrap_if_mutable(value)
+        if self._ref.deep and type(value) in RAW_TYPES:
+            # Wrapped on first access, see Ref._wrap_if_mutable
+            wrapped_value = value
+        else:
+            wrapped_value = self._ref._wrap_if_mutable(value)
+        existed = key in self
         super().__setitem__(key, wrapped_value)
+        if self._initialized:
+            self._source = None
+
+        if self._initialized and self._ref.wants_delta():
+            delta = self._ref.key_delta()
+            if existed:
+                delta.change(key)
+            else:
+                delta.add(key)
 
         if self._ref.is_ready and self._initialized:
             self._ref._trigger_watchers()
 
     def __delitem__(self, key: K) -> None:
         super().__delitem__(key)
+        self._source = None
+        if self._ref.wants_delta():
+            self._ref.key_delta().remove(key)
         if self._ref.is_ready:
             self._ref._trigger_watchers()
 
     def clear(self) -> None:
+        if self._ref.wants_delta():
+            delta = self._ref.key_delta()
+            for key in self:
+                delta.remove(key)
         super().clear()
+        self._source = None
         if self._ref.is_ready:
             self._ref._trigger_watchers()
 
@@ -201,75 +448,180 @@ class ReactiveDict(dict[K, V], t.Generic[K, V]):
     def pop(self, key: K, default: T) -> t.Union[V, T]: ...
 
     def pop(self, key: K, default: t.Any = t.NoReturn) -> t.Any:
+        existed = key in self
         if default is t.NoReturn:
             result = super().pop(key)
         else:
             result = super().pop(key, default)
+        if existed:
+            self._source = None
+        if existed and self._ref.wants_delta():
+            self._ref.key_delta().remove(key)
         if self._ref.is_ready:
             self._ref._trigger_watchers()
         return result
 
     def popitem(self) -> tuple[K, V]:
         result = super().popitem()
+        self._source = None
+        if self._ref.wants_delta():
+            self._ref.key_delta().remove(result[0])
         if self._ref.is_ready:
             self._ref._trigger_watchers()
         return result
 
     def update(self, *args: t.Any, **kwargs: V) -> None:
-        for k, v in dict(*args, **kwargs).items():
-            self[k] = v
-        if self._ref.is_ready:
-            self._ref._trigger_watchers()
+        with batch():
+            for k, v in dict(*args, **kwargs).items():
+                self[k] = v
 
 
-def unpack_reactive(value: T) -> T:
-    def _unpack(value: t.Any) -> t.Any:
-        if isinstance(value, ReactiveList):
-            return [_unpack(item) for item in value]
-        if isinstance(value, ReactiveSet):
-            return {_unpack(item) for item in value}
-        if isinstance(value, ReactiveDict):
-            return {key: _unpack(val) for key, val in value.items()}
-        return value
+class Tracking(threading.local):
+    def __init__(self) -> None:
+        # Refs read by Computed that is evaluating right now
+        self.current: set[Ref[t.Any]] | None = None
+
+
+_tracking = Tracking()
+
+
+class BatchState(threading.local):
+    def __init__(self) -> None:
+        self.depth = 0
+        self.flushing = False
+        self.touched: list[Ref[t.Any]] = []
+        self.touched_set: set[Ref[t.Any]] = set()
 
-    return t.cast(T, _unpack(value))
 
+_batch_state = BatchState()
 
-def find_refs_in_func(
-    func: t.Callable[[], T]
-) -> set["Ref[t.Any]"]:
-    refs: set[Ref[t.Any]] = set()
-    current_frame = inspect.currentframe()
-    if current_frame is None:
-        return refs
+
+class Batch:
+    """
+    Defers `changed` of every Ref mutated inside it until the outermost
+    batch exits, then emits it once per Ref.
+    Works with both `with` and `async with`.
+    """
+    __slots__ = ()
+
+    def __enter__(self) -> t.Self:
+        _batch_state.depth += 1
+        return self
+
+    def __exit__(self, *args: t.Any) -> None:
+        _batch_state.depth -= 1
+        if _batch_state.depth == 0:
+            flush_batch()
+
+    async def __aenter__(self) -> t.Self:
+        return self.__enter__()
+
+    async def __aexit__(self, *args: t.Any) -> None:
+        self.__exit__()
+
+
+def batch() -> Batch:
+    return Batch()
+
+
+def _flush_from_thread(touched: list["Ref[t.Any]"]) -> None:
+    state = _batch_state
+    for ref in touched:
+        if ref not in state.touched_set:
+            state.touched_set.add(ref)
+            state.touched.append(ref)
+    if state.depth == 0:
+        flush_batch()
+
+
+def flush_batch() -> None:
+    state = _batch_state
+    if state.flushing:
+        return
+    if threading.current_thread() is not threading.main_thread():
+        # Computeds and watchers can touch GTK, they run on the main loop
+        touched = state.touched
+        state.touched = []
+        state.touched_set = set()
+        glib.idle_add(_flush_from_thread, touched)
+        return
+    state.flushing = True
+    # Changes made by recomputed Computeds join the same flush
+    state.depth += 1
+    touched = state.touched
     try:
-        frame = current_frame
-        while frame:
-            caller_module = frame.f_globals.get("__name__")
-            if caller_module and caller_module != __name__:
+        scanned = 0
+        queued: set[Computed[t.Any]] = set()
+        heap: list[tuple[int, int, Computed[t.Any]]] = []
+        while True:
+            for ref in touched[scanned:]:
+                for computed in list(ref.dependents):
+                    if computed not in queued:
+                        queued.add(computed)
+                        heapq.heappush(
+                            heap, (computed.depth, id(computed), computed)
+                        )
+            scanned = len(touched)
+            if not heap:
                 break
-            frame = frame.f_back or frame
+            # Lowest depth first, so every Computed runs once
+            computed = heapq.heappop(heap)[2]
+            try:
+                recomputed = computed.invalidate()
+            except Exception as e:
+                logger.error(
+                    "Error while recomputing '%s': %s",
+                    computed.name, e, exc_info=e
+                )
+                exit_error()
+                continue
+            if not recomputed:
+                # Nobody observes it, its dependents still have to know
+                for dependent in list(computed.dependents):
+                    if dependent not in queued:
+                        queued.add(dependent)
+                        heapq.heappush(
+                            heap, (dependent.depth, id(dependent), dependent)
+                        )
+    finally:
+        state.touched = []
+        state.touched_set = set()
+        state.depth -= 1
+        state.flushing = False
 
-        if not frame:
-            frame = current_frame.f_back or current_frame
+    for ref in touched:
+        ref._emit_changed()
 
-        code = func.__code__
-        for name in code.co_names:
-            obj = frame.f_locals.get(name) or frame.f_globals.get(name)
-            if isinstance(obj, Ref):
-                refs.add(obj)
 
-        return refs
-    finally:
-        del frame
+def unpack_reactive(value: T) -> T:
+    """
+    Returns plain data. Parts that weren't changed through the ref are
+    the same objects that were given to it, so the result must not be
+    mutated in place.
+    """
+    def _unpack(value: t.Any) -> t.Any:
+        source = _source(value)
+        if source is not None:
+            return source
+        if isinstance(value, ReactiveList):
+            return [_unpack(item) for item in value._data]
+        if isinstance(value, ReactiveSet):
+            return set(value._data)
+        if isinstance(value, ReactiveDict):
+            return {key: _unpack(val) for key, val in dict.items(value)}
+        return value
+
+    return t.cast(T, _unpack(value))
 
 
 class Ref(t.Generic[T]):
     __slots__ = (
         "_signals", "deep", "is_ready",
         "types", "links", "_value",
-        "name", "asyncio_lock"
+        "name", "asyncio_lock", "dependents",
+        "_delta", "_version"
     )
+    depth = 0
 
     def __init__(
         self,
@@ -278,15 +630,23 @@ class Ref(t.Generic[T]):
         name: str | None = None,
         delayed_init: bool = False,
         deep: bool = False,
-        types: tuple[type, ...] | None = None
+        types: tuple[type, ...] | None = None,
+        lane: Lane = Lane.DEFAULT
     ) -> None:
-        self._signals = Signals({"changed"})
+        self._signals = Signals({"changed"}, lane, name or "unknown")
         self.deep = deep
         self.is_ready = not delayed_init
         self.types = types
 
         # It's links (refs) to objects that doesn't have to be removed by GC
         self.links: dict[int, t.Any] = {}
+        # Weak, so Computed is collected with whatever uses it
+        self.dependents: weakref.WeakSet[Computed[t.Any]] = (
+            weakref.WeakSet()
+        )
+        self._delta: KeyDelta | ListDelta | None = None
+        # Incremented on every change, including nested ones
+        self._version = 0
 
         self._value: T = self._wrap_if_mutable(value)
 
@@ -296,34 +656,17 @@ class Ref(t.Generic[T]):
             logger.debug("Ref with name '%s' created", self.name)
 
     def _wrap_if_mutable(self, value: T) -> T:
-        if not self.deep:
-            if isinstance(value, list):
-                return ReactiveList(value, self)  # type: ignore
-            if isinstance(value, set):
-                return ReactiveSet(value, self)  # type: ignore
-            if isinstance(value, dict):
-                return ReactiveDict(value, self)  # type: ignore
-            return value
-
-        def deep_wrap(val: T) -> T:
-            if isinstance(val, list):
-                return ReactiveList(  # type: ignore
-                    [deep_wrap(item) for item in val],
-                    self  # type: ignore
-                )
-            if isinstance(val, set):
-                return ReactiveSet(  # type: ignore
-                    {deep_wrap(item) for item in val},
-                    self  # type: ignore
-                )
-            if isinstance(val, dict):
-                return ReactiveDict(  # type: ignore
-                    {k: deep_wrap(v) for k, v in val.items()},
-                    self
-                )
-            return val
-
-        return deep_wrap(value)
+        # Deep refs share plain values given to them (copy-on-write):
+        # lists and sets are copied on first change through the ref,
+        # nested lists, sets and dicts are wrapped on first access.
+        # So values given to deep refs must not be mutated in place.
+        if isinstance(value, list):
+            return ReactiveList(value, self, self.deep)  # type: ignore
+        if isinstance(value, set):
+            return ReactiveSet(value, self, self.deep)  # type: ignore
+        if isinstance(value, dict):
+            return ReactiveDict(value, self)  # type: ignore
+        return value
 
     async def __aenter__(self) -> t.Self:
         if __debug__:
@@ -345,7 +688,12 @@ class Ref(t.Generic[T]):
         if not exc_type:
             self._trigger_watchers()
 
-    def _trigger_watchers(self, log: bool = True) -> None:
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def _trigger_watchers(self) -> None:
+        self._version += 1
         if self.asyncio_lock.locked():
             return
 
@@ -355,9 +703,43 @@ class Ref(t.Generic[T]):
         if "changed" in self._signals._blocked:
             return
 
+        state = _batch_state
+        if self not in state.touched_set:
+            state.touched_set.add(self)
+            state.touched.append(self)
+        if state.depth == 0:
+            flush_batch()
+
+    def wants_delta(self) -> bool:
+        return self.is_ready and bool(self._signals._signals.get("delta"))
+
+    def key_delta(self) -> KeyDelta:
+        if not isinstance(self._delta, KeyDelta):
+            self._delta = KeyDelta()
+        return self._delta
+
+    def list_delta(
+        self,
+        op: ListOp | None = None,
+        reset: bool = False
+    ) -> None:
+        if not isinstance(self._delta, ListDelta):
+            self._delta = ListDelta()
+        if reset:
+            self._delta.reset = True
+            self._delta.ops.clear()
+        elif op is not None:
+            self._delta.add(op)
+
+    def _emit_changed(self) -> None:
+        delta = self._delta
+        if delta is not None:
+            self._delta = None
+            if delta:
+                self._signals.notify("delta", delta)
         self._signals.notify("changed", self.value)
 
-        if __debug__ and log:
+        if __debug__:
             logger.debug(
                 "Ref '%s' triggered watchers",
                 self.name
@@ -370,6 +752,9 @@ class Ref(t.Generic[T]):
                 "Trying to get value, ref '%s' is not ready!",
                 self.name
             )
+        current = _tracking.current
+        if current is not None:
+            current.add(self)
         return self._value
 
     @value.setter
@@ -378,6 +763,12 @@ class Ref(t.Generic[T]):
 
     def _set_value(self, _new_value: T) -> None:
         old_value = self._value
+        if _new_value is old_value:
+            return
+        source = _source(old_value)
+        if source is not None and source is _new_value:
+            # Same plain value that wasn't changed through the ref since
+            return
         new_value = self._wrap_if_mutable(_new_value)
         if old_value != new_value:
             if self.types:
@@ -395,20 +786,24 @@ class Ref(t.Generic[T]):
             if __debug__ and self.name:
                 logger.debug("Ref '%s' changed value", self.name)
 
+            if self.wants_delta():
+                if isinstance(new_value, (dict, ReactiveSet)):
+                    delta = diff_keys(old_value, new_value)
+                    previous = self.key_delta()
+                    for key in delta.added:
+                        previous.add(key)
+                    for key in delta.removed:
+                        previous.remove(key)
+                    for key in delta.changed:
+                        previous.change(key)
+                elif isinstance(new_value, ReactiveList):
+                    self.list_delta(reset=True)
+
             self._value = new_value
-            self._trigger_watchers(log=False)
+            self._trigger_watchers()
 
     def unpack(self) -> T:
-        def _unpack(value: t.Any) -> t.Any:
-            if isinstance(value, ReactiveList):
-                return [_unpack(item) for item in value]
-            if isinstance(value, ReactiveSet):
-                return {_unpack(item) for item in value}
-            if isinstance(value, ReactiveDict):
-                return {key: _unpack(val) for key, val in value.items()}
-            return value
-
-        return t.cast(T, _unpack(self._value))
+        return unpack_reactive(self._value)
 
     def create_ref(self, object: t.Any) -> int:
         if self.links:
@@ -463,6 +858,20 @@ class Ref(t.Generic[T]):
             logger.debug("Ref '%s' remove watcher", self.name)
         self._signals.unwatch_fast("changed", handler_id)
 
+    def watch_delta(
+        self,
+        callback: t.Callable[[KeyDelta | ListDelta], None],
+        **kwargs: t.Any
+    ) -> int:
+        """
+        Callback gets KeyDelta for dicts/sets or ListDelta for lists
+        with everything that changed since previous `changed`.
+        """
+        return self._signals.watch("delta", callback, **kwargs)
+
+    def unwatch_delta(self, handler_id: int) -> None:
+        self._signals.unwatch_fast("delta", handler_id)
+
     def ready(self) -> None:
         self.is_ready = True
 
@@ -479,6 +888,14 @@ class Ref(t.Generic[T]):
 
 
 class Computed(Ref[T], t.Generic[T]):
+    """
+    Value derived from other refs.
+    Dependencies are the refs read while `func` runs, they're collected
+    again on every evaluation. When a dependency changes, Computed is
+    recomputed right away only if something observes it, otherwise it's
+    marked dirty and recomputed on next read.
+    """
+
     def __init__(
         self,
         default_value: T,
@@ -498,23 +915,65 @@ class Computed(Ref[T], t.Generic[T]):
             types=types
         )
         self.func = func
-
-        if refs:
-            self.refs = refs
-        else:
-            self.refs = find_refs_in_func(func)
-
-        for ref in self.refs:
-            ref.watch(self.on_computed)
+        # Refs that are dependencies even if func doesn't read them
+        self.static_refs = frozenset(refs or ())
+        self.refs: set[Ref[t.Any]] = set()
+        self.depth = 1
+        self.dirty = False
         self.on_computed()
 
     @property
     def value(self) -> T:
+        if self.dirty:
+            self.dirty = False
+            self._value = self._wrap_if_mutable(self.evaluate())
         return super().value
 
     @value.setter
     def value(self, _new_value: T) -> None:
         raise RuntimeError("Computed is immutable")
 
+    def evaluate(self) -> T:
+        previous = _tracking.current
+        refs: set[Ref[t.Any]] = set(self.static_refs)
+        _tracking.current = refs
+        started = time.perf_counter()
+        try:
+            result = self.func()
+        finally:
+            _tracking.current = previous
+        if instrumentation.enabled:
+            stat = instrumentation.get(self.name, "evaluate")
+            stat.emissions += 1
+            stat.watchers = len(self.dependents)
+            stat.record(self.func, time.perf_counter() - started)
+        refs.discard(self)
+
+        if refs != self.refs:
+            for ref in self.refs - refs:
+                ref.dependents.discard(self)
+            for ref in refs - self.refs:
+                ref.dependents.add(self)
+            self.refs = refs
+            self.depth = 1 + max((ref.depth for ref in refs), default=0)
+        return result
+
+    def is_observed(self) -> bool:
+        signals = self._signals._signals
+        return bool(
+            signals.get("changed")
+            or signals.get("delta")
+            or self.dependents
+        )
+
+    def invalidate(self) -> bool:
+        """Returns True if recomputed now, False if only marked dirty"""
+        if not self.is_observed():
+            self.dirty = True
+            return False
+        self.on_computed()
+        return True
+
     def on_computed(self, *args: t.Any) -> None:
-        self._set_value(self.func())
+        self.dirty = False
+        self._set_value(self.evaluate())
@@ -1,7 +1,11 @@
+import os
 import typing as t
 import types
+import functools
 import weakref
 import threading
+import time
+from enum import Enum
 from utils.logger import logger
 from utils.handler import exit_error
 from repository import glib
@@ -26,16 +30,211 @@ class Counter:
 global_counter = Counter()
 
 
+class Lane(int, Enum):
+    # Lock screen, OSD and anything user is waiting for right now
+    CRITICAL = 0
+    DEFAULT = 1
+    # Tray icons, network and so on
+    BACKGROUND = 2
+
+
+class DispatchQueue:
+    """
+    Emissions of one lane, drained by a single idle callback
+    instead of an idle source per emission.
+    """
+    __slots__ = (
+        "lane", "priority", "_queue", "_scheduled", "_lock",
+        "drains", "emissions", "total_time", "max_time"
+    )
+
+    def __init__(self, lane: Lane, priority: int) -> None:
+        self.lane = lane
+        self.priority = priority
+        self._queue: list[tuple["Signals", str, tuple[t.Any, ...]]] = []
+        self._scheduled = False
+        self._lock = threading.Lock()
+        self.drains = 0
+        self.emissions = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+
+    def push(
+        self,
+        signals: "Signals",
+        signal_name: str,
+        args: tuple[t.Any, ...]
+    ) -> None:
+        with self._lock:
+            self._queue.append((signals, signal_name, args))
+            if self._scheduled:
+                return
+            self._scheduled = True
+        glib.idle_add(self.drain, priority=self.priority)
+
+    def drain(self) -> bool:
+        with self._lock:
+            queue = self._queue
+            self._queue = []
+            self._scheduled = False
+
+        started = time.perf_counter()
+        # Emissions made by callbacks go to the next drain
+        for signals, signal_name, args in queue:
+            signals._idle_notify(signal_name, *args)
+        elapsed = time.perf_counter() - started
+
+        self.drains += 1
+        self.emissions += len(queue)
+        self.total_time += elapsed
+        if elapsed > self.max_time:
+            self.max_time = elapsed
+        return False
+
+    def stats(self) -> dict[str, float]:
+        return {
+            "drains": self.drains,
+            "emissions": self.emissions,
+            "pending": len(self._queue),
+            "avg_drain_ms": self.total_time / (self.drains or 1) * 1000,
+            "max_drain_ms": self.max_time * 1000
+        }
+
+    def reset_stats(self) -> None:
+        self.drains = 0
+        self.emissions = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+
+
+class Dispatcher:
+    __slots__ = ("lanes",)
+
+    def __init__(self) -> None:
+        self.lanes = (
+            # Runs before GTK layout and paint of the same frame
+            DispatchQueue(Lane.CRITICAL, glib.PRIORITY_HIGH_IDLE),
+            DispatchQueue(Lane.DEFAULT, glib.PRIORITY_DEFAULT_IDLE),
+            DispatchQueue(Lane.BACKGROUND, glib.PRIORITY_LOW),
+        )
+
+    def push(
+        self,
+        lane: Lane,
+        signals: "Signals",
+        signal_name: str,
+        args: tuple[t.Any, ...]
+    ) -> None:
+        self.lanes[lane].push(signals, signal_name, args)
+
+    def stats(self) -> dict[str, dict[str, float]]:
+        return {
+            queue.lane.name.lower(): queue.stats()
+            for queue in self.lanes
+        }
+
+    def reset_stats(self) -> None:
+        for queue in self.lanes:
+            queue.reset_stats()
+
+
+dispatcher = Dispatcher()
+
+
+def callback_name(callback: t.Callable[..., t.Any]) -> str:
+    qualname = getattr(callback, "__qualname__", None)
+    if qualname is None:
+        qualname = type(callback).__qualname__
+    module = getattr(callback, "__module__", None)
+    return f"{module}.{qualname}" if module else qualname
+
+
+class SignalStat:
+    __slots__ = (
+        "emissions", "watchers", "total_time", "max_time",
+        "slowest", "slowest_time"
+    )
+
+    def __init__(self) -> None:
+        self.emissions = 0
+        self.watchers = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        self.slowest: t.Callable[..., t.Any] | None = None
+        self.slowest_time = 0.0
+
+    def record(self, callback: t.Callable[..., t.Any], elapsed: float) -> None:
+        self.total_time += elapsed
+        if elapsed > self.max_time:
+            self.max_time = elapsed
+        if elapsed > self.slowest_time:
+            # Name is resolved only when stats are requested
+            self.slowest = callback
+            self.slowest_time = elapsed
+
+    def as_dict(self) -> dict[str, t.Any]:
+        return {
+            "emissions": self.emissions,
+            "watchers": self.watchers,
+            "total_ms": self.total_time * 1000,
+            "max_ms": self.max_time * 1000,
+            "slowest": (
+                callback_name(self.slowest)
+                if self.slowest is not None else None
+            )
+        }
+
+
+class Instrumentation:
+    """
+    Opt-in per-signal counters, enabled by HYPRYOU_STATS=1
+    or `stats on` command of the cli.
+    """
+    __slots__ = ("enabled", "signals")
+
+    def __init__(self) -> None:
+        self.enabled = bool(os.getenv("HYPRYOU_STATS"))
+        self.signals: dict[tuple[str, str], SignalStat] = {}
+
+    def get(self, name: str, signal_name: str) -> SignalStat:
+        key = (name, signal_name)
+        stat = self.signals.get(key)
+        if stat is None:
+            stat = self.signals[key] = SignalStat()
+        return stat
+
+    def reset(self) -> None:
+        self.signals = {}
+
+    def report(
+        self,
+        sort: str = "total_ms",
+        limit: int | None = None
+    ) -> list[dict[str, t.Any]]:
+        rows = [
+            {"name": name, "signal": signal_name, **stat.as_dict()}
+            for (name, signal_name), stat in list(self.signals.items())
+        ]
+        rows.sort(key=lambda row: row[sort], reverse=sort != "name")
+        return rows[:limit] if limit is not None else rows
+
+
+instrumentation = Instrumentation()
+
+
 class Signals:
     __slots__ = (
         "_signals", "_handler_signals",
         "_blocked", "_lock",
-        "_pending_idle", "_idle_signals"
+        "_pending_idle", "_idle_signals",
+        "_lane", "_ordered", "_name"
     )
 
     def __init__(
         self,
-        idle_signals: set[str] = set()
+        idle_signals: set[str] = set(),
+        lane: Lane = Lane.DEFAULT,
+        name: str | None = None
     ) -> None:
         self._signals: dict[str, dict[int, Wrapper]] = {}
         self._handler_signals: dict[int, str] = {}
@@ -43,6 +242,11 @@ class Signals:
         self._lock = threading.RLock()
         self._pending_idle: dict[str, tuple[t.Any, ...]] = {}
         self._idle_signals = idle_signals
+        self._lane = lane
+        # Sorted snapshots of handlers, dropped when handlers change
+        self._ordered: dict[str, tuple[tuple[int, Wrapper], ...]] = {}
+        # Used by instrumentation, class name if not set
+        self._name = name
 
     def watch(
         self,
@@ -54,14 +258,21 @@ class Signals:
     ) -> int:
         with self._lock:
             if isinstance(callback, types.MethodType):
-                ref = weakref.WeakMethod(callback)
+                # Calling the function directly doesn't create
+                # a new bound method on every emission
+                obj_ref = weakref.ref(callback.__self__)
+                func = callback.__func__
 
                 def wrapper(*args: t.Any) -> bool | None:
-                    func = ref()
-                    if func is not None:
-                        func(*args)
+                    obj = obj_ref()
+                    if obj is not None:
+                        func(obj, *args)
                         return True
                     return False
+                functools.update_wrapper(
+                    wrapper, callback,
+                    ("__module__", "__qualname__"), ()
+                )
             else:
                 wrapper = callback
 
@@ -72,13 +283,17 @@ class Signals:
                     original(*a)
                     return False
 
-                wrapper = one_shot
+                wrapper = functools.update_wrapper(
+                    one_shot, original,
+                    ("__module__", "__qualname__"), ()
+                )
 
             callbacks = self._signals.setdefault(signal_name, {})
             base_id = global_counter.acquire_new_id()
             handler_id = base_id + priority * 0x10000
             callbacks[handler_id] = wrapper
             self._handler_signals[handler_id] = signal_name
+            self._ordered.pop(signal_name, None)
             return handler_id
 
     def unwatch_fast(self, signal_name: str, handler_id: int) -> bool:
@@ -88,6 +303,7 @@ class Signals:
                 return False
             del callbacks[handler_id]
             del self._handler_signals[handler_id]
+            self._ordered.pop(signal_name, None)
             return True
 
     def unwatch(self, handler_id: int) -> bool:
@@ -98,35 +314,74 @@ class Signals:
                 return False
             del callbacks[handler_id]
             del self._handler_signals[handler_id]
+            self._ordered.pop(signal_name, None)
             return True
 
-    def notify_sync(self, signal_name: str, *args: t.Any) -> None:
+    def _order(self, signal_name: str) -> tuple[tuple[int, Wrapper], ...]:
         with self._lock:
-            if signal_name in self._blocked:
-                return
-
-            signal_callbacks = self._signals.get(signal_name)
-            if signal_callbacks is None:
-                return
+            callbacks = self._signals.get(signal_name)
+            ordered = tuple(sorted(callbacks.items())) if callbacks else ()
+            self._ordered[signal_name] = ordered
+            return ordered
+
+    def _snapshot(self, signal_name: str) -> tuple[
+        tuple[tuple[int, Wrapper], ...], dict[int, Wrapper] | None
+    ]:
+        if signal_name in self._blocked:
+            return (), None
+        ordered = self._ordered.get(signal_name)
+        if ordered is None:
+            ordered = self._order(signal_name)
+        return ordered, self._signals.get(signal_name)
 
-            to_remove: list[int] = []
-            for handler_id in sorted(signal_callbacks):
-                cb = self._signals[signal_name][handler_id]
-                try:
+    def notify_sync(self, signal_name: str, *args: t.Any) -> None:
+        if threading.current_thread() is threading.main_thread():
+            # Handlers are changed on the main thread, so no lock is needed
+            ordered, callbacks = self._snapshot(signal_name)
+        else:
+            with self._lock:
+                ordered, callbacks = self._snapshot(signal_name)
+        if not ordered or callbacks is None:
+            return
+
+        stat: SignalStat | None = None
+        if instrumentation.enabled:
+            stat = instrumentation.get(
+                self._name or type(self).__name__, signal_name
+            )
+            stat.emissions += 1
+            stat.watchers = len(ordered)
+
+        to_remove: list[int] | None = None
+        for handler_id, cb in ordered:
+            if handler_id not in callbacks:
+                # Removed by one of previous callbacks
+                continue
+            try:
+                if stat is None:
                     result = cb(*args)
-                    if result not in (None, True):
-                        to_remove.append(handler_id)
-                except Exception as e:
-                    logger.error(
-                        "Error while calling callback: %s",
-                        e, exc_info=e
-                    )
-                    exit_error()
-                    # to_remove.append(handler_id)
-
-            for handler_id in to_remove:
-                del signal_callbacks[handler_id]
-                self._handler_signals.pop(handler_id, None)
+                else:
+                    started = time.perf_counter()
+                    result = cb(*args)
+                    stat.record(cb, time.perf_counter() - started)
+                if result is not None and result is not True:
+                    if to_remove is None:
+                        to_remove = []
+                    to_remove.append(handler_id)
+            except Exception as e:
+                logger.error(
+                    "Error while calling callback: %s",
+                    e, exc_info=e
+                )
+                exit_error()
+                # to_remove.append(handler_id)
+
+        if to_remove is not None:
+            with self._lock:
+                for handler_id in to_remove:
+                    callbacks.pop(handler_id, None)
+                    self._handler_signals.pop(handler_id, None)
+                self._ordered.pop(signal_name, None)
 
     def _idle_notify(self, signal_name: str, *args: t.Any) -> bool:
         if signal_name in self._idle_signals:
@@ -146,9 +401,9 @@ class Signals:
                     self._pending_idle[signal_name] = args
                     return
                 self._pending_idle[signal_name] = args
-            glib.idle_add(self._idle_notify, signal_name)
+            dispatcher.push(self._lane, self, signal_name, ())
         else:
-            glib.idle_add(self._idle_notify, signal_name, *args)
+            dispatcher.push(self._lane, self, signal_name, args)
 
     def block(self, signal_name: str) -> None:
         with self._lock:
@@ -164,12 +419,20 @@ class Signals:
 
     def clear(self, signal_name: str) -> None:
         with self._lock:
+            self._ordered.pop(signal_name, None)
             callbacks = self._signals.pop(signal_name, {})
             for handler_id in callbacks:
                 self._handler_signals.pop(handler_id, None)
+            # Emission in progress checks this dict, so it stops calling them
+            callbacks.clear()
 
 
 class Service:
+    # Services which app_init has to finish before app_init of this one
+    depends: tuple[type["Service | AsyncService"], ...] = ()
+    # app_init doesn't touch GTK and can run in a thread pool
+    threaded_init = False
+
     def __init__(self) -> None:
         ...
 
@@ -184,6 +447,8 @@ class Service:
 
 
 class AsyncService:
+    depends: tuple[type["Service | AsyncService"], ...] = ()
+
     def __init__(self) -> None:
         ...
 
@@ -0,0 +1,140 @@
+import os
+import time
+import struct
+import marshal
+import typing as t
+from utils.logger import logger
+
+type Dump = t.Callable[[], t.Any]
+
+MAGIC = b"HY"
+# Magic, file version, marshal version, creation time
+HEADER = struct.Struct("<2sBBd")
+# Length of section name, length of its payload
+SECTION = struct.Struct("<BI")
+
+
+class SnapshotSection(t.NamedTuple):
+    name: str
+    dump: Dump
+    priority: int
+
+
+class Snapshot:
+    """
+    Sections of state that services keep across restarts of the app.
+    Payloads are marshal dumps, so only builtin types can be saved.
+    """
+    __slots__ = ("sections", "loaded", "created")
+
+    def __init__(self) -> None:
+        self.sections: dict[str, SnapshotSection] = {}
+        self.loaded: dict[str, bytes] = {}
+        self.created = 0.0
+
+    def register(self, name: str, dump: Dump, priority: int = 0) -> None:
+        """Sections with higher priority are written first"""
+        if len(name.encode("utf-8")) > 255:
+            raise ValueError(f"Section name is too long: {name}")
+        self.sections[name] = SnapshotSection(name, dump, priority)
+
+    def write(self, path: str, version: int, budget: float) -> list[str]:
+        """
+        Writes sections until budget (in seconds) runs out,
+        returns names of written ones.
+        """
+        started = time.perf_counter()
+        data = bytearray(HEADER.pack(MAGIC, version, marshal.version, 0.0))
+        written: list[str] = []
+        skipped: list[str] = []
+        for section in sorted(
+            self.sections.values(), key=lambda x: x.priority, reverse=True
+        ):
+            if time.perf_counter() - started > budget:
+                skipped.append(section.name)
+                continue
+            try:
+                payload = marshal.dumps(section.dump(), marshal.version)
+            except Exception as e:
+                logger.exception(
+                    "Couldn't dump section %s", section.name, exc_info=e
+                )
+                continue
+            name = section.name.encode("utf-8")
+            data.extend(SECTION.pack(len(name), len(payload)))
+            data.extend(name)
+            data.extend(payload)
+            written.append(section.name)
+
+        if skipped:
+            logger.warning(
+                "Snapshot took longer than %dms, skipped: %s",
+                budget * 1000, ", ".join(skipped)
+            )
+        HEADER.pack_into(data, 0, MAGIC, version, marshal.version, time.time())
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, path)
+        if __debug__:
+            logger.debug(
+                "Snapshot of %d bytes written in %.1fms",
+                len(data), (time.perf_counter() - started) * 1000
+            )
+        return written
+
+    def load(self, path: str, version: int, max_age: float) -> bool:
+        """Reads sections once, the file is removed after that"""
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.remove(path)
+        except FileNotFoundError:
+            return False
+
+        if len(data) < HEADER.size:
+            return False
+        magic, file_version, marshal_version, created = (
+            HEADER.unpack_from(data)
+        )
+        if (
+            magic != MAGIC
+            or file_version != version
+            or marshal_version != marshal.version
+        ):
+            logger.info("Ignoring snapshot of another version")
+            return False
+        if not 0 <= time.time() - created <= max_age:
+            logger.info("Ignoring outdated snapshot")
+            return False
+
+        loaded: dict[str, bytes] = {}
+        pos = HEADER.size
+        while pos + SECTION.size <= len(data):
+            name_length, payload_length = SECTION.unpack_from(data, pos)
+            pos += SECTION.size
+            name = data[pos:pos + name_length].decode("utf-8")
+            pos += name_length
+            if pos + payload_length > len(data):
+                logger.warning("Snapshot is truncated at section %s", name)
+                break
+            loaded[name] = data[pos:pos + payload_length]
+            pos += payload_length
+
+        self.loaded = loaded
+        self.created = created
+        return True
+
+    def take(self, name: str) -> t.Any | None:
+        """Returns data of section only once, None if there's none"""
+        payload = self.loaded.pop(name, None)
+        if payload is None:
+            return None
+        try:
+            return marshal.loads(payload)
+        except (EOFError, ValueError, TypeError) as e:
+            logger.warning("Couldn't load snapshot section %s: %s", name, e)
+            return None
+
+
+snapshot = Snapshot()
@@ -7,6 +7,7 @@ from config import (
 )
 from src.variables import Globals
 from utils.logger import logger
+from utils.trace import tracer
 import typing as t
 import os
 
@@ -30,7 +31,8 @@ def apply_css() -> None:
     def load_css(*args: t.Any) -> None:
         if __debug__:
             logger.debug("Loading css")
-        provider.load_from_path(styles_output)
+        with tracer.span("load_css", "styles"):
+            provider.load_from_path(styles_output)
 
     if os.path.isfile(styles_output):
         try:
@@ -48,7 +50,8 @@ def reload_css() -> None:
     def on_compile(pid: int, status: int, user_data: None) -> None:
         if __debug__:
             logger.debug("Reloading css")
-        Globals.css_provider.load_from_path(styles_output)
+        with tracer.span("load_css", "styles"):
+            Globals.css_provider.load_from_path(styles_output)
         if __debug__:
             logger.debug("Reloading css done")
     compile_scss(on_compile)
@@ -83,9 +86,16 @@ def compile_scss(
         styles_output
     ]
 
+    span = tracer.async_span("sass", "styles")
     proc = subprocess.Popen(command)
-    if callable(callback):
-        glib.child_watch_add(proc.pid, callback, None)
+
+    def on_exit(pid: int, status: int, user_data: None) -> None:
+        span.end({"status": status})
+        if callable(callback):
+            callback(pid, status, user_data)
+
+    if callable(callback) or tracer.enabled:
+        glib.child_watch_add(proc.pid, on_exit, None)
 
 
 def toggle_css_class(
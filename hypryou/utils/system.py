@@ -167,9 +167,11 @@ def parse_xkb_layouts(
     return layouts
 
 
-STATIC_SYSTEM_INFO = {
-    "total_ram": int(get_memory_total()),
-    "cpu": f"{get_cpu_name()} ({get_cpu_counts()})",
-    "kernel": " ".join(get_kernel_info()),
-    "distro": get_distro()
-}
+@lru_cache()
+def get_static_system_info() -> dict[str, int | str]:
+    return {
+        "total_ram": int(get_memory_total()),
+        "cpu": f"{get_cpu_name()} ({get_cpu_counts()})",
+        "kernel": " ".join(get_kernel_info()),
+        "distro": get_distro()
+    }
@@ -0,0 +1,243 @@
+import os
+import json
+import time
+import itertools
+import threading
+import typing as t
+from config import APP_CACHE_DIR
+
+type TraceEvent = dict[str, t.Any]
+
+TRACES_DIR = os.path.join(APP_CACHE_DIR, "traces")
+# Keeps memory bounded if tracing is forgotten enabled
+MAX_EVENTS = 500_000
+
+
+def now_us() -> float:
+    # Monotonic clock is shared by processes, so workers line up
+    return time.perf_counter_ns() / 1000
+
+
+class Span:
+    __slots__ = ("tracer", "name", "category", "args", "began")
+
+    def __init__(
+        self,
+        tracer: "Tracer",
+        name: str,
+        category: str,
+        args: dict[str, t.Any] | None
+    ) -> None:
+        self.tracer = tracer
+        self.name = name
+        self.category = category
+        self.args = args
+        self.began = 0.0
+
+    def __enter__(self) -> "Span":
+        self.began = now_us()
+        return self
+
+    def __exit__(self, *exc_info: t.Any) -> None:
+        self.tracer.complete(
+            self.name, self.category, self.began,
+            now_us() - self.began, self.args
+        )
+
+
+class AsyncSpan:
+    """
+    Span that can overlap others on the same thread,
+    like awaited requests or subprocesses.
+    """
+    __slots__ = ("tracer", "name", "category", "id")
+
+    def __init__(
+        self,
+        tracer: "Tracer",
+        name: str,
+        category: str,
+        args: dict[str, t.Any] | None
+    ) -> None:
+        self.tracer = tracer
+        self.name = name
+        self.category = category
+        self.id = next(tracer.ids)
+        tracer.add("b", name, category, now_us(), id=self.id, args=args)
+
+    def end(self, args: dict[str, t.Any] | None = None) -> None:
+        self.tracer.add(
+            "e", self.name, self.category, now_us(), id=self.id, args=args
+        )
+
+    def __enter__(self) -> "AsyncSpan":
+        return self
+
+    def __exit__(self, *exc_info: t.Any) -> None:
+        self.end()
+
+
+class NullSpan:
+    __slots__ = ()
+
+    def end(self, args: dict[str, t.Any] | None = None) -> None:
+        ...
+
+    def __enter__(self) -> "NullSpan":
+        return self
+
+    def __exit__(self, *exc_info: t.Any) -> None:
+        ...
+
+
+NULL_SPAN = NullSpan()
+
+
+class Tracer:
+    """
+    Records Chrome trace events, enabled by HYPRYOU_TRACE=1
+    or `trace start` command of the cli. Open traces in Perfetto.
+    """
+    __slots__ = ("enabled", "events", "dropped", "ids", "_threads")
+
+    def __init__(self) -> None:
+        self.enabled = bool(os.getenv("HYPRYOU_TRACE"))
+        self.events: list[TraceEvent] = []
+        self.dropped = 0
+        self.ids = itertools.count(1)
+        self._threads: dict[tuple[int, int], str] = {}
+
+    def span(
+        self,
+        name: str,
+        category: str = "app",
+        args: dict[str, t.Any] | None = None
+    ) -> Span | NullSpan:
+        if not self.enabled:
+            return NULL_SPAN
+        return Span(self, name, category, args)
+
+    def async_span(
+        self,
+        name: str,
+        category: str = "app",
+        args: dict[str, t.Any] | None = None
+    ) -> AsyncSpan | NullSpan:
+        if not self.enabled:
+            return NULL_SPAN
+        return AsyncSpan(self, name, category, args)
+
+    def complete(
+        self,
+        name: str,
+        category: str,
+        began: float,
+        duration: float,
+        args: dict[str, t.Any] | None = None
+    ) -> None:
+        self.add("X", name, category, began, dur=duration, args=args)
+
+    def instant(
+        self,
+        name: str,
+        category: str = "app",
+        args: dict[str, t.Any] | None = None
+    ) -> None:
+        if self.enabled:
+            self.add("i", name, category, now_us(), s="t", args=args)
+
+    def add(
+        self,
+        phase: str,
+        name: str,
+        category: str,
+        timestamp: float,
+        args: dict[str, t.Any] | None = None,
+        **fields: t.Any
+    ) -> None:
+        if len(self.events) >= MAX_EVENTS:
+            self.dropped += 1
+            return
+        pid = os.getpid()
+        thread = threading.current_thread()
+        tid = thread.ident or 0
+        if (pid, tid) not in self._threads:
+            self._threads[(pid, tid)] = thread.name
+        event: TraceEvent = {
+            "name": name, "cat": category, "ph": phase,
+            "ts": timestamp, "pid": pid, "tid": tid, **fields
+        }
+        if args:
+            event["args"] = args
+        self.events.append(event)
+
+    def mark(self) -> int:
+        return len(self.events)
+
+    def since(self, mark: int) -> list[TraceEvent]:
+        """Events of a worker process to send back to the main process"""
+        events = self.events[mark:]
+        return [*self._thread_names(events), *events]
+
+    def extend(self, events: list[TraceEvent]) -> None:
+        self.events.extend(events)
+
+    def start(self) -> None:
+        self.enabled = True
+
+    def stop(self) -> None:
+        self.enabled = False
+
+    def reset(self) -> None:
+        self.events = []
+        self.dropped = 0
+
+    def _thread_names(self, events: list[TraceEvent]) -> list[TraceEvent]:
+        processes = {event["pid"] for event in events}
+        return [
+            {
+                "name": "thread_name", "ph": "M",
+                "pid": pid, "tid": tid, "args": {"name": name}
+            }
+            for (pid, tid), name in list(self._threads.items())
+            if pid in processes
+        ]
+
+    def _process_names(self, events: list[TraceEvent]) -> list[TraceEvent]:
+        main_pid = os.getpid()
+        return [
+            {
+                "name": "process_name", "ph": "M", "pid": pid, "tid": 0,
+                "args": {"name": "hypryou" if pid == main_pid else "worker"}
+            }
+            for pid in {event["pid"] for event in events}
+        ]
+
+    def default_path(self, prefix: str = "trace") -> str:
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        return os.path.join(TRACES_DIR, f"{prefix}-{stamp}.json")
+
+    def write(self, path: str | None = None) -> str:
+        if path is None:
+            path = self.default_path()
+        path = os.path.abspath(os.path.expanduser(path))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        events = list(self.events)
+        metadata = [*self._process_names(events), *self._thread_names(events)]
+        with open(path, "w") as f:
+            json.dump({
+                "traceEvents": [*metadata, *events],
+                "displayTimeUnit": "ms",
+                "otherData": {"dropped": self.dropped}
+            }, f)
+        return path
+
+    def status(self) -> str:
+        status = "enabled" if self.enabled else "disabled"
+        status = f"Tracing is {status}, {len(self.events)} events"
+        if self.dropped:
+            status += f", {self.dropped} dropped"
+        return status
+
+
+tracer = Tracer()
@@ -5,7 +5,4 @@ CDLL('libgtk4-layer-shell.so')
 
 gi.require_version('Gtk', '4.0')
 gi.require_version('Gtk4LayerShell', '1.0')
-gi.require_version('Gtk4SessionLock', '1.0')
-gi.require_version('NM', '1.0')
-gi.require_version('AstalBluetooth', '0.1')
-gi.require_version('AstalWp', '0.1')
+# Versions of lazily loaded namespaces are in repository.py